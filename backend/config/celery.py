@@ -4,6 +4,7 @@ import os
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import beat_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 app = Celery("config")
@@ -14,8 +15,23 @@ app.autodiscover_tasks()
 
 # Добавляем периодическую задачу
 app.conf.beat_schedule = {
+    "fire-due-deadlines": {
+        "task": "notify.cron_tasks.fire_due_deadlines",
+        "schedule": 1.0,  # Дедлайны из индекса Redis — каждую секунду
+        "options": {"expires": 1.0},  # Не копить запуски, если воркер занят
+    },
     "check-overdue-tasks": {
         "task": "notify.cron_tasks.check_overdue_tasks",  # Путь к таску
-        "schedule": crontab(minute="*/5"),  # Проверять каждые 5 минут
+        "schedule": crontab(minute="*/5"),  # Страховочный полный проход
+    },
+    "prune-task-tombstones": {
+        "task": "notify.cron_tasks.prune_task_tombstones",
+        "schedule": crontab(hour=3, minute=30),  # Раз в сутки
     },
 }
+
+
+@beat_init.connect
+def rebuild_deadlines_on_start(sender, **kwargs):
+    """При запуске beat (развёртывании) восстанавливает индекс дедлайнов в Redis."""
+    app.send_task("notify.cron_tasks.rebuild_deadline_index")
@@ -0,0 +1,308 @@
+"""
+Request-level SQL, Redis and latency metrics.
+
+Для каждого HTTP-запроса (`RequestMetricsMiddleware`) и каждого сообщения
+WebSocket-consumer'а (`MetricsConsumerMixin`) считаются число SQL-запросов и
+время в БД, число команд Redis и время в Redis, общая длительность.
+
+- В DEBUG (`METRICS_SERVER_TIMING`) метрики отдаются в заголовке `Server-Timing`.
+- По имени вью накапливаются гистограммы (`registry`, `GET /api/metrics/`).
+- Запросы, превысившие `REQUEST_BUDGETS`, пишутся в лог.
+
+Redis учитывается у клиентов `InstrumentedRedis` и кэша `InstrumentedRedisCache`.
+Счётчики привязаны к `ContextVar`, поэтому запросы из `database_sync_to_async`
+учитываются в сообщении consumer'а, а параллельные запросы не смешиваются.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+
+import redis
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_metrics", default=None)
+
+# Границы корзин гистограмм: миллисекунды и количества
+DURATION_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса или сообщения."""
+
+    def __init__(self):  # noqa
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.redis_calls = 0
+        self.redis_time = 0.0
+        self.duration = None
+
+    def finish(self):
+        """Фиксирует общую длительность."""
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def as_dict(self):
+        """Метрики в миллисекундах и штуках."""
+        return {
+            "duration_ms": (self.duration or 0.0) * 1000,
+            "db_ms": self.db_time * 1000,
+            "queries": self.queries,
+            "redis_ms": self.redis_time * 1000,
+            "redis_calls": self.redis_calls,
+        }
+
+    def server_timing(self):
+        """Значение заголовка `Server-Timing`."""
+        db, redis_ms = self.db_time * 1000, self.redis_time * 1000
+        return ", ".join(
+            [
+                f'db;dur={db:.1f};desc="{self.queries} queries"',
+                f'redis;dur={redis_ms:.1f};desc="{self.redis_calls} calls"',
+                f"total;dur={(self.duration or 0.0) * 1000:.1f}",
+            ]
+        )
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (последняя — «больше всех»)."""
+
+    def __init__(self, buckets):  # noqa
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):  # noqa
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self):  # noqa
+        bounds = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "buckets": dict(zip(bounds, self.counts, strict=True)),
+        }
+
+
+class MetricsRegistry:
+    """Гистограммы метрик по имени вью (в памяти процесса)."""
+
+    def __init__(self):  # noqa
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name, metrics: RequestMetrics):
+        """Добавляет метрики запроса в гистограммы вью `name`."""
+        with self.lock:
+            for metric, value in metrics.as_dict().items():
+                histogram = self.histograms.get((name, metric))
+                if histogram is None:
+                    buckets = (
+                        DURATION_BUCKETS if metric.endswith("_ms") else COUNT_BUCKETS
+                    )
+                    histogram = self.histograms[name, metric] = Histogram(buckets)
+                histogram.observe(value)
+
+    def snapshot(self):
+        """`{вью: {метрика: гистограмма}}`."""
+        with self.lock:
+            result = {}
+            for (name, metric), histogram in sorted(self.histograms.items()):
+                result.setdefault(name, {})[metric] = histogram.as_dict()
+            return result
+
+    def clear(self):  # noqa
+        with self.lock:
+            self.histograms.clear()
+
+
+registry = MetricsRegistry()
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def _add_query_wrapper(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _wrap_redis(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.redis_calls += 1
+            metrics.redis_time += time.perf_counter() - start
+
+    return wrapper
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    """Pipeline, учитываемый в метриках одной командой."""
+
+    execute = _wrap_redis(redis.client.Pipeline.execute)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Клиент Redis, команды которого учитываются в метриках запроса.
+
+    Создаётся как обычный: `InstrumentedRedis.from_url(url)`.
+    """
+
+    execute_command = _wrap_redis(redis.Redis.execute_command)
+
+    def pipeline(self, transaction=True, shard_hint=None):  # noqa
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedRedisCache(RedisCache):
+    """`RedisCache`, каждая операция которого учитывается одной командой Redis."""
+
+    add = _wrap_redis(RedisCache.add)
+    get = _wrap_redis(RedisCache.get)
+    set = _wrap_redis(RedisCache.set)
+    touch = _wrap_redis(RedisCache.touch)
+    delete = _wrap_redis(RedisCache.delete)
+    get_many = _wrap_redis(RedisCache.get_many)
+    has_key = _wrap_redis(RedisCache.has_key)
+    incr = _wrap_redis(RedisCache.incr)
+    set_many = _wrap_redis(RedisCache.set_many)
+    delete_many = _wrap_redis(RedisCache.delete_many)
+    clear = _wrap_redis(RedisCache.clear)
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """
+    Подключает учёт SQL ко всем соединениям (один раз).
+
+    Команды Redis учитываются только у `InstrumentedRedis` и
+    `InstrumentedRedisCache`; остальные клиенты процесса не затрагиваются.
+    """
+    global _installed
+    with _install_lock:
+        if not _installed:
+            connection_created.connect(_add_query_wrapper)
+            _installed = True
+    # Соединения текущего потока, открытые до установки
+    for connection in connections.all(initialized_only=True):
+        _add_query_wrapper(connection)
+
+
+def start():
+    """Начинает учёт; возвращает метрики и токен для `stop`."""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop(name, metrics, token):
+    """Завершает учёт: гистограммы и проверка бюджета."""
+    _current.reset(token)
+    metrics.finish()
+    registry.observe(name, metrics)
+    check_budget(name, metrics)
+    return metrics
+
+
+def get_budget(name):
+    """Бюджет вью: общий `REQUEST_BUDGETS` с поправками из `REQUEST_BUDGETS_BY_VIEW`."""
+    budget = dict(getattr(settings, "REQUEST_BUDGETS", {}))
+    budget.update(getattr(settings, "REQUEST_BUDGETS_BY_VIEW", {}).get(name, {}))
+    return budget
+
+
+def check_budget(name, metrics):
+    """Пишет в лог запрос, превысивший бюджет; возвращает превышенные метрики."""
+    values = metrics.as_dict()
+    exceeded = {
+        metric: round(values[metric], 1)
+        for metric, limit in get_budget(name).items()
+        if metric in values and values[metric] > limit
+    }
+    if exceeded:
+        logger.warning(f"Превышен бюджет запроса {name}: {exceeded}")
+    return exceeded
+
+
+def view_name(request):
+    """Имя маршрута Django или «unresolved»."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    """Метрики HTTP-запроса; в DEBUG — заголовок `Server-Timing`."""
+
+    def __init__(self, get_response):  # noqa
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):  # noqa
+        metrics, token = start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop(f"{request.method} {view_name(request)}", metrics, token)
+        if getattr(settings, "METRICS_SERVER_TIMING", settings.DEBUG):
+            response["Server-Timing"] = metrics.server_timing()
+        return response
+
+
+class MetricsConsumerMixin:
+    """Метрики каждого сообщения consumer'а Channels (`ws:<класс>:<тип>`)."""
+
+    async def dispatch(self, message):  # noqa
+        install()
+        metrics, token = start()
+        try:
+            await super().dispatch(message)
+        finally:
+            stop(f"ws:{type(self).__name__}:{message['type']}", metrics, token)
+
+
+class MetricsView(APIView):
+    """Гистограммы метрик запросов процесса (только для администраторов)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):  # noqa
+        return Response(registry.snapshot())
@@ -4,11 +4,28 @@ from urllib.parse import parse_qs
 
 from asgiref.sync import sync_to_async
 from channels.middleware import BaseMiddleware
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
 from django.db import close_old_connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import UntypedToken
 
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+# Типы, которые имеет смысл сжимать (изображения и архивы уже сжаты)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
 
 class JWTAuthMiddleware(BaseMiddleware):
     """Авторизация через JWT из query-параметра WebSocket URL."""
@@ -42,3 +59,102 @@ class JWTAuthMiddleware(BaseMiddleware):
 
         # Передаем управление следующему уровню в цепочке middleware или самому Consumer'у.
         return await super().__call__(scope, receive, send)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Разбирает `Accept-Encoding` в словарь `{кодировка: q}`."""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name.strip().lower()] = q
+    return encodings
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Сжатие ответов brotli или gzip по `Accept-Encoding`.
+
+    Сжимаются текстовые ответы больше `COMPRESSION_MIN_SIZE` байт и все потоковые
+    текстовые ответы (выгрузки). brotli выбирается, если он установлен и клиент
+    его принимает, иначе — gzip стандартным `GZipMiddleware`.
+
+    Ответы с токенами (`COMPRESSION_EXCLUDED_URL_NAMES`) не сжимаются: у brotli
+    нет случайной добавки к длине, как у gzip в Django, и сжатый секрет рядом
+    с данными из запроса уязвим для BREACH.
+    """
+
+    def process_response(self, request, response):  # noqa
+        if response.has_header("Content-Encoding"):
+            return response
+        match = getattr(request, "resolver_match", None)
+        if match and match.view_name in getattr(
+            settings, "COMPRESSION_EXCLUDED_URL_NAMES", ()
+        ):
+            return response
+        content_type = response.get("Content-Type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < getattr(
+            settings, "COMPRESSION_MIN_SIZE", 1024
+        ):
+            return response
+
+        accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is None or accepted.get("br", 0) <= 0:
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 4)
+
+        if response.streaming:
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def brotli_wrapper():
+                    compressor = brotli.Compressor(quality=quality)
+                    async for chunk in original_iterator:
+                        data = compressor.process(chunk)
+                        if data:
+                            yield data
+                    data = compressor.finish()
+                    if data:
+                        yield data
+
+                response.streaming_content = brotli_wrapper()
+            else:
+                response.streaming_content = _brotli_sequence(
+                    response.streaming_content, quality
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = brotli.compress(response.content, quality=quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+
+def _brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    data = compressor.finish()
+    if data:
+        yield data
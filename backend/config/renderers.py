@@ -0,0 +1,53 @@
+"""
+Fast JSON rendering and parsing based on orjson.
+
+`ORJSONRenderer`/`ORJSONParser` подключаются в `REST_FRAMEWORK` вместо
+стандартных `JSONRenderer`/`JSONParser`; `dumps` используется для сообщений
+WebSocket. Типы, которых нет в orjson (`Decimal`, ленивые строки, `QuerySet`),
+и даты кодируются так же, как в DRF.
+"""
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Даты передаются в DRF-кодировщик: формат совпадает со стандартным рендерером
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_default = JSONEncoder().default
+
+
+def dumps(data) -> bytes:
+    """Кодирует данные в компактный JSON (UTF-8)."""
+    return orjson.dumps(data, default=_default, option=OPTIONS)
+
+
+def loads(data):
+    """Разбирает JSON из `bytes` или `str`."""
+    return orjson.loads(data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON-рендерер DRF на orjson; с отступами — стандартный рендерер."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):  # noqa
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class ORJSONParser(JSONParser):
+    """JSON-парсер DRF на orjson."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):  # noqa
+        try:
+            return loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
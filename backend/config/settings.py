@@ -62,7 +62,11 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # Метрики — первыми, чтобы учесть время всех остальных middleware
+    "config.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Сжатие — до middleware, которые читают или меняют тело ответа
+    "config.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -141,8 +145,22 @@ TELEGRAM_BOT_NAME = env("TELEGRAM_BOT_NAME")
 TELEGRAM_LINK_TOKEN_EXPIRE = env.int("TELEGRAM_TOKEN_EXPIRE", default=600)
 
 TELEGRAM_BOT_TOKEN = env("TELEGRAM_BOT_TOKEN")
+TELEGRAM_API_URL = env("TELEGRAM_API_URL", default="https://api.telegram.org")
+# Лимиты Bot API: сообщений в секунду всего и в один чат
+TELEGRAM_GLOBAL_RATE = env.float("TELEGRAM_GLOBAL_RATE", default=30)
+TELEGRAM_CHAT_RATE = env.float("TELEGRAM_CHAT_RATE", default=1)
 
 REST_FRAMEWORK = {
+    # JSON через orjson; формы DRF и браузерный API — стандартные
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "config.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",  # web
         "rest_framework_simplejwt.authentication.JWTAuthentication",  # API
@@ -156,10 +174,20 @@ REST_FRAMEWORK = {
         "anon": "10/minute",
         "user": "1000/day",
     },
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    # LimitOffsetPagination — по умолчанию (веб-клиент листает через offset);
+    # tasks.pagination.KeysetPagination — курсор по (created_at, id) без COUNT(*)
+    "DEFAULT_PAGINATION_CLASS": env(
+        "PAGINATION_CLASS", default="rest_framework.pagination.LimitOffsetPagination"
+    ),
     "PAGE_SIZE": 20,
 }
 
+# Ответы меньше порога не сжимаются; brotli — при установленном пакете brotli
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+COMPRESSION_BROTLI_QUALITY = env.int("COMPRESSION_BROTLI_QUALITY", default=4)
+# Ответы с JWT не сжимаются (BREACH)
+COMPRESSION_EXCLUDED_URL_NAMES = ("token", "token_refresh", "tg-confirm")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -198,7 +226,8 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 минут
 # Настройки кэширования (для отслеживания активности пользователей)
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        # RedisCache с учётом команд в метриках запроса (config.metrics)
+        "BACKEND": "config.metrics.InstrumentedRedisCache",
         "LOCATION": f"{REDIS_URL}/2",  # База данных 2
         "TIMEOUT": 60 * 60,  # 1 час
         "OPTIONS": {
@@ -209,6 +238,30 @@ CACHES = {
 
 REDIS_CHAT_URL = f"{REDIS_URL}/3"
 
+# Кэш страниц /api/tasks/ и /api/lists/<id>/tasks/ (tasks.cache), секунды; 0 — выключен
+TASK_PAGE_CACHE_TIMEOUT = env.int("TASK_PAGE_CACHE_TIMEOUT", default=300)
+# Сколько страниц держать в памяти процесса перед обращением к Redis
+TASK_PAGE_CACHE_LOCAL_SIZE = env.int("TASK_PAGE_CACHE_LOCAL_SIZE", default=1024)
+
+# Админка больших таблиц (tasks.admin_utils): с какой оценки числа строк не считать
+# COUNT(*) и сколько секунд хранить агрегаты date_hierarchy
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD", default=10000
+)
+ADMIN_DATE_HIERARCHY_CACHE_TIMEOUT = env.int(
+    "ADMIN_DATE_HIERARCHY_CACHE_TIMEOUT", default=600
+)
+
+# Метрики запросов (config.metrics): Server-Timing и бюджеты, сверх которых — warning
+METRICS_SERVER_TIMING = env.bool("METRICS_SERVER_TIMING", default=DEBUG)
+REQUEST_BUDGETS = {
+    "queries": env.int("REQUEST_BUDGET_QUERIES", default=30),
+    "duration_ms": env.int("REQUEST_BUDGET_MS", default=500),
+    "redis_calls": env.int("REQUEST_BUDGET_REDIS_CALLS", default=20),
+}
+# Поправки для отдельных вью: {"GET task-export": {"duration_ms": 30000}}
+REQUEST_BUDGETS_BY_VIEW = {}
+
 # Настройки безопасности
 # в dev разрешаем всё, в prod — строго по CSRF_TRUSTED_ORIGINS
 CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=["http://127.0.0.1"])
@@ -6,3 +6,12 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
+
+# Celery-задачи выполняются синхронно, без брокера
+CELERY_TASK_ALWAYS_EAGER = True
+
+# Кэш страниц задач включается в отдельных тестах (override_settings)
+TASK_PAGE_CACHE_TIMEOUT = 0
+
+# Быстрый хэшер: бюджеты времени auth-эндпоинтов не должны зависеть от PBKDF2
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from unittest.mock import patch
+
+import pytest
+import redis
+from channels.consumer import AsyncConsumer
+from channels.db import database_sync_to_async
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from config import metrics
+from tasks.models import ListTask, Task
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.install()
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+@pytest.fixture
+def client_with_tasks(db):
+    user = User.objects.create_user(username="testuser", password="testpassword")
+    list_task = ListTask.objects.create(name="Test List", owner=user)
+    for i in range(3):
+        Task.objects.create(name=f"Task {i}", list_tasks=list_task, assigned_to=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def test_server_timing_and_histograms(client_with_tasks, settings):
+    settings.METRICS_SERVER_TIMING = True
+
+    response = client_with_tasks.get(reverse("assigned-tasks"))
+
+    assert response.status_code == 200
+    timing = response["Server-Timing"]
+    assert timing.startswith("db;dur=") and "total;dur=" in timing
+    histograms = metrics.registry.snapshot()["GET assigned-tasks"]
+    assert histograms["queries"]["count"] == 1
+    assert histograms["queries"]["sum"] >= 1
+    assert set(histograms) == {
+        "duration_ms",
+        "db_ms",
+        "queries",
+        "redis_ms",
+        "redis_calls",
+    }
+
+
+def test_server_timing_disabled(client_with_tasks, settings):
+    settings.METRICS_SERVER_TIMING = False
+
+    response = client_with_tasks.get(reverse("assigned-tasks"))
+
+    assert "Server-Timing" not in response
+
+
+def test_budget_exceeded_is_logged(client_with_tasks, settings, caplog):
+    settings.REQUEST_BUDGETS = {"queries": 100}
+    settings.REQUEST_BUDGETS_BY_VIEW = {"GET assigned-tasks": {"queries": 0}}
+
+    with caplog.at_level(logging.WARNING, logger="config.metrics"):
+        client_with_tasks.get(reverse("assigned-tasks"))
+
+    assert "Превышен бюджет запроса GET assigned-tasks" in caplog.text
+
+
+def test_queries_outside_request_not_counted(client_with_tasks):
+    Task.objects.count()
+
+    assert metrics.registry.snapshot() == {}
+
+
+def test_histogram_buckets():
+    histogram = metrics.Histogram((1, 10))
+    for value in (0, 1, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.as_dict() == {
+        "count": 4,
+        "sum": 56,
+        "buckets": {"1": 2, "10": 1, "+Inf": 1},
+    }
+
+
+class PingConsumer(metrics.MetricsConsumerMixin, AsyncConsumer):
+    async def ping(self, message):
+        await database_sync_to_async(metrics.InstrumentedRedis().execute_command)(
+            "PING"
+        )
+        # Обычный клиент Redis в метриках не учитывается
+        await database_sync_to_async(redis.Redis().execute_command)("PING")
+
+
+def test_consumer_message_metrics():
+    consumer = PingConsumer()
+
+    with patch("redis.Redis._execute_command", return_value=b"PONG"):
+        asyncio.run(consumer.dispatch({"type": "ping"}))
+
+    histograms = metrics.registry.snapshot()["ws:PingConsumer:ping"]
+    assert histograms["redis_calls"]["sum"] == 1
+    assert histograms["queries"]["sum"] == 0
+
+
+def test_cache_operations_counted():
+    cache = metrics.InstrumentedRedisCache("redis://localhost:6379/0", {})
+
+    with (
+        patch("django.core.cache.backends.redis.RedisCacheClient.get_many"),
+        patch("django.core.cache.backends.redis.RedisCacheClient.get"),
+    ):
+        recorded, token = metrics.start()
+        cache.get("a")
+        cache.get_many(["a", "b"])
+        metrics.stop("cache", recorded, token)
+
+    assert recorded.redis_calls == 2
@@ -0,0 +1,108 @@
+import gzip
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+from config.middleware import CompressionMiddleware, parse_accept_encoding
+
+brotli = pytest.importorskip("brotli")
+factory = RequestFactory()
+
+BODY = json.dumps([{"id": i, "name": f"Task {i}"} for i in range(200)]).encode()
+
+
+def run(response, accept_encoding):
+    request = factory.get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def json_response(body=BODY):
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = '"abc"'
+    return response
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "identity": 0.0,
+    }
+
+
+def test_brotli_preferred():
+    response = run(json_response(), "gzip, deflate, br")
+
+    assert response["Content-Encoding"] == "br"
+    assert brotli.decompress(response.content) == BODY
+    assert response["Content-Length"] == str(len(response.content))
+    assert response["ETag"] == 'W/"abc"'
+    assert "Accept-Encoding" in response["Vary"]
+
+
+def test_gzip_fallback():
+    response = run(json_response(), "gzip")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content) == BODY
+
+
+def test_brotli_refused():
+    response = run(json_response(), "gzip, br;q=0")
+    assert response["Content-Encoding"] == "gzip"
+
+
+@override_settings(COMPRESSION_MIN_SIZE=10_000)
+def test_small_response_not_compressed():
+    response = run(json_response(), "br")
+    assert not response.has_header("Content-Encoding")
+    assert response.content == BODY
+
+
+def test_binary_not_compressed():
+    response = run(HttpResponse(BODY, content_type="image/png"), "br")
+    assert not response.has_header("Content-Encoding")
+
+
+def test_streaming_brotli():
+    lines = [json.dumps({"id": i}).encode() + b"\n" for i in range(1000)]
+    response = run(
+        StreamingHttpResponse(iter(lines), content_type="application/x-ndjson"), "br"
+    )
+
+    assert response["Content-Encoding"] == "br"
+    chunks = list(response.streaming_content)
+    assert all(chunks)
+    assert brotli.decompress(b"".join(chunks)) == b"".join(lines)
+
+
+def test_async_streaming_brotli_skips_empty_chunks():
+    lines = [json.dumps({"id": i}).encode() + b"\n" for i in range(1000)]
+
+    async def stream():
+        for line in lines:
+            yield line
+
+    response = run(
+        StreamingHttpResponse(stream(), content_type="application/x-ndjson"), "br"
+    )
+
+    async def collect():
+        return [chunk async for chunk in response.streaming_content]
+
+    chunks = async_to_sync(collect)()
+    assert all(chunks)
+    assert brotli.decompress(b"".join(chunks)) == b"".join(lines)
+
+
+def test_token_response_not_compressed():
+    request = factory.post("/api/auth/token/", HTTP_ACCEPT_ENCODING="br, gzip")
+    request.resolver_match = resolve("/api/auth/token/")
+    response = CompressionMiddleware(lambda request: json_response())(request)
+
+    assert not response.has_header("Content-Encoding")
+    assert response.content == BODY
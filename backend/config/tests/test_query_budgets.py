@@ -0,0 +1,295 @@
+import time
+import tracemalloc
+from typing import NamedTuple
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Profile
+from accounts.utils import generate_telegram_token
+from tasks.models import ListTask, Task, TaskStatus
+
+User = get_user_model()
+
+# Размеры страницы (и таблицы): число запросов не должно от них зависеть
+SIZES = (1, 20, 100)
+
+
+class Budget(NamedTuple):
+    """Максимум SQL-запросов, времени (мс) и пиковой памяти (КБ) на запрос."""
+
+    queries: int
+    ms: float = 1000
+    kb: float = 2048
+
+
+BUDGETS = {
+    "assigned-tasks": Budget(queries=4),
+    "task-in-list": Budget(queries=5),
+    "task-detail": Budget(queries=2),
+    "task-update": Budget(queries=5),
+    "complete-task": Budget(queries=2),
+    "token": Budget(queries=3),
+    "token_refresh": Budget(queries=13),
+    "register": Budget(queries=2),
+    "logout": Budget(queries=8),
+    "tg-link": Budget(queries=1),
+    "tg-confirm": Budget(queries=7),
+    "admin-task": Budget(queries=4, ms=2000, kb=16384),
+    "admin-listtask": Budget(queries=6, ms=2000, kb=8192),
+    "admin-profile": Budget(queries=5, ms=2000, kb=8192),
+}
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects():
+    # Троттлинг DRF считает запросы в кэше и ответил бы 429 на повторы
+    with (
+        patch("notify.signals.enqueue_task_change"),
+        patch("notify.signals.dispatch_tasks_updated"),
+        patch.object(APIView, "throttle_classes", []),
+    ):
+        yield
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+    return client
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_superuser(username="admin", password="adminpassword")
+    client = Client()
+    client.force_login(admin)
+    return client
+
+
+def measure(client, prepare):
+    """
+    Ответ, число SQL-запросов, время (мс) и пиковая память (КБ) запроса.
+
+    Память меряется отдельным запросом: tracemalloc в разы замедляет код.
+    """
+    method, url, kwargs = prepare()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+
+    method, url, kwargs = prepare()
+    tracemalloc.start()
+    try:
+        getattr(client, method)(url, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return response, len(queries), elapsed, peak / 1024
+
+
+def assert_budget(name, client, grow, prepare):
+    """
+    Проверяет бюджет `BUDGETS[name]` для таблиц из 1, 20 и 100 строк.
+
+    `grow(size)` доращивает данные до `size` строк, `prepare()` возвращает
+    `(method, url, kwargs)` очередного запроса (его запросы не считаются).
+    """
+    budget = BUDGETS[name]
+    # Прогрев: импорты, кэши ContentType и создание профиля не входят в замер
+    grow(SIZES[0])
+    method, url, kwargs = prepare()
+    getattr(client, method)(url, **kwargs)
+    counts = {}
+    for size in SIZES:
+        grow(size)
+        response, queries, ms, kb = measure(client, prepare)
+        assert response.status_code < 400, (name, size, response.status_code)
+        assert queries <= budget.queries, f"{name}[{size}]: {queries} SQL-запросов"
+        assert ms <= budget.ms, f"{name}[{size}]: {ms:.0f} мс"
+        assert kb <= budget.kb, f"{name}[{size}]: {kb:.0f} КБ"
+        counts[size] = queries
+    assert len(set(counts.values())) == 1, f"{name}: запросы растут с данными {counts}"
+
+
+def grow_tasks(list_task, assignee):
+    def grow(size):
+        existing = Task.objects.filter(list_tasks=list_task).count()
+        Task.objects.bulk_create(
+            Task(
+                name=f"Task {i}",
+                list_tasks=list_task,
+                assigned_to=assignee,
+                status=TaskStatus.IN_PROGRESS,
+            )
+            for i in range(existing, size)
+        )
+
+    return grow
+
+
+@pytest.mark.django_db
+class TestTaskEndpoints:
+    def test_assigned_tasks(self, api_client, user, list_task):
+        url = reverse("assigned-tasks")
+        assert_budget(
+            "assigned-tasks",
+            api_client,
+            grow_tasks(list_task, user),
+            lambda: ("get", f"{url}?limit={Task.objects.count()}", {}),
+        )
+
+    def test_task_in_list(self, api_client, user, list_task):
+        url = reverse("task-in-list", args=[list_task.id])
+        assert_budget(
+            "task-in-list",
+            api_client,
+            grow_tasks(list_task, user),
+            lambda: ("get", f"{url}?limit={Task.objects.count()}", {}),
+        )
+
+    def test_task_detail(self, api_client, user, list_task):
+        grow = grow_tasks(list_task, user)
+        grow(1)
+        url = reverse("task-detail", args=[Task.objects.earliest("id").id])
+        assert_budget("task-detail", api_client, grow, lambda: ("get", url, {}))
+
+    def test_task_update(self, api_client, user, list_task):
+        grow = grow_tasks(list_task, user)
+        grow(1)
+        task_id = Task.objects.earliest("id").id
+        url = reverse("task-detail", args=[task_id])
+
+        def prepare():
+            version = Task.objects.get(id=task_id).version
+            return (
+                "patch",
+                url,
+                {"data": {"description": "x", "version": version}, "format": "json"},
+            )
+
+        assert_budget("task-update", api_client, grow, prepare)
+
+    def test_complete_task(self, api_client, user, list_task):
+        grow = grow_tasks(list_task, user)
+        grow(1)
+        task_id = Task.objects.earliest("id").id
+
+        def prepare():
+            Task.objects.filter(id=task_id).update(status=TaskStatus.IN_PROGRESS)
+            return "post", reverse("complete-task", args=[task_id]), {}
+
+        assert_budget("complete-task", api_client, grow, prepare)
+
+
+def grow_users(size):
+    existing = User.objects.filter(username__startswith="member").count()
+    User.objects.bulk_create(User(username=f"member{i}") for i in range(existing, size))
+
+
+@pytest.mark.django_db
+class TestAuthEndpoints:
+    def test_token(self, user):
+        data = {"username": "testuser", "password": "testpassword"}
+        assert_budget(
+            "token",
+            APIClient(),
+            grow_users,
+            lambda: ("post", reverse("token"), {"data": data}),
+        )
+
+    def test_token_refresh(self, user):
+        def prepare():
+            data = {"refresh": str(RefreshToken.for_user(user))}
+            return "post", reverse("token_refresh"), {"data": data}
+
+        assert_budget("token_refresh", APIClient(), grow_users, prepare)
+
+    def test_register(self):
+        def prepare():
+            username = f"new{User.objects.count()}"
+            data = {
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": "Strong-pass-123",
+                "confirm_password": "Strong-pass-123",
+            }
+            return "post", reverse("register"), {"data": data}
+
+        assert_budget("register", APIClient(), grow_users, prepare)
+
+    def test_logout(self, api_client, user):
+        def prepare():
+            data = {"refresh_token": str(RefreshToken.for_user(user))}
+            return "post", reverse("logout"), {"data": data}
+
+        assert_budget("logout", api_client, grow_users, prepare)
+
+    def test_tg_link(self, api_client):
+        assert_budget(
+            "tg-link", api_client, grow_users, lambda: ("post", reverse("tg-link"), {})
+        )
+
+    def test_tg_confirm(self, user):
+        def prepare():
+            Profile.objects.filter(user=user).update(telegram_id=None)
+            data = {"code": generate_telegram_token(user.pk), "telegram_id": 12345}
+            return "post", reverse("tg-confirm"), {"data": data}
+
+        assert_budget("tg-confirm", APIClient(), grow_users, prepare)
+
+
+@pytest.mark.django_db
+class TestAdminChangelists:
+    def test_task_changelist(self, admin_client, user, list_task):
+        url = reverse("admin:tasks_task_changelist")
+        assert_budget(
+            "admin-task",
+            admin_client,
+            grow_tasks(list_task, user),
+            lambda: ("get", url, {}),
+        )
+
+    def test_listtask_changelist(self, admin_client, user):
+        def grow(size):
+            existing = ListTask.objects.count()
+            for i in range(existing, size):
+                list_task = ListTask.objects.create(name=f"List {i}", owner=user)
+                grow_tasks(list_task, user)(2)
+
+        url = reverse("admin:tasks_listtask_changelist")
+        assert_budget("admin-listtask", admin_client, grow, lambda: ("get", url, {}))
+
+    def test_profile_changelist(self, admin_client):
+        def grow(size):
+            grow_users(size)
+            Profile.objects.bulk_create(
+                Profile(user=member)
+                for member in User.objects.filter(
+                    username__startswith="member", profile=None
+                )
+            )
+
+        url = reverse("admin:accounts_profile_changelist")
+        assert_budget("admin-profile", admin_client, grow, lambda: ("get", url, {}))
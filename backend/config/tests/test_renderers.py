@@ -0,0 +1,45 @@
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import ORJSONParser, ORJSONRenderer, dumps
+
+
+def test_renderer_matches_drf_json():
+    data = {
+        "name": "Задача",
+        "when": datetime(2030, 1, 1, 10, 0, 0, 123456, tzinfo=timezone.utc),
+        "amount": Decimal("1.50"),
+        "label": gettext_lazy("Hello"),
+        "items": [1, None, True],
+        1: "int key",
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_renderer_indent_falls_back_to_drf():
+    data = {"a": [1, 2]}
+    context = {"indent": 2}
+
+    assert ORJSONRenderer().render(
+        data, renderer_context=context
+    ) == JSONRenderer().render(data, renderer_context=context)
+    assert ORJSONRenderer().render(None) == b""
+
+
+def test_parser():
+    parser = ORJSONParser()
+    assert parser.parse(io.BytesIO('{"name": "Задача"}'.encode())) == {"name": "Задача"}
+
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b"{broken"))
+
+
+def test_dumps_is_compact_utf8():
+    assert dumps({"a": "б"}) == '{"a":"б"}'.encode()
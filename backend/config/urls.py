@@ -19,11 +19,13 @@ from django.contrib import admin
 from django.urls import path, include
 
 from . import settings
+from .metrics import MetricsView
 
 urlpatterns = [
     path(settings.ADMIN_URL, admin.site.urls),
     path("api/", include("accounts.urls")),
     path("api/", include("tasks.urls")),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 if settings.DEBUG:
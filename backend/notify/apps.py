@@ -14,5 +14,6 @@ class NotifyConfig(AppConfig):
         try:
             from . import signals  # noqa
             from . import cron_tasks  # noqa
+            from . import tasks  # noqa
         except ImportError:
             pass  # Нет файла с задачами — пропускаем
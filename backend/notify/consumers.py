@@ -6,12 +6,14 @@ import logging
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from config.metrics import MetricsConsumerMixin
+from config.renderers import dumps, loads
 from .presence import mark_online, mark_offline
 
 logger = logging.getLogger(__name__)
 
 
-class TaskConsumer(AsyncWebsocketConsumer):
+class TaskConsumer(MetricsConsumerMixin, AsyncWebsocketConsumer):
     """Обрабатывает WebSocket-соединения для обновлений в реальном времени."""
 
     async def connect(self):
@@ -55,8 +57,8 @@ class TaskConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            data = json.loads(text_data)
-        except json.JSONDecodeError:
+            data = loads(text_data)
+        except json.JSONDecodeError:  # orjson.JSONDecodeError — подкласс
             await self.send_json({"error": "Invalid JSON"})
             return
 
@@ -64,6 +66,12 @@ class TaskConsumer(AsyncWebsocketConsumer):
 
     async def ws_event(self, event):
         """Вызывает обработчик, когда другой код вызывает group_send."""
+        # Сообщение уже закодировано в JSON отправителем (`ws_send_user`)
+        if "text" in event:
+            logger.debug(f"[WS][send] to user={self.user.id} Text={event['text']}")
+            await self.send(text_data=event["text"])
+            return
+
         payload = event.get("data", {})
 
         logger.debug(f"[WS][send] to user={self.user.id} Payload={payload}")
@@ -72,4 +80,4 @@ class TaskConsumer(AsyncWebsocketConsumer):
 
     async def send_json(self, content: dict):
         """Safe wrapper to send JSON over WebSocket."""
-        await self.send(text_data=json.dumps(content))
+        await self.send(text_data=dumps(content).decode())
@@ -6,46 +6,189 @@ to users via WebSocket or Telegram.
 """
 
 from celery import shared_task
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
-from tasks.models import Task, TaskStatus
+from tasks.cache import invalidate_tasks
+from tasks.models import Task, TaskStatus, TaskTombstone
 from tasks.serializers import TaskSerializer
-from .presence import is_online
+from tasks.sync import SYNC_RETENTION
+from .deadlines import pop_due_deadlines, schedule_deadlines
+from .presence import online_user_ids
 from .service import ws_send_user
-from .telegram import send_telegram_message
+from .telegram import send_telegram_messages
+
+# Размер пачки для UPDATE и для этапа уведомлений
+OVERDUE_CHUNK_SIZE = 1000
+
+
+def overdue_candidates(now):
+    """Задачи с истёкшим дедлайном, которые ещё не завершены и не просрочены."""
+    return Task.objects.filter(complete_before__lt=now).exclude(
+        status__in=[TaskStatus.COMPLETED, TaskStatus.OVERDUE]
+    )
+
+
+def mark_overdue_chunk(after_id, now, chunk_size=OVERDUE_CHUNK_SIZE):
+    """
+    Одним UPDATE помечает просроченными следующую пачку задач с `id > after_id`.
+
+    Пачка блокируется `SELECT ... FOR UPDATE` (на SQLite — no-op), поэтому
+    набор id, возвращаемый функцией, совпадает с реально обновлёнными строками.
+    """
+    with transaction.atomic():
+        task_ids = list(
+            overdue_candidates(now)
+            .filter(id__gt=after_id)
+            .order_by("id")
+            .select_for_update()
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if task_ids:
+            Task.objects.filter(id__in=task_ids).update(
+                status=TaskStatus.OVERDUE, updated_at=now, version=F("version") + 1
+            )
+    return task_ids
+
+
+def mark_overdue_ids(task_ids, now):
+    """Одним UPDATE помечает просроченными указанные задачи, если они ещё активны."""
+    with transaction.atomic():
+        affected = list(
+            overdue_candidates(now)
+            .filter(id__in=task_ids)
+            .select_for_update()
+            .values_list("id", flat=True)
+        )
+        if affected:
+            Task.objects.filter(id__in=affected).update(
+                status=TaskStatus.OVERDUE, updated_at=now, version=F("version") + 1
+            )
+    return affected
 
 
 @shared_task
-def check_overdue_tasks():
-    """Помечает задачи как просроченные и отправляет уведомления."""
+def fire_due_deadlines(limit=OVERDUE_CHUNK_SIZE):
+    """
+    Переводит в просроченные задачи, чей дедлайн наступил (по индексу в Redis).
+
+    Работа пропорциональна числу наступивших дедлайнов, а не размеру таблицы.
+    """
     now = timezone.now()
-    overdue_tasks = Task.objects.filter(complete_before__lt=now).exclude(
-        status__in=[TaskStatus.COMPLETED, TaskStatus.OVERDUE]
+    total = 0
+    while task_ids := pop_due_deadlines(now, limit):
+        affected = mark_overdue_ids(task_ids, now)
+        if affected:
+            total += len(affected)
+            invalidate_tasks(affected)
+            notify_overdue_tasks.delay(affected)
+    return total
+
+
+@shared_task
+def rebuild_deadline_index(chunk_size=OVERDUE_CHUNK_SIZE):
+    """
+    Заносит в индекс дедлайнов все активные задачи со сроком.
+
+    Индекс заполняется при сохранении задач, поэтому после развёртывания (или
+    потери данных Redis) его нужно восстановить. Пачки по `id` (keyset), один
+    ZADD на пачку; повторный запуск безопасен.
+    """
+    active = (
+        Task.objects.filter(complete_before__isnull=False)
+        .exclude(status__in=[TaskStatus.COMPLETED, TaskStatus.OVERDUE])
+        .order_by("id")
+    )
+    last_id = 0
+    total = 0
+    while rows := list(
+        active.filter(id__gt=last_id).values_list("id", "complete_before")[:chunk_size]
+    ):
+        schedule_deadlines(dict(rows))
+        last_id = rows[-1][0]
+        total += len(rows)
+    return total
+
+
+@shared_task
+def check_overdue_tasks(chunk_size=OVERDUE_CHUNK_SIZE):
+    """
+    Помечает задачи как просроченные и отправляет уведомления.
+
+    Полный проход по таблице — страховка для дедлайнов, не попавших в индекс
+    `fire_due_deadlines` (массовые UPDATE, недоступный Redis). Задачи
+    обрабатываются пачками по `id` (keyset), поэтому память ограничена размером
+    пачки. Статусы меняются массовым UPDATE без сигналов `pre_save`/`post_save`,
+    id обновлённых задач передаются в `notify_overdue_tasks`.
+    """
+    now = timezone.now()
+    last_id = 0
+    total = 0
+    while task_ids := mark_overdue_chunk(last_id, now, chunk_size):
+        last_id = task_ids[-1]
+        total += len(task_ids)
+        invalidate_tasks(task_ids)
+        notify_overdue_tasks.delay(task_ids)
+    return total
+
+
+@shared_task
+def notify_overdue_tasks(task_ids):
+    """
+    Рассылает уведомления о просрочке для пачки задач.
+
+    task_updated получают онлайн исполнитель и владелец списка (как при
+    `post_save`), сообщение о просрочке — только исполнитель.
+    """
+    tasks = list(
+        Task.objects.filter(id__in=task_ids).select_related(
+            "list_tasks", "assigned_to__profile"
+        )
     )
+    if not tasks:
+        return
 
-    for task in overdue_tasks:
-        task.mark_overdue()
+    # Один проход сериализатора и один запрос онлайн-статуса на всю пачку
+    serialized = TaskSerializer(tasks, many=True).data
+    recipients = {task.assigned_to_id for task in tasks}
+    recipients |= {task.list_tasks.owner_id for task in tasks}
+    online = online_user_ids(recipients - {None})
+    telegram_messages = []
 
+    for task, data in zip(tasks, serialized, strict=True):
         payload_updated = {
             "type": "task_updated",
             "action": "updated",
-            "task": TaskSerializer(task).data,
+            "task": data,
         }
+        for user_id in {task.assigned_to_id, task.list_tasks.owner_id} & online:
+            ws_send_user(user_id, payload_updated)
 
+        if not task.assigned_to_id:
+            continue
         payload_notify = {
             "type": "task_notify",
             "action": "overdue",
             "message": f"Задача '{task.name}' просрочена!",
-            "task": TaskSerializer(task).data,
+            "task": data,
         }
+        if task.assigned_to_id in online:
+            ws_send_user(task.assigned_to_id, payload_notify)
+        elif getattr(getattr(task.assigned_to, "profile", None), "telegram_id", None):
+            telegram_messages.append(
+                (task.assigned_to.profile.telegram_id, payload_notify["message"])
+            )
 
-        if task.assigned_to:
-            if is_online(task.assigned_to.id):
-                ws_send_user(task.assigned_to.id, payload_updated)
-                ws_send_user(task.assigned_to.id, payload_notify)
-            elif getattr(
-                getattr(task.assigned_to, "profile", None), "telegram_id", None
-            ):
-                send_telegram_message(
-                    task.assigned_to.profile.telegram_id, payload_notify["message"]
-                )
+    if telegram_messages:
+        # Одна пачка с общим пулом соединений и лимитами Telegram
+        send_telegram_messages(telegram_messages)
+
+
+@shared_task
+def prune_task_tombstones():
+    """Удаляет отметки об удалённых задачах старше срока хранения токенов."""
+    deleted, _ = TaskTombstone.objects.filter(
+        created_at__lt=timezone.now() - SYNC_RETENTION
+    ).delete()
+    return deleted
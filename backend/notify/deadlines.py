@@ -0,0 +1,66 @@
+"""
+A module for indexing task deadlines in Redis.
+
+Pending deadlines are kept in a sorted set (`task_id` -> `complete_before` timestamp),
+so the scheduler only touches tasks that are actually due.
+"""
+
+import logging
+
+from django.conf import settings
+
+from config.metrics import InstrumentedRedis
+
+logger = logging.getLogger(__name__)
+
+_redis = InstrumentedRedis.from_url(settings.REDIS_CHAT_URL)
+_KEY = "task_deadlines"
+
+# Атомарно забирает из множества до ARGV[2] задач со сроком <= ARGV[1]
+_pop_due = _redis.register_script(
+    """
+    local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    if #ids > 0 then
+        redis.call('ZREM', KEYS[1], unpack(ids))
+    end
+    return ids
+    """
+)
+
+
+def schedule_deadline(task_id: int, complete_before) -> None:
+    """Добавляет или переносит дедлайн задачи; без дедлайна — удаляет из индекса."""
+    if complete_before is None:
+        cancel_deadline(task_id)
+        return
+    logger.debug(f"[REDIS_CHAT] {task_id}{_KEY} schedule {complete_before}.")
+    _redis.zadd(_KEY, {task_id: complete_before.timestamp()})
+
+
+def schedule_deadlines(deadlines: dict) -> None:
+    """Добавляет пачку дедлайнов `{task_id: complete_before}` одним ZADD."""
+    if deadlines:
+        logger.debug(f"[REDIS_CHAT] {_KEY} schedule {len(deadlines)} tasks.")
+        _redis.zadd(
+            _KEY, {task_id: when.timestamp() for task_id, when in deadlines.items()}
+        )
+
+
+def cancel_deadline(task_id: int) -> None:  # noqa
+    logger.debug(f"[REDIS_CHAT] {task_id}{_KEY} cancel.")
+    _redis.zrem(_KEY, task_id)
+
+
+def cancel_deadlines(task_ids) -> None:
+    """Убирает из индекса пачку задач одним ZREM."""
+    task_ids = list(task_ids)
+    if task_ids:
+        logger.debug(f"[REDIS_CHAT] {_KEY} cancel {len(task_ids)} tasks.")
+        _redis.zrem(_KEY, *task_ids)
+
+
+def pop_due_deadlines(now, limit: int = 1000) -> list[int]:
+    """Забирает из индекса id задач, чей дедлайн уже наступил."""
+    return [
+        int(task_id) for task_id in _pop_due(keys=[_KEY], args=[now.timestamp(), limit])
+    ]
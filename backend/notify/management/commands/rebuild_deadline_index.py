@@ -0,0 +1,23 @@
+"""
+Rebuild of the Redis deadline index.
+
+Пример (после `migrate` при каждом развёртывании):
+    python manage.py rebuild_deadline_index
+"""
+
+from django.core.management.base import BaseCommand
+
+from notify.cron_tasks import OVERDUE_CHUNK_SIZE, rebuild_deadline_index
+
+
+class Command(BaseCommand):
+    """Заносит дедлайны активных задач в индекс `fire_due_deadlines`."""
+
+    help = "Восстанавливает индекс дедлайнов задач в Redis."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument("--chunk-size", type=int, default=OVERDUE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):  # noqa
+        total = rebuild_deadline_index(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"В индексе дедлайнов задач: {total}."))
@@ -6,12 +6,13 @@ Provides functions for marking users as online/offline and checkin status.
 
 import logging
 
-import redis
 from django.conf import settings
 
+from config.metrics import InstrumentedRedis
+
 logger = logging.getLogger(__name__)
 
-_redis = redis.from_url(settings.REDIS_CHAT_URL)
+_redis = InstrumentedRedis.from_url(settings.REDIS_CHAT_URL)
 _KEY = "online_users"
 
 
@@ -28,3 +29,13 @@ def mark_offline(user_id: int) -> None:  # noqa
 def is_online(user_id: int) -> bool:  # noqa
     logger.debug(f"[REDIS_CHAT] {user_id}{_KEY} is_online.")
     return _redis.sismember(_KEY, user_id)
+
+
+def online_user_ids(user_ids) -> set[int]:
+    """Возвращает подмножество онлайн-пользователей одним запросом SMISMEMBER."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return set()
+    logger.debug(f"[REDIS_CHAT] {user_ids}{_KEY} online_user_ids.")
+    flags = _redis.smismember(_KEY, user_ids)
+    return {user_id for user_id, flag in zip(user_ids, flags, strict=True) if flag}
@@ -1,22 +1,30 @@
 """Notification service module for the tasks application."""
 
+from collections import defaultdict
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.contrib.auth import get_user_model
 
+from config.renderers import dumps
 from tasks.serializers import TaskSerializer
-from .presence import is_online
-from .telegram import send_telegram_message
+from .presence import online_user_ids
+from .telegram import send_telegram_message, send_telegram_messages
 
 User = get_user_model()
 channel_layer = get_channel_layer()
 
 
 def ws_send_user(user_id: int, payload: dict):
-    """Send WebSocket message to a user."""
+    """
+    Send WebSocket message to a user.
+
+    Сообщение кодируется в JSON один раз здесь: слой каналов передаёт строку,
+    а consumer отправляет её клиенту без повторной сериализации.
+    """
     async_to_sync(channel_layer.group_send)(
         f"user_{user_id}",
-        {"type": "ws.event", "data": payload},
+        {"type": "ws.event", "text": dumps(payload).decode()},
     )
 
 
@@ -52,13 +60,15 @@ def notify_task_change(task, action, old_assigned_to_id=None):
         "message": f"Задача '{task.name}' больше не назначена вам",
     }
 
-    for user_id in recipients:
-        user = User.objects.filter(id=user_id).first()
-        if not user:
-            continue
+    # Получатели с профилями — одним запросом, онлайн-статус — одним SMISMEMBER
+    users = User.objects.filter(id__in=recipients).select_related("profile")
+    online = online_user_ids(recipients)
+    # Данные задачи сериализуются один раз на событие
+    task_data = None
 
+    for user in users:
         # task_updated всегда
-        if is_online(user.id):
+        if user.id in online:
             action_new = action
             if old_assigned_to_id != task.assigned_to_id:
                 if user.id == task.assigned_to_id:
@@ -66,11 +76,14 @@ def notify_task_change(task, action, old_assigned_to_id=None):
                 elif user.id == old_assigned_to_id:
                     action_new = "deleted"
 
+            if task_data is None:
+                task_data = TaskSerializer(task).data
+
             # payload для task_updated
             payload_updated = {
                 "type": "task_updated",
                 "action": action_new,
-                "task": TaskSerializer(task).data,
+                "task": task_data,
             }
             ws_send_user(user.id, payload_updated)
 
@@ -83,7 +96,111 @@ def notify_task_change(task, action, old_assigned_to_id=None):
             else:
                 continue  # владелец списка уведомление не получает
 
-            if is_online(user.id):
+            if user.id in online:
                 ws_send_user(user.id, payload)
             elif getattr(getattr(user, "profile", None), "telegram_id", None):
                 send_telegram_message(user.profile.telegram_id, payload["message"])
+
+
+def notify_tasks_batch(changes):
+    """
+    Отправляет одно объединённое уведомление каждому затронутому пользователю.
+
+    changes: список `(task, action, old_assigned_to_id)`.
+
+    - tasks_batch со списком `{"action", "task"}` — онлайн-получателям
+    - task_notify / Telegram — одно сообщение о всех назначениях и снятиях
+    """
+    updates = defaultdict(list)
+    assigned = defaultdict(list)
+    unassigned = defaultdict(list)
+
+    tasks = [task for task, _, _ in changes]
+    serialized = TaskSerializer(tasks, many=True).data
+
+    for (task, action, old_assigned_to_id), task_data in zip(
+        changes, serialized, strict=True
+    ):
+        owner_id = task.list_tasks.owner_id if task.list_tasks_id else None
+        recipients = {task.assigned_to_id, old_assigned_to_id, owner_id} - {None}
+        reassigned = old_assigned_to_id != task.assigned_to_id
+
+        for user_id in recipients:
+            action_new = action
+            if reassigned:
+                if user_id == task.assigned_to_id:
+                    action_new = "created"
+                elif user_id == old_assigned_to_id:
+                    action_new = "deleted"
+            updates[user_id].append({"action": action_new, "task": task_data})
+
+        if reassigned:
+            if task.assigned_to_id:
+                assigned[task.assigned_to_id].append(task.name)
+            if old_assigned_to_id:
+                unassigned[old_assigned_to_id].append(task.name)
+
+    if not updates:
+        return
+
+    users = User.objects.filter(id__in=updates).select_related("profile")
+    online = online_user_ids(updates)
+    telegram_messages = []
+
+    for user in users:
+        lines = []
+        if assigned[user.id]:
+            lines.append("Вам назначены задачи: " + ", ".join(assigned[user.id]))
+        if unassigned[user.id]:
+            lines.append(
+                "Задачи больше не назначены вам: " + ", ".join(unassigned[user.id])
+            )
+        message = "\n".join(lines)
+
+        if user.id in online:
+            ws_send_user(user.id, {"type": "tasks_batch", "changes": updates[user.id]})
+            if message:
+                ws_send_user(user.id, {"type": "task_notify", "message": message})
+        elif message and getattr(getattr(user, "profile", None), "telegram_id", None):
+            telegram_messages.append((user.profile.telegram_id, message))
+
+    if telegram_messages:
+        send_telegram_messages(telegram_messages)
+
+
+def notify_tasks_imported(list_task, count, assigned_counts):
+    """
+    Одно уведомление об импорте задач в список.
+
+    assigned_counts: `{user_id: число назначенных задач}`.
+
+    - tasks_imported — владельцу и исполнителям онлайн (клиент перечитывает список)
+    - task_notify / Telegram — исполнителям, сколько задач им назначено
+    """
+    recipients = set(assigned_counts) | {list_task.owner_id}
+    users = User.objects.filter(id__in=recipients).select_related("profile")
+    online = online_user_ids(recipients)
+    payload_imported = {
+        "type": "tasks_imported",
+        "list_id": list_task.id,
+        "count": count,
+    }
+    telegram_messages = []
+
+    for user in users:
+        if user.id in online:
+            ws_send_user(user.id, payload_imported)
+
+        if not assigned_counts.get(user.id):
+            continue
+        message = (
+            f"Вам назначено задач: {assigned_counts[user.id]} "
+            f"(список «{list_task.name}»)"
+        )
+        if user.id in online:
+            ws_send_user(user.id, {"type": "task_notify", "message": message})
+        elif getattr(getattr(user, "profile", None), "telegram_id", None):
+            telegram_messages.append((user.profile.telegram_id, message))
+
+    if telegram_messages:
+        send_telegram_messages(telegram_messages)
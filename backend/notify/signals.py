@@ -5,28 +5,32 @@ These signals are connected to Task model to send notifications when a task is c
 updated, or deleted.
 """
 
-from django.db.models.signals import pre_save, post_save, post_delete
-from django.dispatch import receiver
-
-from tasks.models import Task
-from .service import notify_task_change
+import logging
 
-# Словарь для хранения предыдущего состояния assigned_to
-_task_previous_state = {}
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from redis.exceptions import RedisError
 
+from tasks import cache as page_cache
+from tasks.models import ListTask, Task, TaskStatus
+from tasks.signals import (
+    in_bulk_deletion,
+    tasks_changed,
+    tasks_deleted,
+    tasks_imported,
+    tasks_updated,
+)
+from .deadlines import schedule_deadline
+from .tasks import (
+    dispatch_task_change,
+    dispatch_tasks_batch,
+    dispatch_tasks_deleted,
+    dispatch_tasks_imported,
+    dispatch_tasks_updated,
+)
 
-@receiver(pre_save, sender=Task)
-def on_task_pre_save(sender, instance, **kwargs):
-    """Сигнал перед сохранением задачи."""
-    if instance.pk:
-        try:
-            # Сохраняет предыдущее состояние assigned_to.
-            old_instance = Task.objects.get(pk=instance.pk)
-            _task_previous_state[instance.pk] = {
-                "assigned_to_id": old_instance.assigned_to_id
-            }
-        except Task.DoesNotExist:
-            pass
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Task)
@@ -36,18 +40,26 @@ def on_task_saved(sender, instance: Task, created, **kwargs):
 
     Вызывает сервис уведомлений.
     """
-    # Получаем старое значение assigned_to
-    old_assigned_to_id = _task_previous_state.get(instance.pk, {}).get("assigned_to_id")
+    # Старое значение assigned_to запомнено моделью при загрузке из БД
+    old_assigned_to_id = instance.get_loaded_value("assigned_to_id")
 
     action = "updated"
     if created:
         action = "created"
 
-    notify_task_change(instance, action, old_assigned_to_id=old_assigned_to_id)
+    enqueue_task_change(instance, action, old_assigned_to_id=old_assigned_to_id)
+    invalidate_page_cache(
+        user_ids={instance.assigned_to_id, old_assigned_to_id},
+        list_ids={instance.list_tasks_id},
+    )
 
-    # Удаляем из кэша
-    if instance.pk in _task_previous_state:
-        del _task_previous_state[instance.pk]
+    # Индекс дедлайнов трогаем, только если изменились срок или статус
+    if (
+        created
+        or instance.get_loaded_value("complete_before") != instance.complete_before
+        or instance.get_loaded_value("status") != instance.status
+    ):
+        sync_task_deadline(instance.pk, instance.complete_before, instance.status)
 
 
 @receiver(post_delete, sender=Task)
@@ -55,7 +67,115 @@ def on_task_deleted(sender, instance: Task, **kwargs):
     """
     Сигнал после удаления задачи.
 
-    Вызывает сервис уведомлений.
+    Вызывает сервис уведомлений. При массовом удалении уведомляет `tasks_deleted`.
     """
+    if in_bulk_deletion():
+        return
     # Отправляем уведомление об удалении
-    notify_task_change(instance, "deleted")
+    enqueue_task_change(instance, "deleted")
+    sync_task_deadline(instance.pk, None, instance.status)
+    invalidate_page_cache(
+        user_ids={instance.assigned_to_id}, list_ids={instance.list_tasks_id}
+    )
+
+
+@receiver(post_save, sender=ListTask)
+def on_list_saved(sender, instance: ListTask, created, **kwargs):
+    """Имя списка входит в страницы задач — сбрасываем их кэш."""
+    if not created:
+        list_id = instance.pk
+        transaction.on_commit(lambda: page_cache.invalidate_list(list_id))
+
+
+@receiver(post_delete, sender=ListTask)
+def on_list_deleted(sender, instance: ListTask, **kwargs):
+    """Поколение удалённого списка сбрасывается, даже если задач в нём не было."""
+    invalidate_page_cache(list_ids={instance.pk})
+
+
+@receiver(tasks_updated, sender=Task)
+def on_tasks_updated(sender, task_ids, fields=None, **kwargs):
+    """Сигнал после массового UPDATE задач: уведомления после коммита."""
+    task_ids = list(task_ids)
+    if task_ids:
+        transaction.on_commit(lambda: page_cache.invalidate_tasks(task_ids))
+        transaction.on_commit(lambda: dispatch_tasks_updated.delay(task_ids, fields))
+
+
+@receiver(tasks_changed, sender=Task)
+def on_tasks_changed(sender, changes, **kwargs):
+    """Сигнал после массовых операций: одна пачка уведомлений после коммита."""
+    changes = [list(change) for change in changes]
+    if changes:
+        task_ids = [task_id for task_id, _, _ in changes]
+        old_assignees = {old_assigned_to_id for _, _, old_assigned_to_id in changes}
+        transaction.on_commit(
+            lambda: page_cache.invalidate_tasks(task_ids, user_ids=old_assignees)
+        )
+        transaction.on_commit(lambda: dispatch_tasks_batch.delay(changes))
+
+
+@receiver(tasks_deleted, sender=Task)
+def on_tasks_deleted(sender, tasks, **kwargs):
+    """Сигнал после массового удаления: одна пачка уведомлений после коммита."""
+    tasks = [dict(task) for task in tasks]
+    if tasks:
+        invalidate_page_cache(
+            user_ids={task["assigned_to_id"] for task in tasks},
+            list_ids={task["list_tasks_id"] for task in tasks},
+        )
+        transaction.on_commit(lambda: dispatch_tasks_deleted.delay(tasks))
+
+
+@receiver(tasks_imported, sender=Task)
+def on_tasks_imported(sender, list_id, task_ids, **kwargs):
+    """Сигнал после импорта задач: одно сводное уведомление после коммита."""
+    task_ids = list(task_ids)
+    transaction.on_commit(lambda: page_cache.invalidate_list(list_id))
+    transaction.on_commit(lambda: dispatch_tasks_imported.delay(list_id, task_ids))
+
+
+def enqueue_task_change(task, action, old_assigned_to_id=None):
+    """
+    Ставит рассылку уведомлений в очередь Celery после фиксации транзакции.
+
+    В задачу передаются только id; для удалённой задачи — снимок её полей.
+    """
+    task_id = task.pk
+    task_fields = None
+    if action == "deleted":
+        task_fields = {
+            "name": task.name,
+            "status": task.status,
+            "list_tasks_id": task.list_tasks_id,
+            "assigned_to_id": task.assigned_to_id,
+        }
+    transaction.on_commit(
+        lambda: dispatch_task_change.delay(
+            task_id, action, old_assigned_to_id, task_fields
+        )
+    )
+
+
+def invalidate_page_cache(user_ids=(), list_ids=()):
+    """Сбрасывает кэш страниц задач после фиксации транзакции."""
+    user_ids, list_ids = set(user_ids), set(list_ids)
+    transaction.on_commit(lambda: page_cache.invalidate(user_ids, list_ids))
+
+
+def sync_task_deadline(task_id, complete_before, status):
+    """
+    Актуализирует индекс дедлайнов после фиксации транзакции.
+
+    Индекс — оптимизация: при ошибке Redis задачу подберёт `check_overdue_tasks`.
+    """
+    if status in (TaskStatus.COMPLETED, TaskStatus.OVERDUE):
+        complete_before = None
+
+    def _sync():
+        try:
+            schedule_deadline(task_id, complete_before)
+        except RedisError:
+            logger.exception(f"Не удалось обновить дедлайн задачи {task_id}")
+
+    transaction.on_commit(_sync)
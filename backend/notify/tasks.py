@@ -0,0 +1,182 @@
+"""
+Celery tasks for delivering task change notifications.
+
+Notifications are dispatched after the transaction commits, so API requests do not wait
+for Redis, the channel layer or the Telegram API.
+"""
+
+import logging
+from collections import Counter
+
+from celery import shared_task
+from redis.exceptions import RedisError
+
+from tasks.models import ListTask, Task, TaskStatus, User
+from .deadlines import cancel_deadlines, schedule_deadline, schedule_deadlines
+from .service import notify_task_change, notify_tasks_batch, notify_tasks_imported
+from .telegram import send_telegram_messages
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def dispatch_task_change(task_id, action, old_assigned_to_id=None, task_fields=None):
+    """
+    Загружает задачу по id и рассылает уведомления об изменении.
+
+    Для удалённых задач строки в БД уже нет, поэтому передаются `task_fields` —
+    снимок полей, по которым задача восстанавливается без сохранения.
+    """
+    if task_fields is not None:
+        task = Task(id=task_id, **task_fields)
+    else:
+        task = (
+            Task.objects.filter(id=task_id)
+            .select_related("list_tasks", "assigned_to")
+            .first()
+        )
+        if task is None:
+            return  # задачу успели удалить — уведомит on_task_deleted
+    notify_task_change(task, action, old_assigned_to_id=old_assigned_to_id)
+
+
+def sync_deadline(task):
+    """Переносит дедлайн задачи в индекс; завершённые задачи из него убирает."""
+    terminal = task.status in (TaskStatus.COMPLETED, TaskStatus.OVERDUE)
+    try:
+        schedule_deadline(task.id, None if terminal else task.complete_before)
+    except RedisError:
+        logger.exception(f"Не удалось обновить дедлайн задачи {task.id}")
+
+
+def sync_deadlines(tasks):
+    """
+    То же для пачки задач: один ZADD для активных и один ZREM для остальных.
+
+    Задача без срока из индекса тоже убирается.
+    """
+    active, finished = {}, []
+    for task in tasks:
+        terminal = task.status in (TaskStatus.COMPLETED, TaskStatus.OVERDUE)
+        if terminal or task.complete_before is None:
+            finished.append(task.id)
+        else:
+            active[task.id] = task.complete_before
+    try:
+        schedule_deadlines(active)
+        cancel_deadlines(finished)
+    except RedisError:
+        logger.exception("Не удалось обновить дедлайны пачки задач")
+
+
+@shared_task
+def dispatch_tasks_updated(task_ids, fields=None):
+    """
+    Уведомления и индекс дедлайнов для задач, изменённых массовым UPDATE.
+
+    Исполнитель в таких обновлениях не меняется, поэтому прежним считается текущий.
+    """
+    tasks = Task.objects.filter(id__in=task_ids).select_related(
+        "list_tasks", "assigned_to"
+    )
+    for task in tasks:
+        notify_task_change(task, "updated", old_assigned_to_id=task.assigned_to_id)
+
+        if fields is None or {"status", "complete_before"} & set(fields):
+            sync_deadline(task)
+
+
+@shared_task
+def dispatch_tasks_batch(changes):
+    """
+    Объединённые уведомления и индекс дедлайнов после массовых операций.
+
+    changes: список `[task_id, action, old_assigned_to_id]`.
+    """
+    tasks = Task.objects.filter(id__in=[task_id for task_id, _, _ in changes])
+    tasks = {
+        task.id: task for task in tasks.select_related("list_tasks", "assigned_to")
+    }
+    batch = [
+        (tasks[task_id], action, old_assigned_to_id)
+        for task_id, action, old_assigned_to_id in changes
+        if task_id in tasks
+    ]
+    notify_tasks_batch(batch)
+    sync_deadlines(task for task, _, _ in batch)
+
+
+@shared_task
+def dispatch_tasks_deleted(tasks):
+    """
+    Объединённые уведомления после массового удаления задач.
+
+    Строк в БД уже нет: задачи восстанавливаются из снимков, списки и исполнители
+    подгружаются одним запросом каждый.
+    """
+    lists = ListTask.objects.in_bulk({task["list_tasks_id"] for task in tasks})
+    users = User.objects.in_bulk(
+        {task["assigned_to_id"] for task in tasks if task["assigned_to_id"]}
+    )
+    batch = []
+    for fields in tasks:
+        task = Task(
+            id=fields["id"],
+            name=fields["name"],
+            status=fields["status"],
+            list_tasks_id=fields["list_tasks_id"],
+            assigned_to_id=fields["assigned_to_id"],
+        )
+        # Связи из загруженных словарей, без запроса на каждую задачу
+        task.list_tasks = lists.get(task.list_tasks_id) or ListTask(
+            id=task.list_tasks_id, owner_id=fields["owner_id"]
+        )
+        task.assigned_to = users.get(task.assigned_to_id)
+        batch.append((task, "deleted", task.assigned_to_id))
+    notify_tasks_batch(batch)
+
+    try:
+        cancel_deadlines(task["id"] for task in tasks)
+    except RedisError:
+        logger.exception("Не удалось убрать дедлайны удалённых задач")
+
+
+@shared_task
+def dispatch_tasks_imported(list_id, task_ids, chunk_size=1000):
+    """
+    Сводное уведомление и индекс дедлайнов после импорта задач в список.
+
+    Задачи читаются пачками только нужными полями; дедлайны пишутся одним ZADD
+    на пачку.
+    """
+    list_task = ListTask.objects.filter(id=list_id).first()
+    if list_task is None:
+        return
+
+    assigned_counts = Counter()
+    count = 0
+    for start in range(0, len(task_ids), chunk_size):
+        rows = Task.objects.filter(id__in=task_ids[start : start + chunk_size])
+        deadlines = {}
+        for task_id, assigned_to_id, complete_before, status in rows.values_list(
+            "id", "assigned_to_id", "complete_before", "status"
+        ):
+            count += 1
+            if assigned_to_id:
+                assigned_counts[assigned_to_id] += 1
+            terminal = status in (TaskStatus.COMPLETED, TaskStatus.OVERDUE)
+            if complete_before is not None and not terminal:
+                deadlines[task_id] = complete_before
+        try:
+            schedule_deadlines(deadlines)
+        except RedisError:
+            logger.exception(f"Не удалось обновить дедлайны импорта в список {list_id}")
+
+    if count:
+        notify_tasks_imported(list_task, count, dict(assigned_counts))
+
+
+@shared_task
+def send_telegram_batch(messages, attempt=1):
+    """Отправляет отложенную пачку сообщений `(chat_id, text)` в Telegram."""
+    send_telegram_messages([tuple(message) for message in messages], attempt=attempt)
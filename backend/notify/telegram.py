@@ -1,13 +1,244 @@
-"""Telegram notification sending module."""
+"""
+Telegram notification sending module.
 
+Сообщения отправляются через общий пул HTTPS-соединений с ограничением скорости
+по лимитам Telegram: глобально (~30 сообщений/с) и на каждый чат (~1 сообщение/с).
+Ответ 429 с `retry_after` возвращает сообщение в очередь повторов.
+"""
+
+import heapq
+import itertools
 import logging
+import threading
+import time
 
 import requests
-
-from config.settings import TELEGRAM_BOT_TOKEN
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
-API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+
+# Сколько раз повторять сообщение после 429/5xx/сетевой ошибки
+MAX_ATTEMPTS = 3
+# Дольше этого внутри одного вызова не ждём — сообщение откладывается
+MAX_WAIT = 5.0
+# С какого числа вёдер чатов начинать удалять простаивающие
+CHAT_BUCKETS_PRUNE_AT = 1024
+
+
+class TokenBucket:
+    """Ведро токенов: `rate` токенов в секунду, не больше `capacity` в запасе."""
+
+    def __init__(self, rate: float, capacity: float | None = None):  # noqa
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = None
+
+    def _refill(self, now: float) -> None:
+        if self.updated is not None:
+            elapsed = max(now - self.updated, 0.0)
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Через сколько секунд будет доступен токен (0 — уже доступен)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        """Ведро снова полное — оно не отличается от нового."""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def consume(self, now: float) -> None:  # noqa
+        self._refill(now)
+        self.tokens -= 1
+
+
+class TelegramSender:
+    """
+    Отправитель сообщений Telegram с пулом соединений и ограничением скорости.
+
+    `send_batch` отправляет пачку сообщений, соблюдая лимиты и повторяя
+    сообщения после 429 с учётом `retry_after`. Сообщения, ждать которые
+    дольше `max_wait`, возвращаются вызывающему коду для отложенной отправки.
+    """
+
+    def __init__(  # noqa
+        self,
+        token: str,
+        api_url: str = "https://api.telegram.org",
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        pool_size: int = 10,
+        timeout: float = 5,
+        max_attempts: int = MAX_ATTEMPTS,
+        max_wait: float = MAX_WAIT,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.url = f"{api_url.rstrip('/')}/bot{token}/sendMessage"
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_buckets: dict[int, TokenBucket] = {}
+        self.chat_buckets_prune_at = CHAT_BUCKETS_PRUNE_AT
+        # Лимиты общие для всех потоков процесса
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def send(self, chat_id: int, text: str) -> bool:
+        """Отправляет одно сообщение; True, если Telegram его принял."""
+        return self.send_batch([(chat_id, text)]) == ([], [])
+
+    def send_batch(self, messages):
+        """
+        Отправляет пачку сообщений `(chat_id, text)`.
+
+        Возвращает `(deferred, failed)`: отложенные сообщения в виде
+        `(retry_in, chat_id, text)` и сообщения, которые доставить не удалось.
+        """
+        counter = itertools.count()
+        now = self.clock()
+        queue = [(now, next(counter), 1, chat_id, text) for chat_id, text in messages]
+        heapq.heapify(queue)
+        deferred, failed = [], []
+
+        while queue:
+            ready_at, _, attempt, chat_id, text = heapq.heappop(queue)
+            now = self.clock()
+
+            with self.lock:
+                chat_bucket = self._chat_bucket(chat_id, now)
+                wait = max(ready_at - now, chat_bucket.wait_time(now))
+            if wait > 0:
+                if wait > self.max_wait:
+                    deferred.append((wait, chat_id, text))
+                elif queue and queue[0][0] < now + wait:
+                    # Пока этот чат ждёт, отправляем сообщения в другие чаты
+                    heapq.heappush(
+                        queue, (now + wait, next(counter), attempt, chat_id, text)
+                    )
+                else:
+                    self.sleep(wait)
+                    heapq.heappush(
+                        queue, (now + wait, next(counter), attempt, chat_id, text)
+                    )
+                continue
+
+            self._acquire(chat_bucket)
+            retry_after = self._post(chat_id, text)
+            if retry_after is None:
+                continue
+            if retry_after is False or attempt >= self.max_attempts:
+                failed.append((chat_id, text))
+                continue
+            heapq.heappush(
+                queue,
+                (self.clock() + retry_after, next(counter), attempt + 1, chat_id, text),
+            )
+
+        return deferred, failed
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self.chat_buckets_prune_at:
+                self._prune_chat_buckets(now)
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, 1)
+        return bucket
+
+    def _prune_chat_buckets(self, now: float) -> None:
+        """
+        Удаляет вёдра чатов, которые снова заполнились.
+
+        Порог удваивается по числу оставшихся вёдер, чтобы при множестве
+        активных чатов проход не выполнялся на каждое новое ведро.
+        """
+        self.chat_buckets = {
+            chat_id: bucket
+            for chat_id, bucket in self.chat_buckets.items()
+            if not bucket.is_full(now)
+        }
+        self.chat_buckets_prune_at = max(
+            CHAT_BUCKETS_PRUNE_AT, 2 * len(self.chat_buckets)
+        )
+
+    def _acquire(self, chat_bucket: TokenBucket) -> None:
+        """Ждёт глобальный токен и списывает токены глобального и чатового вёдер."""
+        while True:
+            with self.lock:
+                now = self.clock()
+                wait = self.global_bucket.wait_time(now)
+                if wait <= 0:
+                    self.global_bucket.consume(now)
+                    chat_bucket.consume(now)
+                    return
+            self.sleep(wait)
+
+    def _post(self, chat_id: int, text: str):
+        """
+        Выполняет запрос sendMessage.
+
+        Возвращает None при успехе, число секунд до повтора для 429/5xx/сетевых
+        ошибок и False для ошибок, которые повторять бессмысленно.
+        """
+        try:
+            response = self.session.post(
+                self.url, json={"chat_id": chat_id, "text": text}, timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Ошибка при отправке сообщения в Telegram: {e}")
+            return 1.0
+
+        if response.status_code == 200:
+            return None
+        if response.status_code == 429:
+            try:
+                retry_after = response.json()["parameters"]["retry_after"]
+            except (ValueError, KeyError, TypeError):
+                retry_after = 1.0
+            logger.info(f"Telegram 429 для чата {chat_id}, повтор через {retry_after}с")
+            return float(retry_after)
+        if response.status_code >= 500:
+            return 1.0
+
+        logger.error(
+            f"Telegram отклонил сообщение для чата {chat_id}: "
+            f"{response.status_code} {response.text}"
+        )
+        return False
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender() -> TelegramSender:
+    """Общий для процесса отправитель (пул соединений и лимиты)."""
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                _sender = TelegramSender(
+                    settings.TELEGRAM_BOT_TOKEN,
+                    api_url=settings.TELEGRAM_API_URL,
+                    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+                    chat_rate=settings.TELEGRAM_CHAT_RATE,
+                )
+    return _sender
 
 
 def send_telegram_message(chat_id: int, text: str):
@@ -17,9 +248,33 @@ def send_telegram_message(chat_id: int, text: str):
     Аргументы:     chat_id (int): Идентификатор чата, на который нужно отправить
     сообщение.     text (str): Текст сообщения.
     """
+    send_telegram_messages([(chat_id, text)])
+
+
+def send_telegram_messages(messages, attempt: int = 1):
+    """
+    Отправляет пачку сообщений `(chat_id, text)` с соблюдением лимитов Telegram.
+
+    Сообщения, которые нельзя отправить сразу (долгий `retry_after`), ставятся
+    в Celery-задачу `send_telegram_batch` с задержкой.
+    """
     try:
-        requests.post(API_URL, json={"chat_id": chat_id, "text": text}, timeout=15)
-    except requests.exceptions.RequestException as e:
-        logger.exception(f"Ошибка при отправке сообщения в Telegram: {e}")
-    except Exception as e:
-        logger.exception(f"Неожиданная ошибка: {e}")
+        deferred, failed = get_sender().send_batch(messages)
+    except requests.RequestException as e:
+        logger.exception(f"Ошибка при отправке сообщений в Telegram: {e}")
+        return
+
+    for chat_id, _ in failed:
+        logger.error(f"Сообщение для чата {chat_id} не доставлено")
+
+    if deferred:
+        if attempt >= MAX_ATTEMPTS:
+            logger.error(f"Не доставлено {len(deferred)} отложенных сообщений Telegram")
+            return
+        from .tasks import send_telegram_batch
+
+        countdown = max(retry_in for retry_in, _, _ in deferred)
+        send_telegram_batch.apply_async(
+            args=([(chat_id, text) for _, chat_id, text in deferred], attempt + 1),
+            countdown=countdown,
+        )
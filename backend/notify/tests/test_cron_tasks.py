@@ -0,0 +1,185 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from accounts.models import Profile
+from notify.cron_tasks import (
+    check_overdue_tasks,
+    fire_due_deadlines,
+    rebuild_deadline_index,
+)
+from tasks.models import ListTask, Task, TaskStatus
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.fixture
+def make_task(list_task, user):
+    def _make(name, days, status=None, assigned_to=user):
+        with patch("notify.signals.enqueue_task_change"):
+            task = Task.objects.create(
+                name=name,
+                list_tasks=list_task,
+                assigned_to=assigned_to,
+                complete_before=timezone.now() + timedelta(days=days),
+            )
+        if status:
+            Task.objects.filter(id=task.id).update(status=status)
+        return task
+
+    return _make
+
+
+@pytest.mark.django_db
+@patch("notify.cron_tasks.send_telegram_messages")
+@patch("notify.cron_tasks.ws_send_user")
+@patch("notify.cron_tasks.online_user_ids")
+def test_check_overdue_tasks_bulk(
+    mock_online_user_ids,
+    mock_ws_send_user,
+    mock_send_telegram_messages,
+    make_task,
+    user,
+):
+    mock_online_user_ids.return_value = {user.id}
+    overdue = [make_task(f"Overdue {i}", days=-1) for i in range(5)]
+    future = make_task("Future", days=1)
+    completed = make_task("Completed", days=-1, status=TaskStatus.COMPLETED)
+
+    assert check_overdue_tasks(chunk_size=2) == 5
+
+    statuses = dict(Task.objects.values_list("id", "status"))
+    assert all(statuses[t.id] == TaskStatus.OVERDUE for t in overdue)
+    assert statuses[future.id] == TaskStatus.IN_PROGRESS
+    assert statuses[completed.id] == TaskStatus.COMPLETED
+
+    # task_updated + task_notify для каждой просроченной задачи
+    assert mock_ws_send_user.call_count == 10
+    mock_send_telegram_messages.assert_not_called()
+
+    # Повторный запуск ничего не меняет
+    assert check_overdue_tasks() == 0
+
+
+@pytest.mark.django_db
+@patch("notify.cron_tasks.send_telegram_messages")
+@patch("notify.cron_tasks.ws_send_user")
+@patch("notify.cron_tasks.online_user_ids")
+def test_check_overdue_tasks_telegram(
+    mock_online_user_ids,
+    mock_ws_send_user,
+    mock_send_telegram_messages,
+    make_task,
+    user,
+):
+    mock_online_user_ids.return_value = set()
+    Profile.objects.create(user=user, telegram_id=12345)
+    make_task("Overdue", days=-1)
+    make_task("Unassigned", days=-1, assigned_to=None)
+
+    assert check_overdue_tasks() == 2
+
+    mock_ws_send_user.assert_not_called()
+    mock_send_telegram_messages.assert_called_once_with(
+        [(12345, "Задача 'Overdue' просрочена!")]
+    )
+
+
+@pytest.mark.django_db
+@patch("notify.cron_tasks.send_telegram_messages")
+@patch("notify.cron_tasks.ws_send_user")
+@patch("notify.cron_tasks.online_user_ids")
+def test_check_overdue_tasks_list_owner(
+    mock_online_user_ids,
+    mock_ws_send_user,
+    mock_send_telegram_messages,
+    make_task,
+    user,
+):
+    assignee = User.objects.create(username="assignee", password="testpassword")
+    mock_online_user_ids.return_value = {user.id, assignee.id}
+    assigned = make_task("Assigned", days=-1, assigned_to=assignee)
+    unassigned = make_task("Unassigned", days=-1, assigned_to=None)
+
+    assert check_overdue_tasks() == 2
+
+    sent = [
+        (call.args[0], call.args[1]["type"], call.args[1]["task"]["id"])
+        for call in mock_ws_send_user.call_args_list
+    ]
+    # Владелец списка получает task_updated по обеим задачам, исполнитель — и просрочку
+    assert sorted(sent) == sorted(
+        [
+            (user.id, "task_updated", assigned.id),
+            (user.id, "task_updated", unassigned.id),
+            (assignee.id, "task_updated", assigned.id),
+            (assignee.id, "task_notify", assigned.id),
+        ]
+    )
+
+
+@pytest.mark.django_db
+@patch("notify.cron_tasks.notify_overdue_tasks")
+@patch("notify.cron_tasks.pop_due_deadlines")
+def test_fire_due_deadlines(mock_pop_due, mock_notify_overdue, make_task):
+    due = make_task("Due", days=-1)
+    moved = make_task("Moved", days=1)
+    completed = make_task("Completed", days=-1, status=TaskStatus.COMPLETED)
+    mock_pop_due.side_effect = [[due.id, moved.id, completed.id], []]
+
+    assert fire_due_deadlines() == 1
+
+    statuses = dict(Task.objects.values_list("id", "status"))
+    assert statuses[due.id] == TaskStatus.OVERDUE
+    assert statuses[moved.id] == TaskStatus.IN_PROGRESS
+    assert statuses[completed.id] == TaskStatus.COMPLETED
+    mock_notify_overdue.delay.assert_called_once_with([due.id])
+
+
+@pytest.mark.django_db
+@patch("notify.signals.schedule_deadline")
+def test_deadline_index_synced_on_commit(
+    mock_schedule, make_task, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        task = make_task("Scheduled", days=1)
+    mock_schedule.assert_called_once_with(task.id, task.complete_before)
+
+    mock_schedule.reset_mock()
+    with django_capture_on_commit_callbacks(execute=True):
+        with patch("notify.signals.enqueue_task_change"):
+            task.status = TaskStatus.COMPLETED
+            task.save()
+    mock_schedule.assert_called_once_with(task.id, None)
+
+
+@pytest.mark.django_db
+@patch("notify.cron_tasks.schedule_deadlines")
+def test_rebuild_deadline_index(mock_schedule, make_task, list_task):
+    active = [make_task(f"Active {i}", days=i + 1) for i in range(3)]
+    make_task("Done", days=1, status=TaskStatus.COMPLETED)
+    make_task("Late", days=-1, status=TaskStatus.OVERDUE)
+    with patch("notify.signals.enqueue_task_change"):
+        Task.objects.create(name="No deadline", list_tasks=list_task)
+
+    assert rebuild_deadline_index(chunk_size=2) == 3
+
+    # Пачки по 2 задачи, по одному ZADD на пачку
+    assert [len(call.args[0]) for call in mock_schedule.call_args_list] == [2, 1]
+    indexed = {}
+    for call in mock_schedule.call_args_list:
+        indexed.update(call.args[0])
+    assert indexed == {task.id: task.complete_before for task in active}
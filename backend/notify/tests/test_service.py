@@ -27,10 +27,10 @@ def list_task(user):
 @pytest.mark.django_db
 @patch('notify.service.send_telegram_message')
 @patch('notify.service.ws_send_user')
-@patch('notify.service.is_online')
-def test_notify_task_change_created(mock_is_online, mock_ws_send_user, mock_send_telegram_message, list_task, user, another_user):
+@patch('notify.service.online_user_ids')
+def test_notify_task_change_created(mock_online_user_ids, mock_ws_send_user, mock_send_telegram_message, list_task, user, another_user):
     from notify.service import notify_task_change
-    mock_is_online.return_value = True
+    mock_online_user_ids.return_value = {user.id, another_user.id}
 
     task = Task(name="New Task", list_tasks=list_task, assigned_to=another_user)
     notify_task_change(task, "created")
@@ -65,10 +65,10 @@ def test_notify_task_change_created(mock_is_online, mock_ws_send_user, mock_send
 @pytest.mark.django_db
 @patch('notify.service.send_telegram_message')
 @patch('notify.service.ws_send_user')
-@patch('notify.service.is_online')
-def test_notify_task_change_updated(mock_is_online, mock_ws_send_user, mock_send_telegram_message, list_task, user, another_user):
+@patch('notify.service.online_user_ids')
+def test_notify_task_change_updated(mock_online_user_ids, mock_ws_send_user, mock_send_telegram_message, list_task, user, another_user):
     from notify.service import notify_task_change
-    mock_is_online.return_value = False
+    mock_online_user_ids.return_value = set()
     Profile.objects.create(user=user, telegram_id=12345)
     Profile.objects.create(user=another_user, telegram_id=54321)
 
@@ -77,3 +77,87 @@ def test_notify_task_change_updated(mock_is_online, mock_ws_send_user, mock_send
 
     assert mock_ws_send_user.call_count == 0
     assert mock_send_telegram_message.call_count == 2
+
+
+@pytest.mark.django_db
+@patch('notify.service.send_telegram_message')
+@patch('notify.service.ws_send_user')
+@patch('notify.service.online_user_ids')
+def test_notify_task_change_batched(
+    mock_online_user_ids,
+    mock_ws_send_user,
+    mock_send_telegram_message,
+    list_task,
+    user,
+    another_user,
+    django_assert_num_queries,
+):
+    from notify.service import notify_task_change
+    third_user = User.objects.create(username="thirduser", password="testpassword")
+    Profile.objects.create(user=another_user, telegram_id=54321)
+    Profile.objects.create(user=third_user, telegram_id=98765)
+    mock_online_user_ids.return_value = {user.id}
+
+    task = Task(name="Batched Task", list_tasks=list_task, assigned_to=another_user)
+
+    # Все получатели вместе с профилями загружаются одним запросом
+    with django_assert_num_queries(1):
+        notify_task_change(task, "updated", old_assigned_to_id=third_user.id)
+
+    mock_online_user_ids.assert_called_once_with(
+        {user.id, another_user.id, third_user.id}
+    )
+    mock_ws_send_user.assert_called_once()
+    assert mock_send_telegram_message.call_count == 2
+
+
+@pytest.mark.django_db
+@patch('notify.service.send_telegram_messages')
+@patch('notify.service.ws_send_user')
+@patch('notify.service.online_user_ids')
+def test_notify_tasks_batch_coalesced(
+    mock_online_user_ids,
+    mock_ws_send_user,
+    mock_send_telegram_messages,
+    list_task,
+    user,
+    another_user,
+):
+    from notify.service import notify_tasks_batch
+    Profile.objects.create(user=another_user, telegram_id=54321)
+    mock_online_user_ids.return_value = {user.id}
+
+    tasks = [
+        Task(id=i, name=f"Task {i}", list_tasks=list_task, assigned_to=another_user)
+        for i in (1, 2)
+    ]
+    notify_tasks_batch([(task, "updated", None) for task in tasks])
+
+    # Владелец онлайн — одно сообщение tasks_batch с обеими задачами
+    mock_ws_send_user.assert_called_once()
+    user_id, payload = mock_ws_send_user.call_args.args
+    assert user_id == user.id
+    assert payload["type"] == "tasks_batch"
+    assert [change["task"]["id"] for change in payload["changes"]] == [1, 2]
+
+    # Исполнитель офлайн — одно сообщение в Telegram о всех назначениях
+    mock_send_telegram_messages.assert_called_once_with(
+        [(54321, "Вам назначены задачи: Task 1, Task 2")]
+    )
+
+
+@patch('notify.service.channel_layer')
+def test_ws_send_user_encodes_once(mock_layer):
+    from notify.service import ws_send_user
+
+    sent = []
+
+    async def group_send(group, message):
+        sent.append((group, message))
+
+    mock_layer.group_send = group_send
+    ws_send_user(5, {"type": "task_notify", "message": "Задача"})
+
+    assert sent == [
+        ("user_5", {"type": "ws.event", "text": '{"type":"task_notify","message":"Задача"}'})
+    ]
@@ -0,0 +1,196 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from tasks.models import ListTask, Task, TaskStatus
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create(username="anotheruser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.mark.django_db
+@patch("notify.tasks.notify_task_change")
+def test_notification_deferred_until_commit(
+    mock_notify, list_task, user, another_user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks() as callbacks:
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+    # До фиксации транзакции уведомления не отправляются
+    mock_notify.assert_not_called()
+
+    for callback in callbacks:
+        callback()
+    mock_notify.assert_called_once()
+    sent_task, action = mock_notify.call_args.args
+    assert sent_task.id == task.id
+    assert action == "created"
+
+    mock_notify.reset_mock()
+    with django_capture_on_commit_callbacks(execute=True):
+        task.assigned_to = another_user
+        task.save()
+    mock_notify.assert_called_once()
+    assert mock_notify.call_args.args[1] == "updated"
+    assert mock_notify.call_args.kwargs == {"old_assigned_to_id": user.id}
+
+
+@pytest.mark.django_db
+@patch("notify.tasks.notify_task_change")
+def test_deleted_task_dispatched_from_snapshot(
+    mock_notify, list_task, user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+    task_id = task.id
+    mock_notify.reset_mock()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        task.delete()
+
+    mock_notify.assert_called_once()
+    sent_task, action = mock_notify.call_args.args
+    assert action == "deleted"
+    assert sent_task.id == task_id
+    assert sent_task.name == "Task"
+    assert sent_task.assigned_to_id == user.id
+    assert sent_task.list_tasks.owner_id == user.id
+
+
+@pytest.mark.django_db
+@patch("notify.tasks.schedule_deadline")
+@patch("notify.tasks.notify_task_change")
+def test_dispatch_tasks_updated(mock_notify, mock_schedule, list_task, user):
+    with patch("notify.signals.enqueue_task_change"):
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+    Task.objects.filter(id=task.id).update(status=TaskStatus.COMPLETED)
+
+    from notify.tasks import dispatch_tasks_updated
+
+    dispatch_tasks_updated([task.id], ["status"])
+
+    # Исполнитель не менялся — уведомления о назначении не будет
+    mock_notify.assert_called_once()
+    assert mock_notify.call_args.kwargs == {"old_assigned_to_id": user.id}
+    mock_schedule.assert_called_once_with(task.id, None)
+
+
+@pytest.mark.django_db
+@patch("notify.tasks.schedule_deadlines")
+@patch("notify.tasks.notify_tasks_imported")
+def test_dispatch_tasks_imported(
+    mock_notify, mock_schedule, list_task, user, another_user
+):
+    from django.utils import timezone
+
+    from notify.tasks import dispatch_tasks_imported
+
+    deadline = timezone.now()
+    tasks = Task.objects.bulk_create(
+        [
+            Task(
+                name="A",
+                list_tasks=list_task,
+                assigned_to=another_user,
+                complete_before=deadline,
+            ),
+            Task(
+                name="B",
+                list_tasks=list_task,
+                assigned_to=another_user,
+                status=TaskStatus.COMPLETED,
+                complete_before=deadline,
+            ),
+            Task(name="C", list_tasks=list_task),
+        ]
+    )
+
+    dispatch_tasks_imported(list_task.id, [task.id for task in tasks], chunk_size=2)
+
+    mock_notify.assert_called_once_with(list_task, 3, {another_user.id: 2})
+    # Завершённые задачи и задачи без срока в индекс не попадают
+    scheduled = {}
+    for call in mock_schedule.call_args_list:
+        scheduled.update(call.args[0])
+    assert scheduled == {tasks[0].id: deadline}
+
+
+@pytest.mark.django_db
+@patch("notify.tasks.cancel_deadlines")
+@patch("notify.tasks.notify_tasks_batch")
+def test_dispatch_tasks_deleted(
+    mock_batch, mock_cancel, list_task, user, django_assert_num_queries
+):
+    from notify.tasks import dispatch_tasks_deleted
+
+    snapshots = [
+        {
+            "id": i,
+            "name": f"Task {i}",
+            "status": TaskStatus.IN_PROGRESS,
+            "list_tasks_id": list_task.id,
+            "assigned_to_id": user.id,
+            "owner_id": user.id,
+        }
+        for i in range(1, 4)
+    ]
+    # Списки и исполнители — по одному запросу на всю пачку
+    with django_assert_num_queries(2):
+        dispatch_tasks_deleted(snapshots)
+        batch = mock_batch.call_args.args[0]
+        assert [
+            (task.name, task.list_tasks.owner_id, task.assigned_to.username)
+            for task, _, _ in batch
+        ] == [(f"Task {i}", user.id, "testuser") for i in range(1, 4)]
+    assert {action for _, action, _ in batch} == {"deleted"}
+    assert list(mock_cancel.call_args.args[0]) == [1, 2, 3]
+
+
+@pytest.mark.django_db
+@patch("notify.tasks.cancel_deadlines")
+@patch("notify.tasks.schedule_deadlines")
+@patch("notify.tasks.notify_tasks_batch")
+def test_dispatch_tasks_batch_syncs_deadlines_in_bulk(
+    mock_batch, mock_schedule, mock_cancel, list_task, user
+):
+    from django.utils import timezone
+
+    from notify.tasks import dispatch_tasks_batch
+
+    deadline = timezone.now()
+    with patch("notify.signals.enqueue_task_change"):
+        active = Task.objects.create(
+            name="Active",
+            list_tasks=list_task,
+            assigned_to=user,
+            complete_before=deadline,
+        )
+        done = Task.objects.create(
+            name="Done", list_tasks=list_task, complete_before=deadline
+        )
+        no_deadline = Task.objects.create(
+            name="No deadline", list_tasks=list_task, assigned_to=user
+        )
+    Task.objects.filter(id=done.id).update(status=TaskStatus.COMPLETED)
+
+    dispatch_tasks_batch(
+        [[task.id, "updated", user.id] for task in (active, done, no_deadline)]
+    )
+
+    # Один ZADD и один ZREM на всю пачку
+    mock_schedule.assert_called_once_with({active.id: deadline})
+    mock_cancel.assert_called_once_with([done.id, no_deadline.id])
@@ -0,0 +1,148 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from notify.telegram import TelegramSender, TokenBucket
+
+
+class FakeClock:
+    """Часы, которые двигаются только при вызове sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeTelegram(ThreadingHTTPServer):
+    """Локальный HTTP-сервер, имитирующий sendMessage Bot API."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeTelegramHandler)
+        self.received = []
+        # Ответы 429 для первых запросов: chat_id -> retry_after
+        self.throttle = {}
+        self.reject = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        chat_id = body["chat_id"]
+        if chat_id in self.server.throttle:
+            retry_after = self.server.throttle.pop(chat_id)
+            self._reply(429, {"ok": False, "parameters": {"retry_after": retry_after}})
+        elif chat_id in self.server.reject:
+            self._reply(400, {"ok": False, "description": "chat not found"})
+        else:
+            self.server.received.append((chat_id, body["text"]))
+            self._reply(200, {"ok": True})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_telegram():
+    server = FakeTelegram()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_sender(fake_telegram, clock, **kwargs):
+    return TelegramSender(
+        "TOKEN", api_url=fake_telegram.url, clock=clock, sleep=clock.sleep, **kwargs
+    )
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, capacity=2)
+    bucket.consume(0.0)
+    bucket.consume(0.0)
+    assert bucket.wait_time(0.0) == pytest.approx(0.5)
+    assert bucket.wait_time(0.5) == 0.0
+
+
+def test_send_batch_delivers_all(fake_telegram, clock):
+    sender = make_sender(fake_telegram, clock)
+    messages = [(chat_id, f"msg {chat_id}") for chat_id in range(5)]
+
+    assert sender.send_batch(messages) == ([], [])
+    assert sorted(fake_telegram.received) == messages
+
+
+def test_send_batch_respects_limits(fake_telegram, clock):
+    sender = make_sender(fake_telegram, clock, global_rate=2, chat_rate=1)
+    messages = [(1, "a"), (1, "b"), (2, "c"), (3, "d")]
+
+    assert sender.send_batch(messages) == ([], [])
+    assert len(fake_telegram.received) == 4
+    # 4 сообщения при 2/с глобально: ждать минимум секунду
+    assert clock.now >= 1.0
+    # Второе сообщение в чат 1 — не раньше чем через секунду после первого
+    assert [text for chat_id, text in fake_telegram.received if chat_id == 1] == [
+        "a",
+        "b",
+    ]
+
+
+def test_send_batch_honors_retry_after(fake_telegram, clock):
+    fake_telegram.throttle[7] = 3
+    sender = make_sender(fake_telegram, clock)
+
+    assert sender.send_batch([(7, "retry me"), (8, "other")]) == ([], [])
+    assert fake_telegram.received[0] == (8, "other")
+    assert fake_telegram.received[1] == (7, "retry me")
+    assert clock.now >= 3
+
+
+def test_send_batch_defers_long_retry_and_reports_failures(fake_telegram, clock):
+    fake_telegram.throttle[7] = 60
+    fake_telegram.reject.add(9)
+    sender = make_sender(fake_telegram, clock)
+
+    deferred, failed = sender.send_batch([(7, "later"), (9, "bad chat"), (8, "ok")])
+
+    assert [(chat_id, text) for _, chat_id, text in deferred] == [(7, "later")]
+    assert failed == [(9, "bad chat")]
+    assert fake_telegram.received == [(8, "ok")]
+
+
+def test_idle_chat_buckets_pruned(fake_telegram, clock):
+    sender = make_sender(fake_telegram, clock)
+    sender.chat_buckets_prune_at = 3
+
+    sender.send_batch([(1, "a"), (2, "b"), (3, "c")])
+    clock.now += 1
+    sender.send_batch([(3, "d"), (4, "e")])
+
+    # Вёдра чатов 1 и 2 снова полные и удалены; чат 3 только что писал
+    assert set(sender.chat_buckets) == {3, 4}
@@ -0,0 +1,30 @@
+"""
+Access-scoped task queries.
+
+Задача доступна пользователю, если он владелец её списка или исполнитель.
+Вместо `JOIN` с `OR` (`list_tasks__owner=user | assigned_to=user`), который
+планировщик обычно не может обслужить индексами, id доступных задач
+собираются `UNION` двух индексируемых выборок:
+
+- задачи из списков пользователя — `list_tasks_id IN (списки владельца)`;
+- задачи, назначенные пользователю, — `assigned_to_id = user`.
+"""
+
+from .models import ListTask, Task
+
+
+def accessible_task_ids(user):
+    """Подзапрос с id задач, доступных пользователю (`UNION` двух выборок)."""
+    owned = Task.objects.filter(
+        list_tasks__in=ListTask.objects.filter(owner=user).values("id")
+    )
+    assigned = Task.objects.filter(assigned_to=user)
+    # Сортировка модели недопустима в частях UNION
+    return owned.order_by().values("id").union(assigned.order_by().values("id"))
+
+
+def accessible_tasks(user, queryset=None):
+    """Задачи (из `queryset` или всех), доступные пользователю."""
+    if queryset is None:
+        queryset = Task.objects.all()
+    return queryset.filter(id__in=accessible_task_ids(user))
@@ -1,8 +1,24 @@
 """Django admin configuration for the tasks app."""
 
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.db import models
-
+from django.db.models import Prefetch
+
+from .admin_utils import (
+    ActionForm,
+    AutocompleteFilter,
+    LargeTableAdminMixin,
+    StaleObjectAdminMixin,
+    action_form_response,
+)
+from .bulk import (
+    BulkItemError,
+    assign_tasks,
+    complete_tasks,
+    delete_tasks,
+    mark_tasks_overdue,
+    move_tasks,
+)
 from .models import ListTask, Task
 
 
@@ -19,24 +35,29 @@ class TaskInline(admin.TabularInline):
     #     return qs.select_related("assigned_to")
 
 
+# Сколько первых ID задач показывать в сводке списка
+SUMMARY_TASK_IDS = 3
+
+
 def display_task_ids(obj):
-    """Возвращает строку с первыми N ID задач и общим количеством для отображения."""
-    task_ids = obj.tasks.values_list("id", flat=True)
-    total_count = len(task_ids)
+    """
+    Возвращает строку с первыми N ID задач и общим количеством для отображения.
+
+    Использует `task_count` и `first_tasks` из `ListTasksAdmin.get_queryset`
+    (аннотация и срез в prefetch), без запросов на каждую строку.
+    """
+    total_count = obj.task_count
     if total_count == 0:
         return "No tasks"
-    # Берём первые N IDs
-    count_ids = 3
-    displayed_ids = list(task_ids[:count_ids])
-    ids_str = ", ".join(map(str, displayed_ids))
-    if total_count > count_ids:
+    ids_str = ", ".join(str(task.id) for task in obj.first_tasks)
+    if total_count > SUMMARY_TASK_IDS:
         return f"{ids_str}... ({total_count})"
     else:
         return f"{ids_str} ({total_count})"
 
 
 @admin.register(ListTask)
-class ListTasksAdmin(admin.ModelAdmin):
+class ListTasksAdmin(StaleObjectAdminMixin, admin.ModelAdmin):
     """Интерфейс администратора для модели ListTask."""
 
     save_as = True
@@ -54,9 +75,21 @@ class ListTasksAdmin(admin.ModelAdmin):
     inlines = [TaskInline]
 
     def get_queryset(self, request):
-        """Оптимизировать набор запросов, чтобы включить количество задач."""
+        """
+        Оптимизировать набор запросов, чтобы включить количество задач.
+
+        Первые ID задач всех списков страницы загружаются одним запросом:
+        срез в `Prefetch` выполняется через `ROW_NUMBER() OVER (PARTITION BY ...)`.
+        """
         queryset = super().get_queryset(request)
-        return queryset.annotate(task_count=models.Count("tasks"))
+        first_tasks = Task.objects.order_by("id").only("id", "list_tasks")
+        return queryset.annotate(task_count=models.Count("tasks")).prefetch_related(
+            Prefetch(
+                "tasks",
+                queryset=first_tasks[:SUMMARY_TASK_IDS],
+                to_attr="first_tasks",
+            )
+        )
 
     @admin.display(
         description="Tasks (ID)",
@@ -67,9 +100,33 @@ class ListTasksAdmin(admin.ModelAdmin):
         return display_task_ids(obj)
 
 
+class TaskReassignForm(ActionForm):
+    """Новый исполнитель выбранных задач (пусто — снять исполнителя)."""
+
+    model = Task
+    autocomplete_fields = ("assigned_to",)
+
+
+class TaskMoveForm(ActionForm):
+    """Список, в который переносятся выбранные задачи."""
+
+    model = Task
+    autocomplete_fields = ("list_tasks",)
+
+
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-    """Интерфейс администратора для модели Task."""
+class TaskAdmin(StaleObjectAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    """
+    Интерфейс администратора для модели Task.
+
+    Работает в режиме больших таблиц (`LargeTableAdminMixin`): фильтры по спискам
+    и исполнителям через autocomplete, оценка числа строк вместо `COUNT(*)`,
+    кэш `date_hierarchy`.
+
+    Массовые действия выполняются функциями `tasks.bulk` (UPDATE/DELETE пачками
+    в одной транзакции, одно уведомление на пользователя) вместо сохранения и
+    сигналов на каждую задачу.
+    """
 
     save_as = True
     save_on_top = True
@@ -82,15 +139,92 @@ class TaskAdmin(admin.ModelAdmin):
         "status",
         "updated_at",
     )
-    list_filter = ("status", "list_tasks", "assigned_to")
+    list_filter = (
+        "status",
+        ("list_tasks", AutocompleteFilter),
+        ("assigned_to", AutocompleteFilter),
+    )
     list_editable = (
         "status",
         "assigned_to",
     )
     search_fields = ("name",)
+    autocomplete_fields = ("list_tasks", "assigned_to")
     readonly_fields = (
         "created_at",
         "updated_at",
     )
     date_hierarchy = "complete_before"
     list_select_related = ("list_tasks", "assigned_to")
+    actions = (
+        "mark_completed",
+        "mark_overdue",
+        "reassign",
+        "move_to_list",
+        "bulk_delete",
+    )
+
+    def get_actions(self, request):
+        """Штатное удаление загружает задачи и шлёт сигналы по одной — убираем."""
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(
+        description="Отметить выполненными (в работе)", permissions=["change"]
+    )
+    def mark_completed(self, request, queryset):
+        """Выполненными помечаются задачи выборки в работе одним UPDATE."""
+        count = complete_tasks(queryset)
+        self.message_user(request, f"Отмечено выполненными: {count}.", messages.SUCCESS)
+
+    @admin.action(description="Отметить просроченными", permissions=["change"])
+    def mark_overdue(self, request, queryset):
+        """Просроченными помечаются все задачи выборки одним UPDATE."""
+        count = mark_tasks_overdue(queryset)
+        self.message_user(
+            request, f"Отмечено просроченными: {count}.", messages.SUCCESS
+        )
+
+    @admin.action(description="Назначить исполнителя", permissions=["change"])
+    def reassign(self, request, queryset):
+        """Назначение исполнителя выбранным задачам (с промежуточной формой)."""
+        form = TaskReassignForm(
+            request.POST if "apply" in request.POST else None,
+            admin_site=self.admin_site,
+        )
+        if not form.is_valid():
+            title = "Назначить исполнителя"
+            return action_form_response(self, request, queryset, form, title)
+        count = assign_tasks(queryset, form.cleaned_data["assigned_to"])
+        self.message_user(request, f"Переназначено задач: {count}.", messages.SUCCESS)
+
+    @admin.action(description="Перенести в список", permissions=["change"])
+    def move_to_list(self, request, queryset):
+        """Перенос выбранных задач в другой список (с промежуточной формой)."""
+        form = TaskMoveForm(
+            request.POST if "apply" in request.POST else None,
+            admin_site=self.admin_site,
+        )
+        if not form.is_valid():
+            title = "Перенести в список"
+            return action_form_response(self, request, queryset, form, title)
+        try:
+            count = move_tasks(queryset, form.cleaned_data["list_tasks"])
+        except BulkItemError as e:
+            self.message_user(request, e.errors["name"][0], messages.ERROR)
+            return None
+        self.message_user(request, f"Перенесено задач: {count}.", messages.SUCCESS)
+
+    @admin.action(description="Удалить выбранные задачи", permissions=["delete"])
+    def bulk_delete(self, request, queryset):
+        """Удаление выбранных задач пачками (после подтверждения)."""
+        form = ActionForm(
+            request.POST if "apply" in request.POST else None,
+            admin_site=self.admin_site,
+        )
+        if not form.is_valid():
+            title = "Удалить выбранные задачи"
+            return action_form_response(self, request, queryset, form, title)
+        count = delete_tasks(queryset)
+        self.message_user(request, f"Удалено задач: {count}.", messages.SUCCESS)
@@ -0,0 +1,313 @@
+"""
+Large-table mode for the Django admin.
+
+`LargeTableAdminMixin` убирает из списка изменений запросы, стоимость которых
+растёт с размером таблицы:
+
+- `AutocompleteFilter` — фильтр по FK через autocomplete вместо выгрузки всех
+  связанных объектов в боковую панель;
+- `EstimatedCountPaginator` — оценка числа строк планировщиком PostgreSQL вместо
+  `COUNT(*)` (на малых выборках и других СУБД — точный подсчёт), полный счётчик
+  без фильтров не запрашивается;
+- `CachedDateQuerySet` — агрегаты `date_hierarchy` (MIN/MAX и списки дат)
+  кэшируются в `CACHES["default"]`;
+- `PreloadedAutocompleteSelect` — autocomplete-виджет `list_editable`, который
+  берёт подпись выбранного объекта из строки страницы (`list_select_related`);
+- `ActionForm` и `action_form_response` — промежуточная страница массового
+  действия (параметры и подтверждение), выбор FK через autocomplete.
+
+`StaleObjectAdminMixin` превращает конфликт версий при сохранении в сообщение.
+"""
+
+import hashlib
+import json
+import logging
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from redis.exceptions import RedisError
+
+from .models import StaleObjectError
+
+logger = logging.getLogger(__name__)
+
+DATES_CACHE_PREFIX = "admin:dates"
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса PostgreSQL или None."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор с оценкой числа строк.
+
+    Если планировщик оценивает выборку не меньше чем в
+    `ADMIN_ESTIMATED_COUNT_THRESHOLD` строк, используется оценка (номера
+    последних страниц приблизительны), иначе — точный `COUNT(*)`.
+    """
+
+    @cached_property
+    def count(self):  # noqa
+        threshold = getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 10000)
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= threshold:
+            return estimate
+        return super().count
+
+
+class CachedDateQuerySet:
+    """Обёртка queryset для `date_hierarchy`: агрегаты и списки дат из кэша."""
+
+    def __init__(self, queryset, timeout):  # noqa
+        self.queryset = queryset
+        self.timeout = timeout
+
+    def cached(self, name, compute):
+        """Результат `compute()` под ключом из SQL выборки и имени операции."""
+        try:
+            sql = str(self.queryset.query)
+        except EmptyResultSet:
+            return compute()
+        digest = hashlib.sha256(f"{name}:{sql}".encode()).hexdigest()
+        try:
+            return cache.get_or_set(
+                f"{DATES_CACHE_PREFIX}:{digest}", compute, self.timeout
+            )
+        except RedisError:
+            logger.warning("Кэш date_hierarchy недоступен", exc_info=True)
+            return compute()
+
+    def aggregate(self, **kwargs):  # noqa
+        return self.cached(
+            f"aggregate:{sorted(kwargs.items())!r}",
+            lambda: self.queryset.aggregate(**kwargs),
+        )
+
+    def dates(self, field_name, kind, order="ASC"):  # noqa
+        return self.cached(
+            f"dates:{field_name}:{kind}:{order}",
+            lambda: list(self.queryset.dates(field_name, kind, order)),
+        )
+
+    def datetimes(self, field_name, kind, order="ASC", tzinfo=None):  # noqa
+        return self.cached(
+            f"datetimes:{field_name}:{kind}:{order}:{tzinfo}",
+            lambda: list(self.queryset.datetimes(field_name, kind, order, tzinfo)),
+        )
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Фильтр по FK с полем autocomplete.
+
+    Связанные объекты не загружаются: выбранное значение подписывается одним
+    запросом, поиск идёт через `admin:autocomplete` (нужны `search_fields` у
+    админки связанной модели).
+    """
+
+    template = "admin/large_table/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):  # noqa
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):  # noqa
+        return []
+
+    def has_output(self):  # noqa
+        return True
+
+    def widget(self):
+        """HTML поля autocomplete с текущим значением фильтра."""
+        field = forms.ModelChoiceField(
+            queryset=self.field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(
+                self.field,
+                self.admin_site,
+                attrs={
+                    "class": "large-table-filter",
+                    "data-lookup": self.lookup_kwarg,
+                    "data-reset": self.lookup_kwarg_isnull,
+                    "data-width": "100%",
+                },
+            ),
+        )
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return field.widget.render(self.lookup_kwarg, value)
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete-виджет, подписывающий выбранный объект `selected` без запроса."""
+
+    selected = None
+
+    def optgroups(self, name, value, attr=None):  # noqa
+        selected = self.selected
+        values = [
+            str(v) for v in value if str(v) not in self.choices.field.empty_values
+        ]
+        if selected is None or values != [str(selected.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, "", "", False, 0))
+        label = self.choices.field.label_from_instance(selected)
+        options.append(
+            self.create_option(name, selected.pk, label, set(values), len(options))
+        )
+        return [(None, options, 0)]
+
+
+class PreloadedAutocompleteForm(forms.ModelForm):
+    """Форма строки `list_editable`: выбранные FK берутся из загруженного объекта."""
+
+    def __init__(self, *args, **kwargs):  # noqa
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is None:
+            return
+        for name, field in self.fields.items():
+            # В админке виджет обёрнут в RelatedFieldWidgetWrapper
+            widget = getattr(field.widget, "widget", field.widget)
+            if isinstance(widget, PreloadedAutocompleteSelect):
+                widget.selected = getattr(self.instance, name)
+
+
+class ActionForm(forms.Form):
+    """
+    Форма промежуточной страницы действия.
+
+    Поля из `autocomplete_fields` — формы FK модели `model` с autocomplete
+    админки; форма без полей служит подтверждением.
+    """
+
+    model = None
+    autocomplete_fields = ()
+
+    def __init__(self, *args, admin_site, **kwargs):  # noqa
+        super().__init__(*args, **kwargs)
+        for name in self.autocomplete_fields:
+            db_field = self.model._meta.get_field(name)
+            self.fields[name] = db_field.formfield(
+                widget=AutocompleteSelect(db_field, admin_site)
+            )
+
+
+def action_form_response(modeladmin, request, queryset, form, title):
+    """
+    Страница действия с формой `form` для выбранных объектов.
+
+    Повторная отправка сохраняет выбор (`_selected_action`, `select_across`) и
+    фильтры списка (адрес страницы); кнопка подтверждения называется `apply`.
+    """
+    index = int(request.POST.get("index", 0))
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        "title": title,
+        "opts": modeladmin.opts,
+        "form": form,
+        "count": queryset.count(),
+        "action": request.POST.getlist("action")[index],
+        "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        "select_across": request.POST.get("select_across", "0"),
+        "media": modeladmin.media + form.media + forms.Media(js=["admin/js/cancel.js"]),
+    }
+    return TemplateResponse(request, "admin/large_table/action_form.html", context)
+
+
+class StaleObjectAdminMixin:
+    """
+    Конфликт версий при сохранении — сообщение об ошибке вместо 500.
+
+    Форма изменения (с инлайнами) и `list_editable` сохраняются в транзакции,
+    поэтому при `StaleObjectError` всё откатывается, а страница открывается
+    заново со свежими данными.
+    """
+
+    stale_message = (
+        "Объект уже был изменён другим пользователем. Проверьте данные и "
+        "повторите изменения."
+    )
+
+    def changeform_view(self, request, *args, **kwargs):  # noqa
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except StaleObjectError:
+            return self.stale_object_response(request)
+
+    def changelist_view(self, request, *args, **kwargs):  # noqa
+        try:
+            return super().changelist_view(request, *args, **kwargs)
+        except StaleObjectError:
+            return self.stale_object_response(request)
+
+    def stale_object_response(self, request):
+        """Сообщение о конфликте и повторное открытие той же страницы."""
+        self.message_user(request, self.stale_message, messages.ERROR)
+        return HttpResponseRedirect(request.get_full_path())
+
+
+class LargeTableAdminMixin:
+    """Список изменений, стоимость которого не растёт с размером таблицы."""
+
+    change_list_template = "admin/large_table/change_list.html"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):  # noqa
+        autocomplete = AutocompleteSelect(self.opts.pk, self.admin_site).media
+        return (
+            super().media
+            + autocomplete
+            # jquery.init.js задаёт порядок: скрипт фильтра использует django.jQuery
+            + forms.Media(
+                js=[
+                    "admin/js/jquery.init.js",
+                    "admin/large_table/autocomplete_filter.js",
+                ]
+            )
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):  # noqa
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault(
+                "widget",
+                PreloadedAutocompleteSelect(
+                    db_field, self.admin_site, using=kwargs.get("using")
+                ),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):  # noqa
+        kwargs.setdefault("form", PreloadedAutocompleteForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_date_hierarchy_timeout(self):
+        """Время жизни кэша `date_hierarchy`, секунды."""
+        return getattr(settings, "ADMIN_DATE_HIERARCHY_CACHE_TIMEOUT", 600)
@@ -8,3 +8,7 @@ class TasksConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "tasks"
+
+    def ready(self):
+        """Подключаем сигналы при инициализации приложения."""
+        from . import signals  # noqa
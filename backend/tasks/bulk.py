@@ -0,0 +1,366 @@
+"""
+Bulk task operations.
+
+Операции `create`/`update`/`complete`/`assign` из одного запроса проверяются
+пачкой (несколько запросов на всю пачку вместо запросов на каждую строку),
+записываются `bulk_create`/`bulk_update` в одной транзакции и порождают одно
+сообщение `tasks_changed` вместо сигналов на каждую строку.
+
+Действия над queryset (`complete_tasks`, `mark_tasks_overdue`, `assign_tasks`,
+`move_tasks`, `delete_tasks`) для админки выполняются UPDATE/DELETE пачками по
+id в одной транзакции и так же порождают одно сообщение на всю выборку.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import cache as page_cache
+from .access import accessible_tasks
+from .models import ListTask, Task, TaskStatus, User
+from .serializers import BulkOperationSerializer, TaskBulkDataSerializer
+from .signals import (
+    add_tombstones_many,
+    bulk_deletion,
+    tasks_changed,
+    tasks_deleted,
+)
+
+MAX_BULK_OPERATIONS = 500
+# Размер пачки id в UPDATE/DELETE действий над queryset
+QUERYSET_CHUNK_SIZE = 1000
+# Поля строк, блокируемых действиями над queryset (после id)
+ROW_FIELDS = ("assigned_to_id", "list_tasks_id", "list_tasks__owner_id")
+
+# Поля, которые могут меняться операциями update/complete/assign
+UPDATABLE_FIELDS = [
+    "name",
+    "description",
+    "assigned_to",
+    "complete_before",
+    "status",
+    "updated_at",
+    "version",
+]
+
+
+class BulkItemError(Exception):
+    """Ошибка отдельной операции: попадает в результат, остальные выполняются."""
+
+    def __init__(self, errors):  # noqa
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _accessible_tasks(user, task_ids):
+    """Задачи, доступные пользователю (владелец списка или исполнитель)."""
+    return {
+        task.id: task
+        for task in accessible_tasks(user)
+        .filter(id__in=task_ids)
+        .select_related("list_tasks")
+        .select_for_update(of=("self",))
+    }
+
+
+def run_bulk_operations(user, operations):
+    """
+    Выполняет пачку операций и возвращает результат по каждой.
+
+    Результат: `{"index", "op", "status": "ok"|"error", "id"?, "errors"?}`.
+    """
+    results = [None] * len(operations)
+    parsed = {}
+
+    # 1. Форма операций и данных — без обращений к БД
+    for index, raw in enumerate(operations):
+        op_serializer = BulkOperationSerializer(data=raw)
+        if not op_serializer.is_valid():
+            results[index] = _error(index, raw, op_serializer.errors)
+            continue
+        op = op_serializer.validated_data
+        data_serializer = TaskBulkDataSerializer(
+            data=op.get("data", {}), partial=op["op"] != "create"
+        )
+        if not data_serializer.is_valid():
+            results[index] = _error(index, raw, data_serializer.errors)
+            continue
+        parsed[index] = (op, data_serializer.validated_data)
+
+    # 2. Справочные данные для всей пачки — по одному запросу
+    list_ids = {op["list_id"] for op, _ in parsed.values() if op["op"] == "create"}
+    task_ids = {op["id"] for op, _ in parsed.values() if op["op"] != "create"}
+    user_ids = {
+        data["assigned_to"] for _, data in parsed.values() if data.get("assigned_to")
+    } | {op["assigned_to"] for op, _ in parsed.values() if op.get("assigned_to")}
+
+    with transaction.atomic():
+        lists = {
+            lst.id: lst for lst in ListTask.objects.filter(owner=user, id__in=list_ids)
+        }
+        tasks = _accessible_tasks(user, task_ids) if task_ids else {}
+        existing_users = set(
+            User.objects.filter(id__in=user_ids).values_list("id", flat=True)
+        )
+        # Занятые имена в целевых списках: unique_together(name, list_tasks)
+        names = {data["name"] for _, data in parsed.values() if "name" in data}
+        target_lists = set(lists) | {task.list_tasks_id for task in tasks.values()}
+        taken_names = {
+            (list_id, name): task_id
+            for task_id, list_id, name in Task.objects.filter(
+                list_tasks_id__in=target_lists, name__in=names
+            ).values_list("id", "list_tasks_id", "name")
+        }
+
+        now = timezone.now()
+        to_create = {}
+        touched = {}
+        # task_id -> исполнитель до пачки (для уведомлений о переназначении)
+        old_assignees = {}
+
+        # 3. Применение операций к объектам в памяти
+        for index, (op, data) in sorted(parsed.items()):
+            try:
+                assignee = data.get("assigned_to", op.get("assigned_to"))
+                if assignee and assignee not in existing_users:
+                    raise BulkItemError({"assigned_to": ["Пользователь не найден."]})
+
+                if op["op"] == "create":
+                    list_task = lists.get(op["list_id"])
+                    if list_task is None:
+                        raise BulkItemError({"list_id": ["Список не найден."]})
+                    key = (list_task.id, data["name"])
+                    if key in taken_names:
+                        raise BulkItemError(
+                            {"name": ["Задача с таким именем уже есть в списке."]}
+                        )
+                    taken_names[key] = None
+                    task = Task(list_tasks=list_task, **_model_fields(data))
+                    apply_status_rule(task)
+                    to_create[index] = task
+                    continue
+
+                task = tasks.get(op["id"])
+                if task is None:
+                    raise BulkItemError({"id": ["Задача не найдена."]})
+                # Сверяем с версией до пачки (повторные операции её не меняют)
+                version = task.version - (task.id in touched)
+                if op.get("version") is not None and op["version"] != version:
+                    raise BulkItemError(
+                        {"version": ["Объект уже был изменён другим пользователем."]}
+                    )
+                old_assignees.setdefault(task.id, task.assigned_to_id)
+
+                if op["op"] == "update":
+                    if "name" in data and data["name"] != task.name:
+                        key = (task.list_tasks_id, data["name"])
+                        if taken_names.get(key, task.id) != task.id:
+                            raise BulkItemError(
+                                {"name": ["Задача с таким именем уже есть в списке."]}
+                            )
+                        taken_names[key] = task.id
+                    for field, value in _model_fields(data).items():
+                        setattr(task, field, value)
+                elif op["op"] == "assign":
+                    task.assigned_to_id = op.get("assigned_to")
+                elif op["op"] == "complete":
+                    if task.status != TaskStatus.IN_PROGRESS:
+                        raise BulkItemError(
+                            {"status": ["Task is expired and cannot be completed"]}
+                        )
+                    task.status = TaskStatus.COMPLETED
+
+                apply_status_rule(task)
+                if task.id not in touched:
+                    task.version += 1
+                task.updated_at = now
+                touched[task.id] = task
+                results[index] = _ok(index, op["op"], task.id)
+            except BulkItemError as e:
+                results[index] = _error(index, op, e.errors)
+
+        # 4. Запись пачкой, без сигналов на каждую строку
+        created = Task.objects.bulk_create(to_create.values())
+        for index, task in zip(to_create, created, strict=True):
+            results[index] = _ok(index, "create", task.id)
+        if touched:
+            Task.objects.bulk_update(touched.values(), UPDATABLE_FIELDS)
+
+        changes = [[task.id, "created", None] for task in created]
+        changes += [
+            [task.id, "updated", old_assignees[task.id]] for task in touched.values()
+        ]
+        if changes:
+            tasks_changed.send(sender=Task, changes=changes)
+
+    return results
+
+
+def _chunks(items, size=QUERYSET_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _lock(queryset, *fields):
+    """Строки выборки `(id, *fields)`, заблокированные до конца транзакции."""
+    return list(
+        queryset.order_by("id")
+        .select_for_update(of=("self",))
+        .values_list("id", *fields)
+    )
+
+
+def _update_rows(rows, **values):
+    """UPDATE заблокированных строк пачками по id (версия +1); одно `tasks_changed`."""
+    now = timezone.now()
+    for chunk in _chunks([row[0] for row in rows]):
+        Task.objects.filter(id__in=chunk).update(
+            **values, updated_at=now, version=F("version") + 1
+        )
+    if rows:
+        tasks_changed.send(
+            sender=Task,
+            changes=[[row[0], "updated", row[1]] for row in rows],
+        )
+
+
+def _update_tasks(queryset, **values):
+    """
+    UPDATE выборки в одной транзакции.
+
+    Возвращает строки `(id, assigned_to_id, list_tasks_id, owner_id)` до изменения.
+    """
+    with transaction.atomic():
+        rows = _lock(queryset, *ROW_FIELDS)
+        _update_rows(rows, **values)
+    return rows
+
+
+def complete_tasks(queryset):
+    """
+    Помечает выполненными задачи выборки в работе; возвращает их число.
+
+    Как и `Task.mark_completed`, ожидающие и просроченные задачи не меняются.
+    """
+    rows = _update_tasks(
+        queryset.filter(status=TaskStatus.IN_PROGRESS), status=TaskStatus.COMPLETED
+    )
+    return len(rows)
+
+
+def mark_tasks_overdue(queryset):
+    """Помечает просроченными все задачи выборки; возвращает их число."""
+    rows = _update_tasks(
+        queryset.exclude(status=TaskStatus.OVERDUE), status=TaskStatus.OVERDUE
+    )
+    return len(rows)
+
+
+def assign_tasks(queryset, user):
+    """
+    Назначает задачи выборки пользователю `user` (None — снять исполнителя).
+
+    Ожидающие задачи переходят в работу, как в `Task.save`.
+    """
+    values = {"assigned_to": user}
+    if user is not None:
+        values["status"] = Case(
+            When(status=TaskStatus.PENDING, then=Value(TaskStatus.IN_PROGRESS)),
+            default=F("status"),
+        )
+    rows = _update_tasks(queryset.exclude(assigned_to=user), **values)
+    return len(rows)
+
+
+def move_tasks(queryset, list_task):
+    """
+    Переносит задачи выборки в список `list_task`; возвращает их число.
+
+    Имена задач уникальны в списке: при совпадении с задачами списка или между
+    собой ничего не переносится, поднимается `BulkItemError`. Проверка идёт
+    после блокировки строк; конкурентная запись, нарушившая unique_together,
+    откатывает перенос и тоже даёт `BulkItemError`.
+    """
+    queryset = queryset.exclude(list_tasks=list_task)
+    try:
+        with transaction.atomic():
+            rows = _lock(queryset, *ROW_FIELDS, "name")
+            names = Counter(row[-1] for row in rows)
+            conflicts = {name for name, count in names.items() if count > 1}
+            for chunk in _chunks(list(names)):
+                conflicts.update(
+                    Task.objects.filter(
+                        list_tasks=list_task, name__in=chunk
+                    ).values_list("name", flat=True)
+                )
+            if conflicts:
+                conflicts = ", ".join(sorted(conflicts))
+                raise BulkItemError(
+                    {"name": [f"Имена задач повторятся в списке: {conflicts}"]}
+                )
+
+            _update_rows(rows, list_tasks=list_task)
+            # Прежний владелец списка теряет задачи, которые ему не назначены
+            add_tombstones_many(
+                (task_id, owner_id)
+                for task_id, assigned_to_id, _, owner_id, _ in rows
+                if owner_id not in (assigned_to_id, list_task.owner_id)
+            )
+            old_lists = {list_id for _, _, list_id, _, _ in rows}
+            transaction.on_commit(lambda: page_cache.invalidate(list_ids=old_lists))
+    except IntegrityError:
+        # Конкурентная запись нарушила unique_together — перенос откатан
+        raise BulkItemError(
+            {"name": ["Конфликт имён при переносе, повторите действие."]}
+        ) from None
+    return len(rows)
+
+
+def delete_tasks(queryset):
+    """
+    Удаляет задачи выборки пачками по id; возвращает число удалённых задач.
+
+    `post_delete` на каждую строку внутри `bulk_deletion()` не порождает
+    отметок и уведомлений: удаление сообщается одним `tasks_deleted` со
+    снимками задач.
+    """
+    fields = ("name", "status", "list_tasks_id", "assigned_to_id")
+    with transaction.atomic(), bulk_deletion():
+        rows = _lock(queryset, *fields, "list_tasks__owner_id")
+        for chunk in _chunks([row[0] for row in rows]):
+            Task.objects.filter(id__in=chunk).delete()
+        if rows:
+            snapshots = [
+                {
+                    "id": row[0],
+                    **dict(zip(fields, row[1:-1], strict=True)),
+                    "owner_id": row[-1],
+                }
+                for row in rows
+            ]
+            tasks_deleted.send(sender=Task, tasks=snapshots)
+    return len(rows)
+
+
+def _model_fields(data):
+    fields = dict(data)
+    if "assigned_to" in fields:
+        fields["assigned_to_id"] = fields.pop("assigned_to")
+    return fields
+
+
+def apply_status_rule(task):
+    """То же правило, что в `Task.save`: назначенная задача переходит в работу."""
+    if task.assigned_to_id and task.status == TaskStatus.PENDING:
+        task.status = TaskStatus.IN_PROGRESS
+
+
+def _ok(index, op, task_id):
+    return {"index": index, "op": op, "status": "ok", "id": task_id}
+
+
+def _error(index, op, errors):
+    op_name = op.get("op") if isinstance(op, dict) else None
+    return {"index": index, "op": op_name, "status": "error", "errors": errors}
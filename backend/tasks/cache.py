@@ -0,0 +1,159 @@
+"""
+Per-user response cache for task list pages.
+
+Страница кэшируется вместе с валидаторами ETag/Last-Modified под ключом, в
+который входят номера поколений затронутых пользователей и списков. Изменение
+задачи удаляет счётчики поколений (после коммита), и старые ключи больше не
+собираются — явная очистка страниц не нужна.
+
+Поколения хранятся в `CACHES["default"]` (Redis), страницы — в локальном LRU
+процесса и в Redis. Отсутствующее поколение создаётся со значением
+`time.time_ns()`, поэтому вытесненный счётчик не совпадёт со старым.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+GENERATION_PREFIX = "tasks:gen"
+PAGE_PREFIX = "tasks:page"
+# Сколько id задач разбирать одним запросом при инвалидации
+INVALIDATE_CHUNK_SIZE = 1000
+
+
+class LocalLRU:
+    """Потокобезопасный LRU-кэш процесса с ограничением числа записей."""
+
+    def __init__(self, maxsize: int = 1024):  # noqa
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):  # noqa
+        with self.lock:
+            try:
+                self.data.move_to_end(key)
+            except KeyError:
+                return None
+            return self.data[key]
+
+    def set(self, key, value):  # noqa
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):  # noqa
+        with self.lock:
+            self.data.clear()
+
+
+local_pages = LocalLRU(getattr(settings, "TASK_PAGE_CACHE_LOCAL_SIZE", 1024))
+
+
+def page_cache_timeout() -> int:
+    """Время жизни страницы в Redis; 0 — кэш выключен."""
+    return getattr(settings, "TASK_PAGE_CACHE_TIMEOUT", 300)
+
+
+def _generation_key(kind: str, object_id) -> str:
+    return f"{GENERATION_PREFIX}:{kind}:{object_id}"
+
+
+def get_generations(scopes) -> list:
+    """Текущие поколения для `[(kind, id), ...]`; недостающие создаются."""
+    keys = [_generation_key(kind, object_id) for kind, object_id in scopes]
+    values = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        value = values.get(key)
+        if value is None:
+            value = time.time_ns()
+            if not cache.add(key, value, timeout=None):
+                value = cache.get(key, value)
+        generations.append(value)
+    return generations
+
+
+def page_key(user_id, path: str, scopes) -> str | None:
+    """Ключ страницы или None, если кэш выключен либо Redis недоступен."""
+    if not page_cache_timeout():
+        return None
+    try:
+        generations = get_generations(scopes)
+    except RedisError:
+        logger.warning("Кэш страниц задач недоступен", exc_info=True)
+        return None
+    digest = hashlib.sha256(path.encode()).hexdigest()[:32]
+    versions = ".".join(str(generation) for generation in generations)
+    return f"{PAGE_PREFIX}:{user_id}:{digest}:{versions}"
+
+
+def get_page(key):
+    """Страница из локального LRU, затем из Redis."""
+    page = local_pages.get(key)
+    if page is not None:
+        return page
+    try:
+        page = cache.get(key)
+    except RedisError:
+        return None
+    if page is not None:
+        local_pages.set(key, page)
+    return page
+
+
+def set_page(key, page) -> None:  # noqa
+    local_pages.set(key, page)
+    try:
+        cache.set(key, page, timeout=page_cache_timeout())
+    except RedisError:
+        logger.warning("Не удалось сохранить страницу задач в кэш", exc_info=True)
+
+
+def invalidate(user_ids=(), list_ids=()) -> None:
+    """Сбрасывает поколения пользователей и списков одним запросом к Redis."""
+    keys = [_generation_key("user", user_id) for user_id in user_ids if user_id]
+    keys += [_generation_key("list", list_id) for list_id in list_ids if list_id]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except RedisError:
+        logger.exception("Не удалось сбросить поколения кэша задач")
+
+
+def invalidate_tasks(task_ids, user_ids=()) -> None:
+    """Сбрасывает кэш исполнителей и списков задач (и `user_ids` в придачу)."""
+    task_ids = list(task_ids)
+    users, lists = set(user_ids), set()
+    for start in range(0, len(task_ids), INVALIDATE_CHUNK_SIZE):
+        chunk = task_ids[start : start + INVALIDATE_CHUNK_SIZE]
+        for assigned_to_id, list_id in Task.objects.filter(id__in=chunk).values_list(
+            "assigned_to_id", "list_tasks_id"
+        ):
+            users.add(assigned_to_id)
+            lists.add(list_id)
+    invalidate(users, lists)
+
+
+def invalidate_list(list_id) -> None:
+    """Сбрасывает кэш списка и всех исполнителей его задач."""
+    assignees = (
+        Task.objects.filter(list_tasks_id=list_id)
+        .exclude(assigned_to=None)
+        .values_list("assigned_to_id", flat=True)
+        .distinct()
+    )
+    invalidate(set(assignees), [list_id])
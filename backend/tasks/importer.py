@@ -0,0 +1,172 @@
+"""
+Streaming import of tasks into a list.
+
+Файл CSV/NDJSON читается построчно, строки проверяются и записываются пачками
+по `IMPORT_CHUNK_SIZE`: на пачку — один запрос занятых имён, один запрос
+исполнителей и один `bulk_create`. Сигналы на каждую строку не отправляются —
+вместо них после импорта отправляется один `tasks_imported`.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .bulk import apply_status_rule
+from .models import Task, User
+from .serializers import TaskBulkDataSerializer
+from .signals import tasks_imported
+
+IMPORT_CHUNK_SIZE = 1000
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# Колонки выгрузки, которые называются иначе, чем поля импорта
+COLUMN_ALIASES = {"assigned_to_id": "assigned_to"}
+
+
+def iter_text_lines(lines):
+    """Декодирует строки файла из UTF-8 (BOM в начале файла пропускается)."""
+    for line in lines:
+        yield line.decode("utf-8-sig") if isinstance(line, bytes) else line
+
+
+def parse_rows(lines, import_format):
+    """
+    Разбирает строки файла в `(номер строки, данные, ошибка)`.
+
+    Номер строки — порядковый номер записи (без заголовка CSV), начиная с 1.
+    """
+    lines = iter_text_lines(lines)
+    if import_format == "csv":
+        return _parse_csv(lines)
+    return _parse_ndjson(lines)
+
+
+def _parse_csv(lines):
+    reader = csv.DictReader(lines)
+    for row_number, row in enumerate(reader, start=1):
+        data = {}
+        for column, value in row.items():
+            if column is None or value in (None, ""):
+                continue
+            data[COLUMN_ALIASES.get(column, column)] = value
+        yield row_number, data, None
+
+
+def _parse_ndjson(lines):
+    row_number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield row_number, None, {"non_field_errors": ["Некорректный JSON."]}
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, {"non_field_errors": ["Ожидается объект JSON."]}
+            continue
+        yield (
+            row_number,
+            {COLUMN_ALIASES.get(key, key): value for key, value in data.items()},
+            None,
+        )
+
+
+def import_tasks(list_task, rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Импортирует задачи из `rows` (результат `parse_rows`) в список `list_task`.
+
+    Возвращает `{"created": N, "errors": [{"row", "errors"}]}`. Ошибочные строки
+    пропускаются, остальные записываются.
+    """
+    result = {"created": 0, "errors": []}
+    created_ids = []
+    # Имена из файла, уже занятые предыдущими строками
+    seen_names = set()
+    # Один сериализатор на весь импорт: поля не пересоздаются для каждой строки
+    serializer = TaskBulkDataSerializer()
+
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        created_ids += _import_chunk(
+            list_task, chunk, serializer, seen_names, result["errors"]
+        )
+
+    result["created"] = len(created_ids)
+    if created_ids:
+        tasks_imported.send(sender=Task, list_id=list_task.id, task_ids=created_ids)
+    return result
+
+
+def _import_chunk(list_task, chunk, serializer, seen_names, errors):
+    """Проверяет и записывает одну пачку; возвращает id созданных задач."""
+    valid = []
+    for row_number, data, error in chunk:
+        if error is None:
+            try:
+                data = serializer.run_validation(data)
+            except ValidationError as e:
+                error = e.detail
+        if error is not None:
+            errors.append({"row": row_number, "errors": error})
+            continue
+        valid.append((row_number, data))
+
+    if not valid:
+        return []
+
+    user_ids = {data["assigned_to"] for _, data in valid if data.get("assigned_to")}
+    existing_users = set(
+        User.objects.filter(id__in=user_ids).values_list("id", flat=True)
+    )
+    taken_names = set(
+        Task.objects.filter(
+            list_tasks=list_task, name__in={data["name"] for _, data in valid}
+        ).values_list("name", flat=True)
+    )
+
+    to_create = []
+    rows = []
+    for row_number, data in valid:
+        assignee = data.pop("assigned_to", None)
+        if assignee and assignee not in existing_users:
+            errors.append(
+                {
+                    "row": row_number,
+                    "errors": {"assigned_to": ["Пользователь не найден."]},
+                }
+            )
+            continue
+        if data["name"] in taken_names or data["name"] in seen_names:
+            errors.append(
+                {
+                    "row": row_number,
+                    "errors": {"name": ["Задача с таким именем уже есть в списке."]},
+                }
+            )
+            continue
+        seen_names.add(data["name"])
+        task = Task(list_tasks=list_task, assigned_to_id=assignee, **data)
+        apply_status_rule(task)
+        to_create.append(task)
+        rows.append(row_number)
+
+    try:
+        with transaction.atomic():
+            created = Task.objects.bulk_create(to_create)
+    except IntegrityError:
+        # Имя заняли параллельно — пачка откатывается целиком
+        errors.extend(
+            {
+                "row": row_number,
+                "errors": {"name": ["Конфликт имён, повторите импорт."]},
+            }
+            for row_number in rows
+        )
+        return []
+    return [task.id for task in created]
@@ -0,0 +1,130 @@
+"""
+Shared helpers for the benchmark management commands.
+
+Генерация данных через `bulk_create` (без сигналов и уведомлений) и замер
+медианного времени запроса и перцентилей.
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import Profile
+from tasks.models import ListTask, Task, TaskStatus, User
+
+SEED_BATCH_SIZE = 10000
+# Пароль сгенерированных пользователей (хэш считается один раз на всю генерацию)
+SEED_PASSWORD = "bench-password"
+
+
+def bulk_create_batches(model, objects, batch_size=SEED_BATCH_SIZE):
+    """`bulk_create` генератора пачками: в памяти не больше одной пачки."""
+    objects = iter(objects)
+    created = 0
+    while batch := list(islice(objects, batch_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def seed_dataset(
+    users, lists, tasks, profiles=0, batch_size=SEED_BATCH_SIZE, seed=None, log=None
+):
+    """
+    Создаёт пользователей (с профилями), списки и задачи; возвращает префикс имён.
+
+    У всех пользователей пароль `SEED_PASSWORD`, списки распределены по
+    владельцам случайно, задачи — по спискам равномерно, исполнители и статусы
+    случайны. `log(model, count, seconds)` вызывается после каждой модели.
+    """
+    rng = random.Random(seed)
+    prefix = f"bench{time.time_ns()}"
+    now = timezone.now()
+    password = make_password(SEED_PASSWORD)
+
+    def step(model, objects):
+        start = time.perf_counter()
+        count = bulk_create_batches(model, objects, batch_size)
+        if log:
+            log(model, count, time.perf_counter() - start)
+
+    step(
+        User,
+        (User(username=f"{prefix}_user{i}", password=password) for i in range(users)),
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=prefix)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    # telegram_id уникален: база от времени не совпадёт с прошлыми запусками
+    telegram_base = time.time_ns() // 1000
+    step(
+        Profile,
+        (
+            Profile(user_id=user_id, telegram_id=telegram_base + i)
+            for i, user_id in enumerate(user_ids[:profiles])
+        ),
+    )
+    step(
+        ListTask,
+        (
+            ListTask(name=f"{prefix}_list{i}", owner_id=rng.choice(user_ids))
+            for i in range(lists)
+        ),
+    )
+    list_ids = list(
+        ListTask.objects.filter(name__startswith=prefix)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    statuses = list(TaskStatus.values)
+    step(
+        Task,
+        (
+            Task(
+                name=f"task{i}",
+                list_tasks_id=list_ids[i % len(list_ids)],
+                assigned_to_id=rng.choice(user_ids),
+                status=rng.choice(statuses),
+                complete_before=now + timedelta(hours=rng.randint(-720, 720)),
+            )
+            for i in range(tasks)
+        ),
+    )
+    with connection.cursor() as cursor:
+        # Свежая статистика для планировщика
+        cursor.execute("ANALYZE")
+    return prefix
+
+
+def seed_tasks(total, users=1000, lists=5000):
+    """Создаёт `users` пользователей, `lists` списков и `total` задач."""
+    return seed_dataset(users, lists, total)
+
+
+def median_ms(func, repeat):
+    """Медианное время выполнения `func()` в миллисекундах."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Перцентили выборки: `{"p50": ..., "p95": ..., "p99": ...}`."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {f"p{point}": value for point in points}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {f"p{point}": cuts[point - 1] for point in points}
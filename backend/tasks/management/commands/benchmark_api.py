@@ -0,0 +1,439 @@
+"""
+In-process benchmark of every endpoint in `tasks/urls.py` and `accounts/urls.py`.
+
+Запросы идут через тестовый клиент DRF со всеми middleware и JWT-аутентификацией.
+Для каждого эндпоинта: p50/p95/p99 задержки, SQL-запросы на запрос и пропускная
+способность; результат сохраняется в JSON для сравнения между коммитами.
+
+Пишущие эндпоинты создают объекты с префиксом `apibench<время>` и, как обычный
+сервер, отправляют уведомления через Celery/Redis. После прогона объекты удаляются,
+а статус задачи и Telegram-привязка пользователя бенчмарка восстанавливаются.
+Команда пишет в `DATABASES["default"]`, поэтому без `DEBUG` запускается только
+с флагом `--i-know-this-writes-data`.
+
+Пример:
+    python manage.py seed_data --tasks 1000000
+    python manage.py benchmark_api --requests 200 --output before.json
+    python manage.py benchmark_api --requests 200 --compare before.json
+"""
+
+import json
+import statistics
+import subprocess
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Profile
+from accounts.utils import generate_telegram_token
+from tasks.access import accessible_tasks
+from tasks.bulk import delete_tasks
+from tasks.management.benchmark import SEED_PASSWORD, percentiles
+from tasks.models import ListTask, Task, TaskStatus, User
+
+
+class Endpoint:
+    """Эндпоинт бенчмарка: `prepare(i)` возвращает аргументы i-го запроса."""
+
+    def __init__(self, name, method, path, prepare=None, auth=True):  # noqa
+        self.name = name
+        self.method = method
+        self.path = path
+        self.prepare = prepare or (lambda i: {})
+        self.auth = auth
+
+
+class QueryCounter:
+    """`execute_wrapper`: число SQL-запросов и время в БД."""
+
+    def __init__(self):  # noqa
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):  # noqa
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+def allowed_host():
+    """Имя хоста, которое пропустит `ALLOWED_HOSTS`."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def git_commit():
+    """Текущий коммит или None вне git-репозитория."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """p50/p95/p99, запросы к БД и пропускная способность каждого эндпоинта API."""
+
+    help = "Прогоняет все эндпоинты tasks и accounts и сохраняет метрики в JSON."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--username",
+            help="Пользователь бенчмарка (по умолчанию — владелец с наибольшим "
+            "числом списков).",
+        )
+        parser.add_argument("--password", default=SEED_PASSWORD)
+        parser.add_argument(
+            "--endpoints", nargs="+", help="Только эти эндпоинты (имена из отчёта)."
+        )
+        parser.add_argument(
+            "--keep-throttling",
+            action="store_true",
+            help="Не отключать DRF-троттлинг (иначе auth-эндпоинты получат 429).",
+        )
+        parser.add_argument("--output", help="Файл JSON с результатами.")
+        parser.add_argument("--compare", help="JSON прошлого запуска для сравнения.")
+        parser.add_argument(
+            "--i-know-this-writes-data",
+            action="store_true",
+            dest="confirmed",
+            help="Разрешить запуск без DEBUG (эндпоинты пишут в базу).",
+        )
+
+    def handle(self, *args, **options):  # noqa
+        if not (settings.DEBUG or options["confirmed"]):
+            raise CommandError(
+                "Пишущие эндпоинты изменяют данные в базе "
+                f"{connection.settings_dict['NAME']!s}. Запускайте команду на "
+                "отдельной базе с DEBUG=True или с флагом --i-know-this-writes-data."
+            )
+        user = self.get_user(options["username"])
+        self.password = options["password"]
+        self.prefix = f"apibench{time.time_ns()}"
+        self.user = user
+        self.list_task = ListTask.objects.filter(owner=user).order_by("id").first()
+        self.task = accessible_tasks(user).filter(list_tasks=self.list_task).first()
+        if self.task is None:
+            self.task = Task.objects.create(
+                name=f"{self.prefix}_task", list_tasks=self.list_task
+            )
+        task_status = self.task.status
+        profile = (
+            Profile.objects.filter(user=user)
+            .values("telegram_id", "jwt_refresh_expires")
+            .first()
+        )
+
+        endpoints = self.build_endpoints()
+        if options["endpoints"]:
+            unknown = set(options["endpoints"]) - {e.name for e in endpoints}
+            if unknown:
+                raise CommandError(
+                    f"Неизвестные эндпоинты: {', '.join(sorted(unknown))}"
+                )
+            endpoints = [e for e in endpoints if e.name in options["endpoints"]]
+
+        self.client = APIClient(SERVER_NAME=allowed_host())
+        self.access_token = str(RefreshToken.for_user(user).access_token)
+        results = {}
+        # Вью берут троттлинг из атрибута APIView, настройки тут не помогут
+        throttle_classes = APIView.throttle_classes
+        if not options["keep_throttling"]:
+            APIView.throttle_classes = []
+        try:
+            for endpoint in endpoints:
+                results[endpoint.name] = self.run_endpoint(
+                    endpoint, options["requests"], options["warmup"]
+                )
+                self.report(endpoint.name, results[endpoint.name])
+        finally:
+            APIView.throttle_classes = throttle_classes
+            self.cleanup(task_status, profile)
+
+        report = {"meta": self.meta(options), "endpoints": results}
+        output = options["output"] or f"benchmark-api-{git_commit() or 'local'}.json"
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Результаты сохранены в {output}"))
+
+        if options["compare"]:
+            self.compare(options["compare"], results)
+
+    def cleanup(self, task_status, profile):
+        """Удаляет объекты `apibench*` и возвращает изменённые данные пользователя."""
+        Task.objects.filter(pk=self.task.pk).update(status=task_status)
+        if profile is None:
+            Profile.objects.filter(user=self.user).delete()
+        else:
+            Profile.objects.filter(user=self.user).update(**profile)
+        delete_tasks(Task.objects.filter(name__startswith=self.prefix))
+        ListTask.objects.filter(name__startswith=self.prefix).delete()
+        User.objects.filter(username__startswith=self.prefix).delete()
+
+    def get_user(self, username):
+        """Пользователь бенчмарка: с паролем и хотя бы одним списком."""
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            owner = (
+                ListTask.objects.values("owner")
+                .annotate(lists=Count("id"))
+                .order_by("-lists")
+                .first()
+            )
+            user = owner and User.objects.get(pk=owner["owner"])
+        if user is None or not ListTask.objects.filter(owner=user).exists():
+            raise CommandError(
+                "Нет пользователя со списками: запустите seed_data или укажите --username."
+            )
+        return user
+
+    def build_endpoints(self):
+        """Все эндпоинты `tasks/urls.py` и `accounts/urls.py`."""
+        list_id, task_id = self.list_task.id, self.task.id
+        prefix = self.prefix
+
+        def version(model, pk):
+            return model.objects.values_list("version", flat=True).get(pk=pk)
+
+        def import_rows(i):
+            rows = (json.dumps({"name": f"{prefix}_import_{i}_{n}"}) for n in range(10))
+            return {"data": "\n".join(rows), "content_type": "application/x-ndjson"}
+
+        def reopen_task(i):
+            Task.objects.filter(pk=task_id).update(status=TaskStatus.IN_PROGRESS)
+            return {}
+
+        def confirm_link(i):
+            Profile.objects.filter(user=self.user).update(telegram_id=None)
+            return {
+                "data": {
+                    "code": generate_telegram_token(self.user.pk),
+                    "telegram_id": time.time_ns() // 1000,
+                }
+            }
+
+        def fresh_refresh(field):
+            return lambda i: {"data": {field: str(RefreshToken.for_user(self.user))}}
+
+        return [
+            Endpoint("list-list", "get", reverse("list-list")),
+            Endpoint(
+                "list-create",
+                "post",
+                reverse("list-list"),
+                lambda i: {"data": {"name": f"{prefix}_list_{i}"}},
+            ),
+            Endpoint("list-detail", "get", reverse("list-detail", args=[list_id])),
+            Endpoint(
+                "list-update",
+                "patch",
+                reverse("list-detail", args=[list_id]),
+                lambda i: {"data": {"version": version(ListTask, list_id)}},
+            ),
+            Endpoint("task-in-list", "get", reverse("task-in-list", args=[list_id])),
+            Endpoint(
+                "task-create",
+                "post",
+                reverse("task-in-list", args=[list_id]),
+                lambda i: {"data": {"name": f"{prefix}_task_{i}"}},
+            ),
+            Endpoint(
+                "task-in-list-export",
+                "get",
+                reverse("task-in-list-export", args=[list_id]) + "?format=ndjson",
+            ),
+            Endpoint(
+                "task-in-list-import",
+                "post",
+                reverse("task-in-list-import", args=[list_id]) + "?format=ndjson",
+                import_rows,
+            ),
+            Endpoint("assigned-tasks", "get", reverse("assigned-tasks")),
+            Endpoint("task-changes", "get", reverse("task-changes")),
+            Endpoint("task-export", "get", reverse("task-export") + "?format=ndjson"),
+            Endpoint(
+                "task-bulk",
+                "post",
+                reverse("task-bulk"),
+                lambda i: {
+                    "data": {
+                        "operations": [
+                            {
+                                "op": "create",
+                                "list_id": list_id,
+                                "data": {"name": f"{prefix}_bulk_{i}_{n}"},
+                            }
+                            for n in range(10)
+                        ]
+                    }
+                },
+            ),
+            Endpoint("task-detail", "get", reverse("task-detail", args=[task_id])),
+            Endpoint(
+                "task-update",
+                "patch",
+                reverse("task-detail", args=[task_id]),
+                lambda i: {"data": {"version": version(Task, task_id)}},
+            ),
+            Endpoint(
+                "complete-task",
+                "post",
+                reverse("complete-task", args=[task_id]),
+                reopen_task,
+            ),
+            Endpoint("tg-link", "post", reverse("tg-link")),
+            Endpoint("tg-confirm", "post", reverse("tg-confirm"), confirm_link, False),
+            Endpoint(
+                "register",
+                "post",
+                reverse("register"),
+                lambda i: {
+                    "data": {
+                        "username": f"{prefix}_user_{i}",
+                        "email": f"{prefix}_{i}@example.com",
+                        "password": SEED_PASSWORD,
+                        "confirm_password": SEED_PASSWORD,
+                    }
+                },
+                auth=False,
+            ),
+            Endpoint(
+                "token",
+                "post",
+                reverse("token"),
+                lambda i: {
+                    "data": {"username": self.user.username, "password": self.password}
+                },
+                auth=False,
+            ),
+            Endpoint(
+                "token-refresh",
+                "post",
+                reverse("token_refresh"),
+                fresh_refresh("refresh"),
+                auth=False,
+            ),
+            Endpoint(
+                "logout", "post", reverse("logout"), fresh_refresh("refresh_token")
+            ),
+        ]
+
+    def request(self, endpoint, i):
+        """Один запрос; возвращает (статус, мс, запросов к БД, мс в БД)."""
+        kwargs = endpoint.prepare(i)
+        if endpoint.method != "get" and "content_type" not in kwargs:
+            kwargs["format"] = "json"
+        if endpoint.auth:
+            kwargs["HTTP_AUTHORIZATION"] = f"Bearer {self.access_token}"
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = getattr(self.client, endpoint.method)(endpoint.path, **kwargs)
+            if response.streaming:
+                # Потоковый ответ формируется при чтении тела
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - start
+            response.close()
+        # Сессия logout не должна влиять на следующие запросы
+        self.client.cookies.clear()
+        return (
+            response.status_code,
+            elapsed * 1000,
+            counter.queries,
+            counter.db_time * 1000,
+        )
+
+    def run_endpoint(self, endpoint, requests, warmup):
+        """Прогрев и `requests` замеров одного эндпоинта."""
+        for i in range(warmup):
+            self.request(endpoint, -1 - i)
+        statuses = Counter()
+        latencies, queries, db_times = [], [], []
+        for i in range(requests):
+            status_code, elapsed, query_count, db_ms = self.request(endpoint, i)
+            statuses[str(status_code)] += 1
+            latencies.append(elapsed)
+            queries.append(query_count)
+            db_times.append(db_ms)
+        total = sum(latencies) / 1000
+        return {
+            "method": endpoint.method.upper(),
+            "path": endpoint.path,
+            "requests": requests,
+            "status": dict(statuses),
+            "latency_ms": {
+                **percentiles(latencies),
+                "mean": statistics.fmean(latencies) if latencies else 0.0,
+            },
+            "queries": {"min": min(queries, default=0), "max": max(queries, default=0)},
+            "db_ms": percentiles(db_times),
+            "throughput_rps": requests / total if total else 0.0,
+        }
+
+    def meta(self, options):
+        """Условия запуска: коммит, БД, объём данных."""
+        return {
+            "commit": git_commit(),
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "rows": {
+                "users": User.objects.count(),
+                "profiles": Profile.objects.count(),
+                "lists": ListTask.objects.count(),
+                "tasks": Task.objects.count(),
+            },
+        }
+
+    def report(self, name, result):
+        """Строка отчёта по эндпоинту."""
+        latency = result["latency_ms"]
+        line = (
+            f"{name:<22} p50 {latency['p50']:8.2f}  p95 {latency['p95']:8.2f}  "
+            f"p99 {latency['p99']:8.2f} мс  запросов {result['queries']['max']:>3}  "
+            f"{result['throughput_rps']:8.1f} req/s  {result['status']}"
+        )
+        failed = any(int(code) >= 400 for code in result["status"])
+        self.stdout.write(self.style.WARNING(line) if failed else line)
+
+    def compare(self, path, results):
+        """Разница p50/p95 и числа запросов с прошлым запуском."""
+        with open(path) as file:
+            baseline = json.load(file)["endpoints"]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Сравнение с {path}"))
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]
+            parts = []
+            for point in ("p50", "p95"):
+                old, new = before["latency_ms"][point], result["latency_ms"][point]
+                change = (new - old) / old * 100 if old else 0.0
+                parts.append(f"{point} {old:.2f} -> {new:.2f} мс ({change:+.0f}%)")
+            parts.append(
+                f"запросов {before['queries']['max']} -> {result['queries']['max']}"
+            )
+            self.stdout.write(f"{name:<22} " + ", ".join(parts))
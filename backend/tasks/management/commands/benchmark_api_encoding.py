@@ -0,0 +1,81 @@
+"""
+Benchmark of JSON rendering and response compression for task pages.
+
+Пример:
+    python manage.py benchmark_api_encoding --seed-tasks 10000 --page-sizes 20 100 1000
+"""
+
+import gzip
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import ORJSONRenderer
+from tasks.management.benchmark import median_ms, seed_tasks
+from tasks.models import Task
+from tasks.serializers import TaskReadSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    """Время рендеринга JSON и размер ответа со сжатием и без."""
+
+    help = "Сравнивает JSONRenderer и ORJSONRenderer, размер ответа gzip/brotli."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument(
+            "--seed-tasks",
+            type=int,
+            default=0,
+            help="Сначала сгенерировать столько задач (bulk_create).",
+        )
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--lists", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=100)
+        parser.add_argument(
+            "--page-sizes", type=int, nargs="+", default=[20, 100, 1000]
+        )
+
+    def handle(self, *args, **options):  # noqa
+        if options["seed_tasks"]:
+            self.stdout.write(f"Генерация {options['seed_tasks']} задач...")
+            seed_tasks(options["seed_tasks"], options["users"], options["lists"])
+
+        queryset = TaskReadSerializer.select(
+            Task.objects.order_by("-created_at", "-id")
+        )
+        for size in options["page_sizes"]:
+            data = TaskReadSerializer(queryset[:size], many=True).data
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"Страница из {len(data)} задач")
+            )
+            self.report_rendering(data, options["repeat"])
+            self.report_compression(ORJSONRenderer().render(data), options["repeat"])
+
+    def report_rendering(self, data, repeat):
+        """Медианное время рендеринга стандартным и orjson-рендерером."""
+        json_ms = median_ms(lambda: JSONRenderer().render(data), repeat)
+        orjson_ms = median_ms(lambda: ORJSONRenderer().render(data), repeat)
+        speedup = json_ms / orjson_ms if orjson_ms else float("inf")
+        self.stdout.write(
+            f"рендеринг, мс: json {json_ms:.3f}, orjson {orjson_ms:.3f}  x{speedup:.1f}"
+        )
+
+    def report_compression(self, body, repeat):
+        """Размер тела без сжатия, с gzip и brotli, и время сжатия."""
+        compressors = {"gzip": lambda: gzip.compress(body, compresslevel=6)}
+        if brotli is not None:
+            quality = settings.COMPRESSION_BROTLI_QUALITY
+            compressors["br"] = lambda: brotli.compress(body, quality=quality)
+
+        self.stdout.write(f"{'identity':<9} {len(body):>10} байт")
+        for encoding, compress in compressors.items():
+            self.stdout.write(
+                f"{encoding:<9} {len(compress()):>10} байт  "
+                f"сжатие {median_ms(compress, repeat):.3f} мс"
+            )
@@ -0,0 +1,83 @@
+"""
+Benchmark of the owner-or-assignee filter: JOIN + OR versus UNION of ids.
+
+Пример:
+    python manage.py benchmark_task_access --seed-tasks 1000000 --repeat 20
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from tasks.access import accessible_tasks
+from tasks.management.benchmark import median_ms, seed_tasks
+from tasks.models import ListTask, Task
+
+
+class Command(BaseCommand):
+    """Планы и время запросов доступа к задачам: `OR` против `UNION`."""
+
+    help = "Сравнивает фильтр доступа к задачам через OR и через UNION."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument(
+            "--seed-tasks",
+            type=int,
+            default=0,
+            help="Сначала сгенерировать столько задач (bulk_create).",
+        )
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--lists", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):  # noqa
+        if options["seed_tasks"]:
+            self.stdout.write(f"Генерация {options['seed_tasks']} задач...")
+            seed_tasks(options["seed_tasks"], options["users"], options["lists"])
+
+        # Владелец с наибольшим числом списков: обе ветви UNION непустые
+        owner = (
+            ListTask.objects.values("owner")
+            .annotate(lists=Count("id"))
+            .order_by("-lists")
+            .first()
+        )
+        if owner is None:
+            self.stderr.write("Нет списков задач: используйте --seed-tasks.")
+            return
+        user = ListTask.objects.filter(owner=owner["owner"]).first().owner
+        sample = accessible_tasks(user).order_by().first()
+
+        variants = {
+            "or_join": Task.objects.filter(
+                Q(list_tasks__owner=user) | Q(assigned_to=user)
+            ),
+            "union": accessible_tasks(user),
+        }
+        queries = {
+            "first_page": lambda qs: list(qs.order_by("-created_at", "-id")[:20]),
+            "count": lambda qs: qs.count(),
+            "detail": lambda qs: qs.filter(id=sample.id).first(),
+        }
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"Задач в таблице: {Task.objects.count()}, "
+                f"доступно пользователю {user.pk}: {variants['union'].count()}"
+            )
+        )
+        timings = {}
+        for variant, qs in variants.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Вариант {variant}"))
+            self.stdout.write(qs.order_by("-created_at", "-id")[:20].explain())
+            for name, run in queries.items():
+                timings[variant, name] = median_ms(
+                    lambda run=run, qs=qs: run(qs), options["repeat"]
+                )
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Итог (медиана, мс)"))
+        for name in queries:
+            before, after = timings["or_join", name], timings["union", name]
+            speedup = before / after if after else float("inf")
+            self.stdout.write(
+                f"{name:<16} {before:>10.2f} -> {after:>10.2f}  x{speedup:.1f}"
+            )
@@ -0,0 +1,127 @@
+"""
+Benchmark of the hot Task queries with and without the composite/partial indexes.
+
+Команда удаляет и заново создаёт индексы Task в `DATABASES["default"]` (с
+блокировкой таблицы) и может заполнить её миллионами строк, поэтому без
+`DEBUG` запускается только с флагом `--i-know-this-drops-indexes` — на
+отдельной (scratch) базе.
+
+Пример:
+    python manage.py benchmark_task_indexes --seed-tasks 1000000 --repeat 20
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from notify.cron_tasks import OVERDUE_CHUNK_SIZE, overdue_candidates
+from tasks.management.benchmark import median_ms, seed_tasks
+from tasks.models import Task
+
+INDEX_NAMES = (
+    "task_assignee_created_idx",
+    "task_list_created_idx",
+    "task_active_deadline_idx",
+)
+
+
+class Command(BaseCommand):
+    """Планы и время горячих запросов к Task до и после индексов."""
+
+    help = "Сравнивает планы и время запросов к Task с индексами и без них."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument(
+            "--seed-tasks",
+            type=int,
+            default=0,
+            help="Сначала сгенерировать столько задач (bulk_create).",
+        )
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--lists", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument(
+            "--i-know-this-drops-indexes",
+            action="store_true",
+            dest="confirmed",
+            help="Разрешить запуск без DEBUG (индексы Task удаляются на время замера).",
+        )
+
+    def handle(self, *args, **options):  # noqa
+        if not (settings.DEBUG or options["confirmed"]):
+            raise CommandError(
+                "Команда удаляет индексы Task в базе "
+                f"{connection.settings_dict['NAME']!s}. Запускайте её на отдельной "
+                "базе с DEBUG=True или с флагом --i-know-this-drops-indexes."
+            )
+        if options["seed_tasks"]:
+            self.stdout.write(f"Генерация {options['seed_tasks']} задач...")
+            seed_tasks(options["seed_tasks"], options["users"], options["lists"])
+
+        sample = Task.objects.exclude(assigned_to=None).order_by("?").first()
+        if sample is None:
+            self.stderr.write("Нет задач с исполнителем: используйте --seed-tasks.")
+            return
+
+        queries = self.get_queries(sample)
+        indexes = [index for index in Task._meta.indexes if index.name in INDEX_NAMES]
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"Задач в таблице: {Task.objects.count()}")
+        )
+        self.set_indexes(indexes, present=False)
+        try:
+            without = self.run_queries(queries, options["repeat"], "без индексов")
+        finally:
+            self.set_indexes(indexes, present=True)
+        with_idx = self.run_queries(queries, options["repeat"], "с индексами")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Итог (медиана, мс)"))
+        for name in queries:
+            before, after = without[name], with_idx[name]
+            speedup = before / after if after else float("inf")
+            self.stdout.write(
+                f"{name:<24} {before:>10.2f} -> {after:>10.2f}  x{speedup:.1f}"
+            )
+
+    def get_queries(self, sample):
+        """Горячие запросы: как во вью и в проходе по просроченным задачам."""
+        now = timezone.now()
+        return {
+            "assigned_tasks": lambda: Task.objects.filter(
+                assigned_to_id=sample.assigned_to_id
+            ).order_by("-created_at", "-id")[:20],
+            "tasks_in_list": lambda: Task.objects.filter(
+                list_tasks_id=sample.list_tasks_id
+            ).order_by("-created_at", "-id")[:20],
+            "overdue_sweep": lambda: (
+                overdue_candidates(now)
+                .order_by("id")
+                .values_list("id", flat=True)[:OVERDUE_CHUNK_SIZE]
+            ),
+        }
+
+    def run_queries(self, queries, repeat, title):
+        """Печатает план каждого запроса и возвращает медианы времени в мс."""
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Запросы {title}"))
+        timings = {}
+        for name, make_qs in queries.items():
+            self.stdout.write(self.style.SUCCESS(name))
+            self.stdout.write(make_qs().explain())
+            timings[name] = median_ms(lambda q=make_qs: list(q()), repeat)
+            self.stdout.write(f"  медиана: {timings[name]:.2f} мс")
+        return timings
+
+    def set_indexes(self, indexes, present):
+        """Создаёт или удаляет индексы напрямую в схеме БД."""
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(
+                cursor, Task._meta.db_table
+            )
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                if present and index.name not in existing:
+                    editor.add_index(Task, index)
+                elif not present and index.name in existing:
+                    editor.remove_index(Task, index)
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the task page serialization: TaskSerializer vs TaskReadSerializer.
+
+Пример:
+    python manage.py benchmark_task_serializers --seed-tasks 10000 --repeat 200
+"""
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from tasks.management.benchmark import median_ms, seed_tasks
+from tasks.models import Task
+from tasks.serializers import TaskReadSerializer, TaskSerializer
+
+
+class Command(BaseCommand):
+    """Время чтения и сериализации страницы задач двумя способами."""
+
+    help = "Сравнивает TaskSerializer и TaskReadSerializer на страницах задач."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument(
+            "--seed-tasks",
+            type=int,
+            default=0,
+            help="Сначала сгенерировать столько задач (bulk_create).",
+        )
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--lists", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=100)
+        parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100])
+
+    def handle(self, *args, **options):  # noqa
+        if options["seed_tasks"]:
+            self.stdout.write(f"Генерация {options['seed_tasks']} задач...")
+            seed_tasks(options["seed_tasks"], options["users"], options["lists"])
+
+        queryset = Task.objects.order_by("-created_at", "-id")
+        renderer = JSONRenderer()
+
+        def model_page(size):
+            page = queryset.select_related("list_tasks", "assigned_to")[:size]
+            return renderer.render(TaskSerializer(page, many=True).data)
+
+        def lean_page(size):
+            page = TaskReadSerializer.select(queryset)[:size]
+            return renderer.render(TaskReadSerializer(page, many=True).data)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Страница задач (медиана, мс)"))
+        for size in options["page_sizes"]:
+            if model_page(size) != lean_page(size):
+                self.stderr.write(f"JSON страницы из {size} задач различается!")
+            before = median_ms(lambda size=size: model_page(size), options["repeat"])
+            after = median_ms(lambda size=size: lean_page(size), options["repeat"])
+            speedup = before / after if after else float("inf")
+            self.stdout.write(
+                f"{size:>5} задач {before:>10.2f} -> {after:>10.2f}  x{speedup:.1f}"
+            )
@@ -0,0 +1,61 @@
+"""
+Import of tasks into a list from a CSV/NDJSON file.
+
+Пример:
+    python manage.py import_tasks 42 tasks.csv --format csv
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, import_tasks, parse_rows
+from tasks.models import ListTask
+
+
+class Command(BaseCommand):
+    """Потоковый импорт задач в список, как в `/api/lists/<id>/tasks/import/`."""
+
+    help = "Импортирует задачи из CSV/NDJSON-файла в список задач."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument("list_id", type=int)
+        parser.add_argument("path", help="Путь к файлу.")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Формат файла (по умолчанию — по расширению, иначе ndjson).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):  # noqa
+        list_task = ListTask.objects.filter(id=options["list_id"]).first()
+        if list_task is None:
+            raise CommandError(f"Список {options['list_id']} не найден.")
+
+        import_format = options["format"]
+        if import_format is None:
+            import_format = "csv" if options["path"].endswith(".csv") else "ndjson"
+
+        start = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as file:
+                result = import_tasks(
+                    list_task,
+                    parse_rows(file, import_format),
+                    chunk_size=options["chunk_size"],
+                )
+        except OSError as e:
+            raise CommandError(str(e)) from e
+        elapsed = time.perf_counter() - start
+
+        for error in result["errors"]:
+            errors = json.dumps(error["errors"], ensure_ascii=False)
+            self.stderr.write(f"Строка {error['row']}: {errors}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано задач: {result['created']}, ошибок: {len(result['errors'])}, "
+                f"за {elapsed:.2f} с"
+            )
+        )
@@ -0,0 +1,60 @@
+"""
+Generator of a large synthetic dataset.
+
+Пример:
+    python manage.py seed_data --users 100000 --lists 500000 --tasks 5000000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.management.benchmark import SEED_BATCH_SIZE, SEED_PASSWORD, seed_dataset
+
+
+class Command(BaseCommand):
+    """Пользователи, профили, списки и задачи через `bulk_create` пачками."""
+
+    help = "Генерирует пользователей, профили, списки задач и задачи."
+
+    def add_arguments(self, parser):  # noqa
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--profiles",
+            type=int,
+            default=None,
+            help="Сколько пользователей получат профиль (по умолчанию — половина).",
+        )
+        parser.add_argument("--lists", type=int, default=5000)
+        parser.add_argument("--tasks", type=int, default=100000)
+        parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Seed генератора случайных чисел."
+        )
+
+    def handle(self, *args, **options):  # noqa
+        if options["users"] < 1 or options["lists"] < 1:
+            raise CommandError("Нужен хотя бы один пользователь и один список.")
+        profiles = options["profiles"]
+        if profiles is None:
+            profiles = options["users"] // 2
+
+        prefix = seed_dataset(
+            options["users"],
+            options["lists"],
+            options["tasks"],
+            profiles=min(profiles, options["users"]),
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            log=self.log_step,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово: префикс {prefix}, пароль пользователей {SEED_PASSWORD!r}"
+            )
+        )
+
+    def log_step(self, model, count, seconds):
+        """Строка прогресса по одной модели."""
+        rate = count / seconds if seconds else 0
+        self.stdout.write(
+            f"{model.__name__}: {count} за {seconds:.1f} с ({rate:.0f} строк/с)"
+        )
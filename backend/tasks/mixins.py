@@ -3,18 +3,27 @@ The module provides base classes and admixtures for task representations.
 
 - Проверяет авторизацию.
 - Фильтрует queryset по пользователю.
-- Реализует оптимистичную блокировку через `updated_at`.
+- Реализует оптимистичную блокировку через номер версии `version`.
 - Поддерживает пагинацию, если задан `pagination_class`.
+- Отвечает 304 на условные GET по ETag/Last-Modified (`ConditionalListMixin`).
+- Кэширует страницы списков по поколениям пользователя/списка (`tasks.cache`).
 """
 
-from django.db import models
+import hashlib
+
+from django.db import models, transaction
 from django.shortcuts import get_object_or_404
-from django.utils.dateparse import parse_datetime
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import generics, status
 from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from . import cache as page_cache
+from .access import accessible_tasks
+from .models import StaleObjectError
+
 
 class ConflictError(APIException):
     """Ошибка при конфликте версий (оптимистичная блокировка)."""
@@ -28,7 +37,7 @@ class BaseUserSecureView(generics.GenericAPIView):
     """Базовый класс для всех вью."""
 
     permission_classes = [IsAuthenticated]
-    updated_at_field = "updated_at"
+    version_field = "version"
 
     def get_user_queryset(self, model):
         """Возвращает queryset, доступный текущему пользователю."""
@@ -38,9 +47,7 @@ class BaseUserSecureView(generics.GenericAPIView):
             return model.objects.filter(owner=user).select_related("owner")
 
         if model.__name__ == "Task":
-            return model.objects.filter(
-                models.Q(list_tasks__owner=user) | models.Q(assigned_to=user)
-            ).select_related("list_tasks", "assigned_to")
+            return accessible_tasks(user).select_related("list_tasks", "assigned_to")
 
         return model.objects.none()
 
@@ -50,30 +57,119 @@ class BaseUserSecureView(generics.GenericAPIView):
         return get_object_or_404(qs, **kwargs)
 
     def perform_update(self, serializer):
-        """Optimistic lock."""
-        instance = self.get_object()
-        client_updated_at = self.request.data.get(self.updated_at_field)
+        """
+        Optimistic lock.
+
+        Версия клиента подставляется в экземпляр, и сохранение выполняется одним
+        `UPDATE ... WHERE id=? AND version=?` без повторного чтения объекта.
+        """
+        client_version = self.request.data.get(self.version_field)
 
-        if not client_updated_at:
+        if client_version in (None, ""):
             raise ConflictError(
-                f"Поле '{self.updated_at_field}' обязательно для обновления."
+                f"Поле '{self.version_field}' обязательно для обновления."
             )
 
-        client_ts = parse_datetime(client_updated_at)
-        if not client_ts:
-            raise ConflictError(f"Некорректный формат поля '{self.updated_at_field}'.")
-
-        instance_ts = getattr(instance, self.updated_at_field)
-        if instance_ts != client_ts:
-            raise ConflictError("Объект уже был изменён другим пользователем.")
+        try:
+            client_version = int(client_version)
+        except (TypeError, ValueError) as exc:
+            raise ConflictError(
+                f"Некорректный формат поля '{self.version_field}'."
+            ) from exc
 
-        serializer.save()
+        try:
+            # Savepoint: при конфликте откатывается только это сохранение
+            with transaction.atomic():
+                serializer.save(**{self.version_field: client_version})
+        except StaleObjectError as exc:
+            raise ConflictError("Объект уже был изменён другим пользователем.") from exc
 
     def paginate_and_respond(self, queryset, serializer_class):
         """Применяет пагинацию (если задана) и возвращает Response."""
+        select = getattr(serializer_class, "select", None)
+        if select is not None:
+            # Сериализатор для чтения сам выбирает нужные колонки (values())
+            queryset = select(queryset)
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = serializer_class(page, many=True)
             return self.get_paginated_response(serializer.data)
         serializer = serializer_class(queryset, many=True)
         return Response(serializer.data)
+
+
+class ConditionalListMixin:
+    """
+    Условный GET для списков по ETag.
+
+    ETag строится одним агрегирующим запросом (`max(updated_at)` и число строк
+    отфильтрованного queryset), поэтому при `If-None-Match` без изменений ответ
+    304 отдаётся без сериализации. Last-Modified не отдаётся: `max(updated_at)`
+    с точностью до секунды не видит удалений и второй правки в ту же секунду.
+
+    Если задан `read_serializer_class`, страница отдаётся им (например,
+    `TaskReadSerializer` через `values()`), а `serializer_class` остаётся для записи.
+
+    Если `get_cache_scopes()` возвращает поколения (`[("user", id)]`,
+    `[("list", id)]`), страница и валидаторы кэшируются (`tasks.cache`) и
+    повторный запрос не обращается к БД.
+    """
+
+    read_serializer_class = None
+
+    def get_cache_scopes(self):
+        """Поколения кэша, от которых зависит ответ; None — без кэша."""
+        return None
+
+    def list(self, request, *args, **kwargs):  # noqa
+        scopes = self.get_cache_scopes()
+        key = None
+        if scopes:
+            key = page_cache.page_key(request.user.pk, request.get_full_path(), scopes)
+        page = page_cache.get_page(key) if key else None
+
+        if page is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            etag = self.get_list_etag(queryset)
+        else:
+            etag = page["etag"]
+
+        not_modified = get_conditional_response(request._request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        if page is None:
+            response = self.paginate_and_respond(
+                queryset, self.read_serializer_class or self.get_serializer_class()
+            )
+            if key:
+                page_cache.set_page(
+                    key,
+                    {"etag": etag, "data": response.data},
+                )
+        else:
+            response = Response(page["data"])
+
+        response["ETag"] = etag
+        return response
+
+    def get_list_etag(self, queryset):
+        """Возвращает ETag для отфильтрованного queryset."""
+        stats = queryset.aggregate(
+            total=models.Count("id"),
+            last=models.Max("updated_at"),
+            # Сериализатор отдаёт имя списка — его изменение тоже меняет ответ
+            list_last=models.Max("list_tasks__updated_at"),
+        )
+        last = max(filter(None, [stats["last"], stats["list_last"]]), default=None)
+        # Ответ зависит от пользователя и параметров запроса (пагинация)
+        key = "|".join(
+            [
+                str(self.request.user.pk),
+                self.request.get_full_path(),
+                str(stats["total"]),
+                last.isoformat() if last else "",
+            ]
+        )
+        return quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
@@ -1,21 +1,99 @@
 """Django models for the tasks app."""
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import DatabaseError, models, router, transaction
+from django.db.models import signals
 from django.utils import timezone
 
 User = get_user_model()
 
 
+class StaleObjectError(DatabaseError):
+    """Строка в БД имеет другую версию: объект изменён или удалён."""
+
+
 class BaseModel(models.Model):
     """Абстрактная модель, содержащая общие поля."""
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+    version = models.PositiveIntegerField(default=1, verbose_name="Версия")
 
     class Meta:  # noqa
         abstract = True
 
+    def save(
+        self, *, force_insert=False, force_update=False, using=None, update_fields=None
+    ):
+        """
+        Оптимистичная блокировка: `UPDATE ... WHERE id=? AND version=?`.
+
+        Ожидаемая версия — значение `version` у экземпляра (загруженное из БД
+        или переданное клиентом); при успехе версия увеличивается на 1.
+        Обновление выполняется одним запросом через `QuerySet.update()`,
+        сигналы `pre_save`/`post_save` отправляются как при обычном `save()`.
+        """
+        if self._state.adding or force_insert:
+            return super().save(
+                force_insert=force_insert,
+                force_update=force_update,
+                using=using,
+                update_fields=update_fields,
+            )
+
+        cls = type(self)
+        using = using or router.db_for_write(cls, instance=self)
+        if update_fields is None:
+            # Как и Django, сохраняем только загруженные поля
+            deferred = self.get_deferred_fields()
+            if deferred:
+                update_fields = frozenset(
+                    f.attname
+                    for f in self._meta.concrete_fields
+                    if f.attname not in deferred
+                )
+        elif not update_fields:
+            return
+        else:
+            update_fields = frozenset(update_fields) | {"version"}
+
+        signals.pre_save.send(
+            sender=cls,
+            instance=self,
+            raw=False,
+            using=using,
+            update_fields=update_fields,
+        )
+        fields = [
+            f
+            for f in self._meta.local_concrete_fields
+            if not f.primary_key
+            and (
+                update_fields is None
+                or f.name in update_fields
+                or f.attname in update_fields
+            )
+        ]
+        values = {f.attname: f.pre_save(self, False) for f in fields}
+        values["version"] = self.version + 1
+        updated = (
+            cls._base_manager.using(using)
+            .filter(pk=self.pk, version=self.version)
+            .update(**values)
+        )
+        if not updated:
+            raise StaleObjectError("Объект уже был изменён другим пользователем.")
+        self.version += 1
+        self._state.db = using
+        signals.post_save.send(
+            sender=cls,
+            instance=self,
+            created=False,
+            update_fields=update_fields,
+            raw=False,
+            using=using,
+        )
+
 
 class ListTask(BaseModel):
     """Модель, представляющая список задач."""
@@ -82,43 +160,132 @@ class Task(BaseModel):
     )
 
     class Meta:  # noqa
+        indexes = [
+            # GET /api/tasks/: assigned_to=user ORDER BY -created_at, -id
+            models.Index(
+                fields=["assigned_to", "-created_at", "-id"],
+                name="task_assignee_created_idx",
+            ),
+            # GET /api/lists/<id>/tasks/: list_tasks=X ORDER BY -created_at, -id
+            models.Index(
+                fields=["list_tasks", "-created_at", "-id"],
+                name="task_list_created_idx",
+            ),
+            # Проход по просроченным: только незавершённые задачи с дедлайном
+            models.Index(
+                fields=["complete_before"],
+                name="task_active_deadline_idx",
+                condition=models.Q(complete_before__isnull=False)
+                & ~models.Q(status__in=[TaskStatus.COMPLETED, TaskStatus.OVERDUE]),
+            ),
+        ]
         verbose_name = "Задача"
         verbose_name_plural = "Задачи"
         ordering = ["-created_at"]
         unique_together = ["name", "list_tasks"]
 
+    # Поля, значения которых запоминаются при загрузке из БД (для сигналов)
+    tracked_fields = ("assigned_to_id", "status", "complete_before")
+
     def __str__(self):
         """Возвращает строковое представление задачи."""
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные значения отслеживаемых полей."""
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self):
+        # Отложенные (defer/only) поля не читаем, чтобы не вызвать лишний запрос
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field: getattr(self, field)
+            for field in self.tracked_fields
+            if field not in deferred
+        }
+
+    def get_loaded_value(self, field, default=None):
+        """Значение поля на момент загрузки из БД или последнего сохранения."""
+        return getattr(self, "_loaded_values", {}).get(field, default)
+
     def save(self, *args, **kwargs):
         """Автоматически обновляем статус."""
         # Если задача назначена
-        if self.assigned_to and self.status == TaskStatus.PENDING:
+        if self.assigned_to_id and self.status == TaskStatus.PENDING:
             self.status = TaskStatus.IN_PROGRESS
         super().save(*args, **kwargs)
+        # post_save уже отработал со старыми значениями — фиксируем новые
+        self._remember_loaded_values()
 
     def mark_completed(self):
-        """Помечает задачу как выполненную."""
+        """
+        Помечает задачу как выполненную.
+
+        False, если задача не в работе или изменена другим пользователем.
+        """
         if self.status == TaskStatus.IN_PROGRESS:
-            self.status = TaskStatus.COMPLETED
-            self.save(update_fields=["status", "updated_at"])
-            return True
+            return self._set_status(TaskStatus.COMPLETED)
         return False
 
     def mark_overdue(self):
-        """Помечает задачу как просроченную."""
+        """
+        Помечает задачу как просроченную.
+
+        False, если срок не истёк, задача завершена или изменена другим
+        пользователем.
+        """
         if (
             self.complete_before
             and self.complete_before < timezone.now()
             and self.status not in [TaskStatus.COMPLETED, TaskStatus.OVERDUE]
         ):
-            self.status = TaskStatus.OVERDUE
-            self.save(update_fields=["status", "updated_at"])
-            return True
+            return self._set_status(TaskStatus.OVERDUE)
         return False
 
+    def _set_status(self, status):
+        old_status, self.status = self.status, status
+        try:
+            # Savepoint: конфликт версий не ломает внешнюю транзакцию
+            with transaction.atomic():
+                self.save(update_fields=["status", "updated_at"])
+        except StaleObjectError:
+            self.status = old_status
+            return False
+        return True
+
     @property
     def is_completed(self):
         """Возвращает True, если задача выполнена."""
         return self.status == TaskStatus.COMPLETED
+
+
+class TaskTombstone(models.Model):
+    """
+    Отметка о том, что задача больше не видна пользователю.
+
+    Создаётся при удалении задачи и при снятии её с исполнителя; по ним
+    `/api/tasks/changes/` сообщает клиенту, какие задачи убрать.
+    """
+
+    task_id = models.BigIntegerField(verbose_name="ID задачи")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="task_tombstones",
+        verbose_name="Пользователь",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:  # noqa
+        indexes = [
+            models.Index(fields=["user", "id"]),  # Выборка новых отметок по курсору
+        ]
+        verbose_name = "Удалённая задача"
+        verbose_name_plural = "Удалённые задачи"
+
+    def __str__(self):
+        """Возвращает строковое представление отметки."""
+        return f"{self.task_id} -> {self.user_id}"
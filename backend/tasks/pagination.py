@@ -0,0 +1,147 @@
+"""
+Pagination classes for the tasks app.
+
+`KeysetPagination` — курсорная (keyset) пагинация по паре `(created_at, id)`:
+- не выполняет `COUNT(*)` и `OFFSET`, поэтому глубокие страницы стоят столько же,
+  сколько первая;
+- курсоры `next`/`previous` непрозрачны для клиента (base64);
+- порядок совпадает с `ordering = ["-created_at"]` моделей, `id` разрешает равенство.
+
+Подключается глобально через `REST_FRAMEWORK["DEFAULT_PAGINATION_CLASS"]`
+(переменная окружения `PAGINATION_CLASS`) или для отдельной вью через
+атрибут `pagination_class`.
+"""
+
+import base64
+import binascii
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по `(created_at, id)` без подсчёта общего количества."""
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Возвращает одну страницу, начиная с позиции из курсора."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = False
+        if self.cursor is not None:
+            created_at, pk, reverse = self.cursor
+            # Вперёд — строки «старше» курсора, назад — «новее».
+            if reverse:
+                position = Q(created_at__gt=created_at) | Q(
+                    created_at=created_at, id__gt=pk
+                )
+            else:
+                position = Q(created_at__lt=created_at) | Q(
+                    created_at=created_at, id__lt=pk
+                )
+            queryset = queryset.filter(position)
+
+        ordering = ("created_at", "id") if reverse else ("-created_at", "-id")
+        # Берём на одну строку больше, чтобы узнать, есть ли следующая страница.
+        results = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return self.page
+
+    def get_page_size(self, request):
+        """Размер страницы из `?limit=`, ограниченный `max_page_size`."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):  # noqa
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):  # noqa
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):  # noqa
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):  # noqa
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def decode_cursor(self, request):
+        """Разбирает курсор из запроса в `(created_at, id, reverse)`."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            querystring = base64.urlsafe_b64decode(encoded.encode("ascii")).decode()
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            created_at = parse_datetime(tokens["t"][0])
+            pk = int(tokens["i"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (KeyError, IndexError, ValueError, TypeError, binascii.Error) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, reverse
+
+    def encode_cursor(self, obj, reverse):
+        """Кодирует позицию объекта (или строки `values()`) в ссылку с курсором."""
+        if isinstance(obj, dict):
+            created_at, pk = obj["created_at"], obj["id"]
+        else:
+            created_at, pk = obj.created_at, obj.pk
+        tokens = {"t": created_at.isoformat(), "i": pk}
+        if reverse:
+            tokens["r"] = "1"
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = base64.urlsafe_b64encode(querystring.encode()).decode("ascii")
+        url = remove_query_param(self.base_url, "offset")
+        return replace_query_param(url, self.cursor_query_param, encoded)
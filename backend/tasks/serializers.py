@@ -1,8 +1,9 @@
 """Django REST Framework serializers for the tasks app."""
 
+from django.db.models import F
 from rest_framework import serializers
 
-from .models import ListTask, Task
+from .models import ListTask, Task, TaskStatus
 
 
 class ListTaskSerializer(serializers.ModelSerializer):
@@ -12,8 +13,9 @@ class ListTaskSerializer(serializers.ModelSerializer):
 
     class Meta:  # noqa
         model = ListTask
-        fields = ["id", "name", "owner_username", "updated_at"]
-        read_only_fields = ["owner"]
+        fields = ["id", "name", "owner_username", "updated_at", "version"]
+        # version задаётся только через оптимистичную блокировку во вью
+        read_only_fields = ["owner", "version"]
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -35,4 +37,98 @@ class TaskSerializer(serializers.ModelSerializer):
             "status",
             "is_completed",
             "updated_at",
+            "version",
         ]
+        read_only_fields = ["version"]
+
+
+class TaskReadSerializer:
+    """
+    Быстрое чтение задач для списков (только отображение).
+
+    Колонки выбираются `values()` с именами списка и исполнителя из JOIN, словари
+    собираются напрямую, без полей DRF и экземпляров моделей. Результат совпадает
+    с `TaskSerializer` побайтно.
+    """
+
+    # Даты форматируются тем же полем DRF, что и в `TaskSerializer`
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, instance, many=False):  # noqa
+        self.instance = instance
+        self.many = many
+
+    @staticmethod
+    def select(queryset):
+        """Только нужные колонки; `created_at` — для курсорной пагинации."""
+        return queryset.values(
+            "id",
+            "name",
+            "description",
+            "assigned_to",
+            "complete_before",
+            "status",
+            "updated_at",
+            "version",
+            "created_at",
+            list_name=F("list_tasks__name"),
+            assignee_name=F("assigned_to__username"),
+        )
+
+    @property
+    def data(self):  # noqa
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+    def to_representation(self, row):
+        """Словарь с полями и порядком `TaskSerializer.Meta.fields`."""
+        to_datetime = self.datetime_field.to_representation
+        data = {
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "list_name": row["list_name"],
+        }
+        # Как в TaskSerializer: без исполнителя поле `assigned_to.username` пропускается
+        if row["assigned_to"] is not None:
+            data["assignee_name"] = row["assignee_name"]
+        data["assigned_to"] = row["assigned_to"]
+        data["complete_before"] = to_datetime(row["complete_before"])
+        data["status"] = row["status"]
+        data["is_completed"] = row["status"] == TaskStatus.COMPLETED
+        data["updated_at"] = to_datetime(row["updated_at"])
+        data["version"] = row["version"]
+        return data
+
+
+class TaskBulkDataSerializer(serializers.ModelSerializer):
+    """Данные задачи в массовой операции (исполнитель проверяется пачкой)."""
+
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:  # noqa
+        model = Task
+        fields = ["name", "description", "assigned_to", "complete_before", "status"]
+
+
+class BulkOperationSerializer(serializers.Serializer):
+    """Одна операция в `/api/tasks/bulk/`."""
+
+    op = serializers.ChoiceField(choices=["create", "update", "complete", "assign"])
+    id = serializers.IntegerField(required=False)
+    list_id = serializers.IntegerField(required=False)
+    version = serializers.IntegerField(required=False)
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        """Проверяет обязательные для каждого типа операции поля."""
+        if attrs["op"] == "create":
+            if "list_id" not in attrs:
+                raise serializers.ValidationError({"list_id": ["Обязательное поле."]})
+        elif "id" not in attrs:
+            raise serializers.ValidationError({"id": ["Обязательное поле."]})
+        if attrs["op"] == "assign" and "assigned_to" not in attrs:
+            raise serializers.ValidationError({"assigned_to": ["Обязательное поле."]})
+        return attrs
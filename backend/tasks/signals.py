@@ -0,0 +1,176 @@
+"""
+Signal handlers for the tasks app.
+
+Записывают отметки `TaskTombstone`, когда задача перестаёт быть видна пользователю:
+при удалении задачи и при снятии её с исполнителя.
+
+`tasks_updated` отправляется после массовых UPDATE, которые обходят `post_save`
+(аргументы: `task_ids`, `fields`); на него подписаны уведомления.
+
+`tasks_changed` — после массовых операций со смешанными изменениями (аргумент
+`changes`: список `[task_id, action, old_assigned_to_id]`).
+
+`tasks_imported` — после импорта задач в список (аргументы: `list_id`,
+`task_ids`) вместо сигналов на каждую созданную задачу.
+
+`tasks_deleted` — после массового удаления внутри `bulk_deletion()` (аргумент
+`tasks`: снимки `{"id", "name", "status", "list_tasks_id", "assigned_to_id",
+"owner_id"}`); `post_delete` на каждую строку в этом блоке пропускается.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import ListTask, Task, TaskTombstone, User
+
+tasks_updated = Signal()
+tasks_changed = Signal()
+tasks_imported = Signal()
+tasks_deleted = Signal()
+
+_bulk_deletion = ContextVar("tasks_bulk_deletion", default=False)
+# Атрибут источника удаления (`origin`): списки, отметки задач которых уже записаны
+TOMBSTONED_LISTS_ATTR = "_tombstoned_list_ids"
+
+
+@contextmanager
+def bulk_deletion():
+    """Блок массового удаления: о задачах сообщит `tasks_deleted`, не `post_delete`."""
+    token = _bulk_deletion.set(True)
+    try:
+        yield
+    finally:
+        _bulk_deletion.reset(token)
+
+
+def in_bulk_deletion():
+    """True внутри `bulk_deletion()`."""
+    return _bulk_deletion.get()
+
+
+def _list_owner_id(task):
+    """id владельца списка задачи (из кэша связи, если он заполнен)."""
+    if Task.list_tasks.is_cached(task):
+        return task.list_tasks.owner_id
+    return (
+        ListTask.objects.filter(id=task.list_tasks_id)
+        .values_list("owner_id", flat=True)
+        .first()
+    )
+
+
+def add_tombstones(task_id, user_ids):
+    """
+    Записывает отметки после фиксации транзакции.
+
+    Пользователи, удалённые той же транзакцией (каскадом), пропускаются.
+    """
+    user_ids = set(user_ids) - {None}
+    if not user_ids:
+        return
+
+    def _create():
+        TaskTombstone.objects.bulk_create(
+            TaskTombstone(task_id=task_id, user_id=user_id)
+            for user_id in User.objects.filter(id__in=user_ids).values_list(
+                "id", flat=True
+            )
+        )
+
+    transaction.on_commit(_create)
+
+
+def add_tombstones_many(pairs):
+    """То же для пар `(task_id, user_id)`: одна вставка на всю пачку."""
+    pairs = {(task_id, user_id) for task_id, user_id in pairs if user_id}
+    if not pairs:
+        return
+
+    def _create():
+        existing = set(
+            User.objects.filter(id__in={user_id for _, user_id in pairs}).values_list(
+                "id", flat=True
+            )
+        )
+        TaskTombstone.objects.bulk_create(
+            TaskTombstone(task_id=task_id, user_id=user_id)
+            for task_id, user_id in pairs
+            if user_id in existing
+        )
+
+    transaction.on_commit(_create)
+
+
+@receiver(post_save, sender=Task)
+def on_task_reassigned(sender, instance: Task, created, **kwargs):
+    """Прежний исполнитель теряет доступ к задаче, если не владеет списком."""
+    if created:
+        return
+    old_assigned_to_id = instance.get_loaded_value("assigned_to_id")
+    if not old_assigned_to_id or old_assigned_to_id == instance.assigned_to_id:
+        return
+    if old_assigned_to_id != _list_owner_id(instance):
+        add_tombstones(instance.pk, [old_assigned_to_id])
+
+
+@receiver(post_delete, sender=Task)
+def on_task_deleted(sender, instance: Task, origin=None, **kwargs):
+    """Удалённая задача пропадает у владельца списка и исполнителя."""
+    tombstoned = getattr(origin, TOMBSTONED_LISTS_ATTR, ())
+    if in_bulk_deletion() or instance.list_tasks_id in tombstoned:
+        return
+    add_tombstones(instance.pk, [_list_owner_id(instance), instance.assigned_to_id])
+
+
+@receiver(pre_delete, sender=ListTask)
+def on_list_deleting(sender, instance: ListTask, origin=None, **kwargs):
+    """
+    Отметки всех задач удаляемого списка — одной выборкой до каскада.
+
+    `on_task_deleted` задачи этого списка пропускает, иначе каскад делал бы
+    отдельный запрос владельца на каждую задачу. Пометка хранится на источнике
+    удаления (`origin`) и живёт не дольше этого вызова `delete()`; при откате
+    отложенные отметки не записываются вместе с транзакцией.
+    """
+    rows = Task.objects.filter(list_tasks_id=instance.pk).values_list(
+        "id", "assigned_to_id"
+    )
+    add_tombstones_many(
+        (task_id, user_id)
+        for task_id, assigned_to_id in rows
+        for user_id in (instance.owner_id, assigned_to_id)
+    )
+    if origin is not None:
+        tombstoned = getattr(origin, TOMBSTONED_LISTS_ATTR, set())
+        tombstoned.add(instance.pk)
+        setattr(origin, TOMBSTONED_LISTS_ATTR, tombstoned)
+
+
+@receiver(tasks_changed, sender=Task)
+def on_tasks_changed(sender, changes, **kwargs):
+    """Прежние исполнители, потерявшие доступ при массовом переназначении."""
+    old_assignees = {task_id: old for task_id, _, old in changes if old}
+    if not old_assignees:
+        return
+    current = Task.objects.filter(id__in=old_assignees).values_list(
+        "id", "assigned_to_id", "list_tasks__owner_id"
+    )
+    add_tombstones_many(
+        (task_id, old_assignees[task_id])
+        for task_id, assigned_to_id, owner_id in current
+        if old_assignees[task_id] not in (assigned_to_id, owner_id)
+    )
+
+
+@receiver(tasks_deleted, sender=Task)
+def on_tasks_deleted(sender, tasks, **kwargs):
+    """Массово удалённые задачи пропадают у владельцев списков и исполнителей."""
+    add_tombstones_many(
+        (task["id"], user_id)
+        for task in tasks
+        for user_id in (task["owner_id"], task["assigned_to_id"])
+    )
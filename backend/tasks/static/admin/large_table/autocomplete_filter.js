@@ -0,0 +1,16 @@
+'use strict';
+// Фильтры AutocompleteFilter: выбор значения открывает отфильтрованный список
+{
+    const $ = django.jQuery;
+
+    $(document).on('change', 'select.large-table-filter', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete(this.dataset.lookup);
+        params.delete(this.dataset.reset);
+        params.delete('p');
+        if (this.value) {
+            params.set(this.dataset.lookup, this.value);
+        }
+        window.location.search = params.toString();
+    });
+}
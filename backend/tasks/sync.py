@@ -0,0 +1,101 @@
+"""
+Delta synchronization of tasks for reconnecting clients.
+
+Токен синхронизации — непрозрачная строка с водяным знаком `(updated_at, id)`
+последней отданной задачи и id последней отданной отметки `TaskTombstone`.
+"""
+
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import TaskTombstone
+
+# Окно перекрытия: транзакции, зафиксированные позже водяного знака, но с более
+# ранним updated_at, попадут в следующий ответ повторно (клиент делает upsert)
+SYNC_OVERLAP = timedelta(seconds=5)
+SYNC_RETENTION = timedelta(days=getattr(settings, "TASK_SYNC_RETENTION_DAYS", 30))
+
+
+class InvalidSyncToken(ValueError):
+    """Токен не разбирается."""
+
+
+class ExpiredSyncToken(ValueError):
+    """Токен старше срока хранения отметок — нужна полная синхронизация."""
+
+
+def encode_token(updated_at, task_id, tombstone_id):
+    """Кодирует водяной знак в непрозрачный токен."""
+    data = {"t": updated_at.isoformat(), "i": task_id, "d": tombstone_id}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode("ascii")
+
+
+def decode_token(token):
+    """Разбирает токен в `(updated_at, task_id, tombstone_id)`."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        updated_at = parse_datetime(data["t"])
+        if updated_at is None:
+            raise ValueError("Некорректная дата")
+        return updated_at, int(data["i"]), int(data["d"])
+    except (KeyError, TypeError, ValueError, binascii.Error) as e:
+        raise InvalidSyncToken(str(e)) from e
+
+
+def collect_changes(tasks, user, token=None, limit=500):
+    """
+    Возвращает изменения после водяного знака из `token`.
+
+    `tasks` — queryset задач, видимых пользователю. Результат — словарь с
+    изменёнными задачами, id задач-«надгробий», новым токеном и `has_more`.
+    """
+    now = timezone.now()
+    if token:
+        updated_at, task_id, tombstone_id = decode_token(token)
+        if updated_at < now - SYNC_RETENTION:
+            raise ExpiredSyncToken("Токен синхронизации устарел")
+        tasks = tasks.filter(
+            models.Q(updated_at__gt=updated_at)
+            | models.Q(updated_at=updated_at, id__gt=task_id)
+        )
+    else:
+        # Первичная синхронизация: все видимые задачи, отметки — только новые
+        tombstone_id = (
+            TaskTombstone.objects.aggregate(last=models.Max("id"))["last"] or 0
+        )
+
+    changed = list(tasks.order_by("updated_at", "id")[: limit + 1])
+    tombstones = list(
+        TaskTombstone.objects.filter(user=user, id__gt=tombstone_id)
+        .order_by("id")
+        .values_list("id", "task_id")[: limit + 1]
+    )
+    has_more = len(changed) > limit or len(tombstones) > limit
+    changed, tombstones = changed[:limit], tombstones[:limit]
+
+    if has_more and changed:
+        # Следующая порция начнётся строго после последней отданной задачи
+        updated_at, task_id = changed[-1].updated_at, changed[-1].id
+    elif not has_more:
+        # Всё до текущего момента отдано; хвост окна перекрытия придёт повторно
+        updated_at, task_id = now - SYNC_OVERLAP, 0
+    if tombstones:
+        tombstone_id = tombstones[-1][0]
+
+    # Задача, снова ставшая видимой, приходит в tasks и не удаляется клиентом
+    changed_ids = {task.id for task in changed}
+    deleted = sorted({tid for _, tid in tombstones} - changed_ids)
+
+    return {
+        "tasks": changed,
+        "deleted": deleted,
+        "token": encode_token(updated_at, task_id, tombstone_id),
+        "has_more": has_more,
+    }
@@ -0,0 +1,31 @@
+"""Template tags for the large-table admin mode (`tasks.admin_utils`)."""
+
+import copy
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from tasks.admin_utils import CachedDateQuerySet
+
+register = template.Library()
+
+
+def cached_date_hierarchy(cl):
+    """`date_hierarchy`, у которого MIN/MAX и списки дат берутся из кэша."""
+    proxy = copy.copy(cl)
+    proxy.queryset = CachedDateQuerySet(
+        cl.queryset, cl.model_admin.get_date_hierarchy_timeout()
+    )
+    return date_hierarchy(proxy)
+
+
+@register.tag(name="cached_date_hierarchy")
+def cached_date_hierarchy_tag(parser, token):  # noqa
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=cached_date_hierarchy,
+        template_name="date_hierarchy.html",
+        takes_context=False,
+    )
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from tasks.access import accessible_tasks
+from tasks.models import ListTask, Task
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def mock_notify():
+    with patch("notify.signals.enqueue_task_change") as mock:
+        yield mock
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create_user(username="anotheruser", password="testpassword")
+
+
+@pytest.mark.django_db
+class TestAccessibleTasks:
+    def test_owner_or_assignee(self, user, another_user):
+        own_list = ListTask.objects.create(name="Own", owner=user)
+        foreign_list = ListTask.objects.create(name="Foreign", owner=another_user)
+        owned = Task.objects.create(name="Owned", list_tasks=own_list)
+        # И владелец, и исполнитель — задача не должна задваиваться
+        both = Task.objects.create(name="Both", list_tasks=own_list, assigned_to=user)
+        assigned = Task.objects.create(
+            name="Assigned", list_tasks=foreign_list, assigned_to=user
+        )
+        Task.objects.create(
+            name="Hidden", list_tasks=foreign_list, assigned_to=another_user
+        )
+
+        result = list(accessible_tasks(user))
+
+        assert sorted(task.id for task in result) == sorted(
+            [owned.id, both.id, assigned.id]
+        )
+
+    def test_scopes_given_queryset(self, user, another_user):
+        own_list = ListTask.objects.create(name="Own", owner=user)
+        task = Task.objects.create(name="Task", list_tasks=own_list)
+
+        qs = accessible_tasks(another_user, Task.objects.filter(id=task.id))
+
+        assert not qs.exists()
+        assert accessible_tasks(user).filter(id=task.id).update(name="Renamed") == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_command(capsys):
+    call_command("benchmark_task_access", seed_tasks=200, users=5, lists=10, repeat=1)
+
+    out = capsys.readouterr().out
+    assert "or_join" in out
+    assert "union" in out
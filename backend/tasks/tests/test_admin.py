@@ -0,0 +1,340 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.admin import TaskAdmin, display_task_ids
+from tasks.admin_utils import EstimatedCountPaginator
+from tasks.models import (
+    ListTask,
+    StaleObjectError,
+    Task,
+    TaskStatus,
+    TaskTombstone,
+    User,
+)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+def admin_lists(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    queryset = site._registry[ListTask].get_queryset(request)
+    return {list_task.name: list_task for list_task in queryset.order_by("id")}
+
+
+@pytest.mark.django_db
+def test_display_task_ids(user, django_assert_num_queries):
+    ListTask.objects.create(name="Empty", owner=user)
+    small = ListTask.objects.create(name="Small", owner=user)
+    big = ListTask.objects.create(name="Big", owner=user)
+    small_ids = [
+        Task.objects.create(name=f"S{i}", list_tasks=small).id for i in range(2)
+    ]
+    big_ids = [Task.objects.create(name=f"B{i}", list_tasks=big).id for i in range(5)]
+
+    # Списки и prefetch первых задач — два запроса на всю страницу
+    with django_assert_num_queries(2):
+        lists = admin_lists(user)
+        summaries = {name: display_task_ids(obj) for name, obj in lists.items()}
+
+    assert summaries == {
+        "Empty": "No tasks",
+        "Small": f"{small_ids[0]}, {small_ids[1]} (2)",
+        "Big": f"{big_ids[0]}, {big_ids[1]}, {big_ids[2]}... (5)",
+    }
+
+
+@pytest.fixture
+def admin_client(client, db):
+    admin = User.objects.create_superuser(username="admin", password="adminpassword")
+    client.force_login(admin)
+    return client
+
+
+@pytest.mark.django_db
+class TestLargeTableTaskAdmin:
+    def test_autocomplete_filter(self, admin_client, user):
+        other = User.objects.create_user(username="other-user", password="testpassword")
+        list_task = ListTask.objects.create(name="List", owner=user)
+        Task.objects.create(name="Mine", list_tasks=list_task, assigned_to=user)
+        Task.objects.create(name="Theirs", list_tasks=list_task, assigned_to=other)
+        url = reverse("admin:tasks_task_changelist")
+
+        response = admin_client.get(url, {"assigned_to__id__exact": user.id})
+
+        content = response.content.decode()
+        assert response.status_code == 200
+        assert list(
+            response.context["cl"].result_list.values_list("name", flat=True)
+        ) == ["Mine"]
+        # Пользователи не выгружаются в боковую панель: только выбранный
+        assert f'<option value="{user.id}" selected>testuser</option>' in content
+        assert "other-user</a>" not in content
+        assert 'data-lookup="assigned_to__id__exact"' in content
+
+        response = admin_client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "other",
+                "app_label": "tasks",
+                "model_name": "task",
+                "field_name": "assigned_to",
+            },
+        )
+        assert response.json()["results"] == [
+            {"id": str(other.id), "text": "other-user"}
+        ]
+
+    def test_date_hierarchy_cached(self, admin_client, user):
+        list_task = ListTask.objects.create(name="List", owner=user)
+        Task.objects.create(
+            name="Task", list_tasks=list_task, complete_before=timezone.now()
+        )
+        url = reverse("admin:tasks_task_changelist")
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as first:
+            admin_client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            response = admin_client.get(url)
+
+        assert response.status_code == 200
+        assert any("MIN(" in query["sql"] for query in first.captured_queries)
+        assert not any("MIN(" in query["sql"] for query in second.captured_queries)
+        assert len(second) == len(first) - 2
+
+    def test_no_full_count_and_editable_assignee(self, admin_client, user):
+        list_task = ListTask.objects.create(name="List", owner=user)
+        Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(reverse("admin:tasks_task_changelist"))
+
+        counts = [
+            query for query in queries.captured_queries if "COUNT(" in query["sql"]
+        ]
+        assert len(counts) == 1
+        assert 'name="form-0-assigned_to"' in response.content.decode()
+
+    def test_estimated_count_paginator(self, settings):
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+        queryset = Task.objects.all()
+
+        with patch("tasks.admin_utils.estimate_count", return_value=250000):
+            assert EstimatedCountPaginator(queryset, 100).count == 250000
+        with patch("tasks.admin_utils.estimate_count", return_value=10):
+            assert EstimatedCountPaginator(queryset, 100).count == 0
+        assert EstimatedCountPaginator(queryset, 100).count == 0
+
+
+def run_action(client, action, data=None, **filters):
+    """Действие над всеми задачами выборки списка (флажок «выбрать все»)."""
+    url = reverse("admin:tasks_task_changelist")
+    if filters:
+        url += "?" + "&".join(f"{key}={value}" for key, value in filters.items())
+    post = {
+        "action": action,
+        "select_across": "1",
+        "index": "0",
+        "_selected_action": ["0"],
+    }
+    return client.post(url, {**post, **(data or {})})
+
+
+@pytest.mark.django_db
+class TestTaskBulkActions:
+    @pytest.fixture(autouse=True)
+    def dispatch(self):
+        with (
+            patch("notify.signals.enqueue_task_change") as single,
+            patch("notify.signals.dispatch_tasks_batch") as batch,
+            patch("notify.signals.dispatch_tasks_deleted") as deleted,
+        ):
+            yield {"single": single, "batch": batch, "deleted": deleted}
+
+    @pytest.fixture
+    def tasks(self, user):
+        list_task = ListTask.objects.create(name="List", owner=user)
+        return Task.objects.bulk_create(
+            Task(name=f"Task {i}", list_tasks=list_task, status=TaskStatus.IN_PROGRESS)
+            for i in range(30)
+        )
+
+    def test_mark_completed_single_batch(
+        self, admin_client, tasks, dispatch, django_capture_on_commit_callbacks
+    ):
+        with (
+            django_capture_on_commit_callbacks(execute=True),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            response = run_action(admin_client, "mark_completed")
+
+        assert response.status_code == 302
+        assert Task.objects.filter(status=TaskStatus.COMPLETED).count() == 30
+        assert set(Task.objects.values_list("version", flat=True)) == {2}
+        dispatch["single"].assert_not_called()
+        dispatch["batch"].delay.assert_called_once()
+        assert len(dispatch["batch"].delay.call_args.args[0]) == 30
+        assert (
+            sum(" UPDATE " in f" {query['sql']}" for query in queries.captured_queries)
+            == 1
+        )
+
+    def test_mark_completed_only_in_progress(self, admin_client, tasks):
+        Task.objects.filter(id=tasks[0].id).update(status=TaskStatus.PENDING)
+        Task.objects.filter(id=tasks[1].id).update(status=TaskStatus.OVERDUE)
+
+        run_action(admin_client, "mark_completed")
+
+        assert Task.objects.get(id=tasks[0].id).status == TaskStatus.PENDING
+        assert Task.objects.get(id=tasks[1].id).status == TaskStatus.OVERDUE
+        assert Task.objects.filter(status=TaskStatus.COMPLETED).count() == 28
+
+    def test_mark_overdue_filtered(self, admin_client, tasks):
+        Task.objects.filter(id=tasks[0].id).update(status=TaskStatus.PENDING)
+
+        run_action(admin_client, "mark_overdue", status__exact=TaskStatus.PENDING)
+
+        assert list(
+            Task.objects.filter(status=TaskStatus.OVERDUE).values_list("id", flat=True)
+        ) == [tasks[0].id]
+
+    def test_reassign_form_and_apply(
+        self, admin_client, user, tasks, dispatch, django_capture_on_commit_callbacks
+    ):
+        Task.objects.filter(id=tasks[0].id).update(status=TaskStatus.PENDING)
+        other = User.objects.create_user(username="other-user", password="testpassword")
+
+        response = run_action(admin_client, "reassign")
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert 'name="assigned_to"' in content and 'value="reassign"' in content
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = run_action(
+                admin_client, "reassign", {"apply": "1", "assigned_to": other.id}
+            )
+
+        assert response.status_code == 302
+        assert set(Task.objects.values_list("assigned_to", flat=True)) == {other.id}
+        assert Task.objects.get(id=tasks[0].id).status == TaskStatus.IN_PROGRESS
+        changes = dispatch["batch"].delay.call_args.args[0]
+        assert {old for _, _, old in changes} == {None}
+
+    def test_move_to_list(
+        self, admin_client, user, tasks, django_capture_on_commit_callbacks
+    ):
+        other = User.objects.create_user(username="other-user", password="testpassword")
+        target = ListTask.objects.create(name="Target", owner=other)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            run_action(
+                admin_client, "move_to_list", {"apply": "1", "list_tasks": target.id}
+            )
+
+        assert Task.objects.filter(list_tasks=target).count() == 30
+        # Прежний владелец списка больше не видит задачи
+        assert TaskTombstone.objects.filter(user=user).count() == 30
+
+    def test_move_to_list_name_conflict(self, admin_client, user, tasks):
+        target = ListTask.objects.create(name="Target", owner=user)
+        Task.objects.create(name="Task 0", list_tasks=target)
+
+        run_action(
+            admin_client, "move_to_list", {"apply": "1", "list_tasks": target.id}
+        )
+
+        response = admin_client.get(reverse("admin:tasks_task_changelist"))
+        assert "Имена задач повторятся в списке: Task 0" in response.content.decode()
+        assert Task.objects.filter(list_tasks=target).count() == 1
+
+    def test_move_to_list_concurrent_conflict(self, admin_client, user, tasks):
+        target = ListTask.objects.create(name="Target", owner=user)
+
+        with patch("tasks.bulk._update_rows", side_effect=IntegrityError):
+            response = run_action(
+                admin_client, "move_to_list", {"apply": "1", "list_tasks": target.id}
+            )
+
+        assert response.status_code == 302
+        response = admin_client.get(reverse("admin:tasks_task_changelist"))
+        assert "Конфликт имён при переносе" in response.content.decode()
+        assert not Task.objects.filter(list_tasks=target).exists()
+
+    def test_bulk_delete(
+        self, admin_client, user, tasks, dispatch, django_capture_on_commit_callbacks
+    ):
+        response = admin_client.get(reverse("admin:tasks_task_changelist"))
+        assert "delete_selected" not in response.content.decode()
+        response = run_action(admin_client, "bulk_delete")
+        assert "Выбрано объектов: 30." in response.content.decode()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            run_action(admin_client, "bulk_delete", {"apply": "1"})
+
+        assert not Task.objects.exists()
+        dispatch["single"].assert_not_called()
+        snapshots = dispatch["deleted"].delay.call_args.args[0]
+        assert {task["owner_id"] for task in snapshots} == {user.id}
+        assert TaskTombstone.objects.filter(user=user).count() == 30
+
+
+@pytest.mark.django_db
+class TestStaleObjectAdmin:
+    @pytest.fixture(autouse=True)
+    def no_notify(self):
+        with patch("notify.signals.enqueue_task_change"):
+            yield
+
+    @pytest.fixture
+    def task(self, user):
+        list_task = ListTask.objects.create(name="List", owner=user)
+        return Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+
+    def test_change_form_conflict(self, admin_client, task):
+        url = reverse("admin:tasks_task_change", args=[task.id])
+        form = admin_client.get(url).context["adminform"].form
+        data = {
+            name: value for name, value in form.initial.items() if value is not None
+        }
+        data.update(name="Edited", complete_before_0="", complete_before_1="")
+        # Задачу успели изменить после открытия формы
+        Task.objects.filter(id=task.id).update(version=task.version + 1)
+
+        response = admin_client.post(url, data)
+
+        assert response.status_code == 302
+        assert response.url == url
+        assert Task.objects.get(id=task.id).name == "Task"
+        messages = [str(message) for message in response.wsgi_request._messages]
+        assert messages == [TaskAdmin.stale_message]
+
+    def test_list_editable_conflict(self, admin_client, task, user):
+        url = reverse("admin:tasks_task_changelist")
+        data = {
+            "form-TOTAL_FORMS": "1",
+            "form-INITIAL_FORMS": "1",
+            "form-0-id": task.id,
+            "form-0-status": TaskStatus.COMPLETED,
+            "form-0-assigned_to": user.id,
+            "_save": "Save",
+        }
+
+        with patch.object(Task, "save", side_effect=StaleObjectError):
+            response = admin_client.post(url, data)
+
+        assert response.status_code == 302
+        assert Task.objects.get(id=task.id).status == TaskStatus.IN_PROGRESS
+        messages = [str(message) for message in response.wsgi_request._messages]
+        assert messages == [TaskAdmin.stale_message]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from accounts.models import Profile
+from tasks.management.benchmark import percentiles
+from tasks.models import ListTask, Task, User
+
+
+@pytest.mark.django_db
+def test_seed_data(capsys):
+    call_command("seed_data", users=10, lists=20, tasks=300, batch_size=64, seed=1)
+
+    assert User.objects.count() == 10
+    assert Profile.objects.count() == 5
+    assert ListTask.objects.count() == 20
+    assert Task.objects.count() == 300
+    user = User.objects.first()
+    assert user.check_password("bench-password")
+    assert "Готово" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_benchmark_api(tmp_path, capsys):
+    call_command("seed_data", users=5, lists=10, tasks=100, seed=1)
+    output = tmp_path / "result.json"
+
+    tasks_before = set(Task.objects.values_list("id", "status"))
+    profiles_before = set(Profile.objects.values_list("user", "telegram_id"))
+
+    call_command(
+        "benchmark_api", requests=3, warmup=1, output=str(output), confirmed=True
+    )
+    call_command(
+        "benchmark_api",
+        confirmed=True,
+        requests=2,
+        warmup=0,
+        endpoints=["assigned-tasks", "token"],
+        output=str(tmp_path / "second.json"),
+        compare=str(output),
+    )
+
+    report = json.loads(output.read_text())
+    endpoints = report["endpoints"]
+    assert report["meta"]["rows"]["tasks"] >= 100
+    assert len(endpoints) == 21
+    for name, result in endpoints.items():
+        assert all(int(code) < 400 for code in result["status"]), (name, result)
+        assert set(result["latency_ms"]) == {"p50", "p95", "p99", "mean"}
+        assert result["throughput_rps"] > 0
+    assert endpoints["assigned-tasks"]["queries"]["max"] >= 1
+    assert "Сравнение с" in capsys.readouterr().out
+
+    # Созданные объекты удалены, изменённые — восстановлены
+    assert set(Task.objects.values_list("id", "status")) == tasks_before
+    assert set(Profile.objects.values_list("user", "telegram_id")) == profiles_before
+    assert not ListTask.objects.filter(name__startswith="apibench").exists()
+    assert not User.objects.filter(username__startswith="apibench").exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_api_refuses_without_confirmation(settings):
+    settings.DEBUG = False
+    call_command("seed_data", users=2, lists=2, tasks=10, seed=1)
+
+    with pytest.raises(CommandError, match="--i-know-this-writes-data"):
+        call_command("benchmark_api", requests=1, warmup=0)
+
+
+def test_percentiles():
+    samples = list(range(1, 101))
+
+    result = percentiles(samples)
+
+    assert result["p50"] == pytest.approx(50.5)
+    assert result["p99"] == pytest.approx(99.01)
+    assert percentiles([7.0]) == {"p50": 7.0, "p95": 7.0, "p99": 7.0}
+
+
+@pytest.mark.django_db
+def test_benchmark_task_indexes_refuses_without_confirmation(settings):
+    settings.DEBUG = False
+
+    with pytest.raises(CommandError, match="--i-know-this-drops-indexes"):
+        call_command("benchmark_task_indexes", seed_tasks=100)
+
+    # Ни данных, ни изменений схемы до проверки
+    assert not Task.objects.exists()
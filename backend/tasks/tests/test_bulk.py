@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks.models import ListTask, Task, TaskStatus
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def mock_notify():
+    with patch("notify.signals.enqueue_task_change") as mock:
+        yield mock
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create_user(username="anotheruser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def bulk(client, operations):
+    return client.post(reverse("task-bulk"), {"operations": operations}, format="json")
+
+
+@pytest.mark.django_db
+class TestTaskBulk:
+    def test_mixed_operations(
+        self, client, list_task, user, another_user, django_capture_on_commit_callbacks
+    ):
+        existing = Task.objects.create(
+            name="Existing", list_tasks=list_task, assigned_to=user
+        )
+        to_assign = Task.objects.create(name="Unassigned", list_tasks=list_task)
+
+        operations = [
+            {
+                "op": "create",
+                "list_id": list_task.id,
+                "data": {"name": "New", "assigned_to": another_user.id},
+            },
+            {"op": "create", "list_id": list_task.id, "data": {"name": "Existing"}},
+            {
+                "op": "update",
+                "id": existing.id,
+                "version": existing.version,
+                "data": {"description": "Edited"},
+            },
+            {"op": "complete", "id": existing.id},
+            {"op": "assign", "id": to_assign.id, "assigned_to": another_user.id},
+            {"op": "complete", "id": to_assign.id},
+            {
+                "op": "update",
+                "id": existing.id,
+                "version": 999,
+                "data": {"name": "Stale"},
+            },
+            {"op": "unknown"},
+        ]
+        with patch("notify.signals.dispatch_tasks_batch") as mock_dispatch:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = bulk(client, operations)
+
+        assert response.status_code == 200
+        statuses = [item["status"] for item in response.data["results"]]
+        assert statuses == ["ok", "error", "ok", "ok", "ok", "ok", "error", "error"]
+
+        created = Task.objects.get(name="New")
+        assert created.status == TaskStatus.IN_PROGRESS
+        existing.refresh_from_db()
+        assert existing.description == "Edited"
+        assert existing.status == TaskStatus.COMPLETED
+        assert existing.version == 2
+        to_assign.refresh_from_db()
+        assert to_assign.assigned_to == another_user
+        assert to_assign.status == TaskStatus.COMPLETED
+
+        # Одна пачка уведомлений на весь запрос
+        mock_dispatch.delay.assert_called_once()
+        changes = mock_dispatch.delay.call_args.args[0]
+        assert sorted(changes) == sorted(
+            [
+                [created.id, "created", None],
+                [existing.id, "updated", user.id],
+                [to_assign.id, "updated", None],
+            ]
+        )
+
+    def test_query_count_constant(
+        self, client, list_task, django_assert_max_num_queries
+    ):
+        operations = [
+            {"op": "create", "list_id": list_task.id, "data": {"name": f"Task {i}"}}
+            for i in range(100)
+        ]
+        with django_assert_max_num_queries(10):
+            response = bulk(client, operations)
+        assert response.status_code == 200
+        assert Task.objects.filter(list_tasks=list_task).count() == 100
+
+    def test_foreign_list_and_task(self, client, another_user):
+        foreign_list = ListTask.objects.create(name="Foreign", owner=another_user)
+        foreign_task = Task.objects.create(name="Foreign task", list_tasks=foreign_list)
+
+        response = bulk(
+            client,
+            [
+                {"op": "create", "list_id": foreign_list.id, "data": {"name": "Nope"}},
+                {"op": "complete", "id": foreign_task.id},
+            ],
+        )
+        assert [item["status"] for item in response.data["results"]] == [
+            "error",
+            "error",
+        ]
+
+    def test_limits(self, client):
+        assert bulk(client, []).status_code == 400
+        too_many = [{"op": "complete", "id": 1}] * 501
+        assert bulk(client, too_many).status_code == 400
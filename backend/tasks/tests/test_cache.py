@@ -0,0 +1,147 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks import cache as page_cache
+from tasks.models import ListTask, Task
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def page_cache_enabled(settings):
+    settings.TASK_PAGE_CACHE_TIMEOUT = 300
+    cache.clear()
+    page_cache.local_pages.clear()
+    with (
+        patch("notify.signals.enqueue_task_change"),
+        patch("notify.signals.dispatch_tasks_updated"),
+    ):
+        yield
+    cache.clear()
+    page_cache.local_pages.clear()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create_user(username="anotheruser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestPageCache:
+    def test_hit_skips_database(self, user, list_task, django_assert_num_queries):
+        Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+        client = client_for(user)
+        url = reverse("assigned-tasks")
+
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+            not_modified = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second["ETag"] == first["ETag"]
+        assert not_modified.status_code == 304
+
+    def test_task_save_invalidates(
+        self, user, list_task, django_capture_on_commit_callbacks
+    ):
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+        client = client_for(user)
+        urls = [
+            reverse("assigned-tasks"),
+            reverse("task-in-list", kwargs={"list_id": list_task.id}),
+        ]
+        for url in urls:
+            client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task.name = "Renamed"
+            task.save()
+
+        for url in urls:
+            assert client.get(url).data["results"][0]["name"] == "Renamed"
+
+    def test_reassign_invalidates_old_assignee(
+        self, user, another_user, list_task, django_capture_on_commit_callbacks
+    ):
+        task = Task.objects.create(
+            name="Task", list_tasks=list_task, assigned_to=another_user
+        )
+        client = client_for(another_user)
+        url = reverse("assigned-tasks")
+        assert client.get(url).data["count"] == 1
+
+        task = Task.objects.get(id=task.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            task.assigned_to = user
+            task.save()
+
+        assert client.get(url).data["count"] == 0
+
+    def test_list_rename_and_bulk_update(
+        self, user, another_user, list_task, django_capture_on_commit_callbacks
+    ):
+        task = Task.objects.create(
+            name="Task", list_tasks=list_task, assigned_to=another_user
+        )
+        client = client_for(another_user)
+        url = reverse("assigned-tasks")
+        client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            list_task.name = "New name"
+            list_task.save()
+        assert client.get(url).data["results"][0]["list_name"] == "New name"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("complete-task", kwargs={"task_id": task.id})
+            )
+        assert response.status_code == 200
+        assert client.get(url).data["results"][0]["is_completed"] is True
+
+    def test_empty_list_delete_invalidates(
+        self, list_task, django_capture_on_commit_callbacks
+    ):
+        scope = [("list", list_task.pk)]
+        (generation,) = page_cache.get_generations(scope)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            list_task.delete()
+
+        assert page_cache.get_generations(scope) != [generation]
+
+    def test_cached_list_is_not_shared(self, user, another_user, list_task):
+        Task.objects.create(name="Task", list_tasks=list_task)
+        url = reverse("task-in-list", kwargs={"list_id": list_task.id})
+
+        assert client_for(user).get(url).status_code == 200
+        assert client_for(another_user).get(url).status_code == 404
+
+    def test_evicted_generation_is_fresh(self, user):
+        (generation,) = page_cache.get_generations([("user", user.pk)])
+        page_cache.invalidate(user_ids=[user.pk])
+
+        assert page_cache.get_generations([("user", user.pk)]) != [generation]
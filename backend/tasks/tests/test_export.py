@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks.models import ListTask, Task
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def mock_notify():
+    with patch("notify.signals.enqueue_task_change") as mock:
+        yield mock
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create_user(username="anotheruser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def read_stream(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestTaskExport:
+    def test_ndjson_respects_access(self, client, list_task, user, another_user):
+        foreign_list = ListTask.objects.create(name="Foreign", owner=another_user)
+        own = Task.objects.create(name="Own", list_tasks=list_task)
+        assigned = Task.objects.create(
+            name="Assigned", list_tasks=foreign_list, assigned_to=user
+        )
+        Task.objects.create(name="Hidden", list_tasks=foreign_list)
+
+        response = client.get(reverse("task-export"), {"format": "ndjson"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert [row["id"] for row in rows] == [own.id, assigned.id]
+        assert rows[1]["list_name"] == "Foreign"
+        assert rows[1]["assignee_name"] == "testuser"
+
+    def test_csv_for_list(self, client, list_task, django_assert_num_queries):
+        for i in range(3):
+            Task.objects.create(name=f"Task {i}", list_tasks=list_task)
+
+        url = reverse("task-in-list-export", kwargs={"list_id": list_task.id})
+        response = client.get(url, {"format": "csv"})
+        # Строки читаются одним запросом уже во время отдачи потока
+        with django_assert_num_queries(1):
+            body = read_stream(response)
+
+        assert response.status_code == 200
+        assert f"list-{list_task.id}-tasks.csv" in response["Content-Disposition"]
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert [row["name"] for row in rows] == ["Task 0", "Task 1", "Task 2"]
+
+    def test_foreign_list(self, list_task, another_user):
+        client = APIClient()
+        client.force_authenticate(another_user)
+
+        url = reverse("task-in-list-export", kwargs={"list_id": list_task.id})
+        assert client.get(url, {"format": "csv"}).status_code == 404
+
+    def test_unsupported_format(self, client):
+        response = client.get(reverse("task-export"), {"format": "xml"})
+        assert response.status_code == 400
@@ -0,0 +1,156 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks.importer import import_tasks, parse_rows
+from tasks.models import ListTask, Task, TaskStatus
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def mock_dispatch():
+    with patch("notify.signals.dispatch_tasks_imported") as mock:
+        yield mock
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create_user(username="anotheruser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def import_url(list_task, import_format):
+    url = reverse("task-in-list-import", kwargs={"list_id": list_task.id})
+    return f"{url}?format={import_format}"
+
+
+@pytest.mark.django_db
+class TestTaskImport:
+    def test_csv_body(
+        self,
+        client,
+        list_task,
+        another_user,
+        mock_dispatch,
+        django_capture_on_commit_callbacks,
+    ):
+        body = (
+            "name,description,assigned_to_id,complete_before\n"
+            f"First,,{another_user.id},2030-01-01T10:00:00Z\n"
+            '"Second","Multi\nline",,\n'
+        )
+        with patch("notify.signals.enqueue_task_change") as mock_enqueue:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = client.generic(
+                    "POST", import_url(list_task, "csv"), body, content_type="text/csv"
+                )
+
+        assert response.status_code == 200
+        assert response.data == {"created": 2, "errors": []}
+        first = Task.objects.get(name="First")
+        assert first.assigned_to_id == another_user.id
+        assert first.status == TaskStatus.IN_PROGRESS
+        assert Task.objects.get(name="Second").description == "Multi\nline"
+        # Вместо сигнала на каждую задачу — одно сводное уведомление
+        mock_enqueue.assert_not_called()
+        mock_dispatch.delay.assert_called_once()
+        list_id, task_ids = mock_dispatch.delay.call_args.args
+        assert list_id == list_task.id
+        assert sorted(task_ids) == sorted(Task.objects.values_list("id", flat=True))
+
+    def test_ndjson_row_errors(self, client, list_task):
+        Task.objects.bulk_create([Task(name="Existing", list_tasks=list_task)])
+        lines = [
+            json.dumps({"name": "Ok"}),
+            "{broken",
+            json.dumps({"name": "Existing"}),
+            json.dumps({"name": "Ok"}),
+            "",
+            json.dumps({"name": "Ghost", "assigned_to": 999999}),
+            json.dumps({"description": "no name"}),
+        ]
+        response = client.generic(
+            "POST",
+            import_url(list_task, "ndjson"),
+            "\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 200
+        assert response.data["created"] == 1
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        assert sorted(errors) == [2, 3, 4, 5, 6]
+        assert "name" in errors[3] and "name" in errors[4]
+        assert "assigned_to" in errors[5]
+        assert "name" in errors[6]
+
+    def test_multipart_file(self, client, list_task):
+        upload = io.BytesIO(b"\xef\xbb\xbfname\nFrom file\n")
+        upload.name = "tasks.csv"
+        response = client.post(
+            import_url(list_task, "csv"), {"file": upload}, format="multipart"
+        )
+
+        assert response.status_code == 200
+        assert response.data["created"] == 1
+        assert Task.objects.filter(name="From file").exists()
+
+    def test_foreign_list(self, list_task, another_user):
+        client = APIClient()
+        client.force_authenticate(another_user)
+
+        response = client.generic(
+            "POST",
+            import_url(list_task, "csv"),
+            "name\nTask\n",
+            content_type="text/csv",
+        )
+        assert response.status_code == 404
+        assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_in_chunks(list_task, django_assert_max_num_queries):
+    rows = [json.dumps({"name": f"Task {i}"}) + "\n" for i in range(250)]
+
+    # На пачку: исполнители, занятые имена, bulk_create (+ savepoint)
+    with django_assert_max_num_queries(3 * 5):
+        result = import_tasks(list_task, parse_rows(rows, "ndjson"), chunk_size=100)
+
+    assert result == {"created": 250, "errors": []}
+    assert Task.objects.filter(list_tasks=list_task).count() == 250
+
+
+@pytest.mark.django_db
+def test_import_command(list_task, tmp_path, capsys):
+    path = tmp_path / "tasks.csv"
+    path.write_text("name,status\nA,Pending\nB,unknown\n")
+
+    call_command("import_tasks", list_task.id, str(path))
+
+    captured = capsys.readouterr()
+    assert "Создано задач: 1, ошибок: 1" in captured.out
+    assert "Строка 2" in captured.err
@@ -3,10 +3,12 @@ from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from datetime import timedelta
 
-from tasks.models import ListTask, Task, TaskStatus
+from tasks.models import ListTask, StaleObjectError, Task, TaskStatus
 
 User = get_user_model()
 
@@ -41,7 +43,7 @@ class TestListTaskModel:
 
 
 @pytest.mark.django_db
-@patch('notify.signals.notify_task_change')
+@patch('notify.signals.enqueue_task_change')
 class TestTaskModel:
     def test_task_creation(self, mock_notify, list_task, user):
         task = Task.objects.create(
@@ -102,6 +104,23 @@ class TestTaskModel:
         assert task.mark_overdue() is False
         assert mock_notify.call_count > 1
 
+    def test_mark_status_conflict(self, mock_notify, list_task, user):
+        task = Task.objects.create(
+            name="Stale Task",
+            list_tasks=list_task,
+            assigned_to=user,
+            complete_before=timezone.now() - timedelta(days=1),
+        )
+        Task.objects.filter(id=task.id).update(version=F("version") + 1)
+
+        # Конфликт версий — False без исключения, статус в памяти не меняется
+        with transaction.atomic():
+            assert task.mark_overdue() is False
+            assert task.mark_completed() is False
+            assert Task.objects.count() == 1
+        assert task.status == TaskStatus.IN_PROGRESS
+        assert Task.objects.get(id=task.id).status == TaskStatus.IN_PROGRESS
+
     def test_is_completed_property(self, mock_notify, list_task, user):
         task = Task.objects.create(
             name="Property Task",
@@ -113,3 +132,48 @@ class TestTaskModel:
         task.save()
         assert task.is_completed is True
         mock_notify.assert_called()
+
+    def test_loaded_values_tracked(self, mock_notify, list_task, user, another_user):
+        task = Task.objects.create(
+            name="Tracked Task", list_tasks=list_task, assigned_to=user
+        )
+        task = Task.objects.get(pk=task.pk)
+        assert task.get_loaded_value("assigned_to_id") == user.id
+        assert task.get_loaded_value("status") == TaskStatus.IN_PROGRESS
+
+        task.assigned_to = another_user
+        task.save()
+        # Старый исполнитель передаётся в уведомление без дополнительного SELECT
+        mock_notify.assert_called_with(task, "updated", old_assigned_to_id=user.id)
+        assert task.get_loaded_value("assigned_to_id") == another_user.id
+
+    def test_save_without_pre_select(
+        self, mock_notify, list_task, user, django_assert_num_queries
+    ):
+        task = Task.objects.create(
+            name="Single Query", list_tasks=list_task, assigned_to=user
+        )
+        task = Task.objects.get(pk=task.pk)
+        task.name = "Renamed"
+        with django_assert_num_queries(1):
+            task.save()
+
+    def test_save_deferred_fields_untouched(self, mock_notify, list_task, user):
+        task = Task.objects.create(
+            name="Deferred", description="Keep", list_tasks=list_task, assigned_to=user
+        )
+        partial = Task.objects.only("id", "name", "version").get(pk=task.pk)
+        partial.name = "Renamed"
+        partial.save()
+
+        task.refresh_from_db()
+        assert (task.name, task.description) == ("Renamed", "Keep")
+        assert task.version == partial.version == 2
+
+    def test_stale_save_keeps_version(self, mock_notify, list_task, user):
+        task = Task.objects.create(name="Stale", list_tasks=list_task, assigned_to=user)
+        Task.objects.filter(id=task.id).update(version=F("version") + 1)
+
+        with pytest.raises(StaleObjectError):
+            task.save(update_fields=["name"])
+        assert task.version == 1
@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from tasks.models import ListTask, Task
+from tasks.pagination import KeysetPagination
+
+User = get_user_model()
+factory = APIRequestFactory()
+
+
+@pytest.fixture
+def tasks():
+    user = User.objects.create_user(username="testuser", password="testpassword")
+    list_task = ListTask.objects.create(name="Test List", owner=user)
+    with patch("notify.signals.enqueue_task_change"):
+        return [
+            Task.objects.create(name=f"Task {i}", list_tasks=list_task)
+            for i in range(7)
+        ]
+
+
+def paginate(url):
+    paginator = KeysetPagination()
+    request = Request(factory.get(url))
+    page = paginator.paginate_queryset(Task.objects.all(), request)
+    return paginator, page
+
+
+@pytest.mark.django_db
+def test_keyset_walks_forward_and_back(tasks):
+    expected = sorted(tasks, key=lambda t: (t.created_at, t.id), reverse=True)
+
+    paginator, page = paginate("/api/tasks/?limit=3")
+    assert page == expected[:3]
+    assert paginator.get_previous_link() is None
+
+    paginator, page = paginate(paginator.get_next_link())
+    assert page == expected[3:6]
+
+    next_link = paginator.get_next_link()
+    previous_link = paginator.get_previous_link()
+
+    paginator, page = paginate(next_link)
+    assert page == expected[6:]
+    assert paginator.get_next_link() is None
+
+    paginator, page = paginate(previous_link)
+    assert page == expected[:3]
+    assert paginator.get_previous_link() is None
+
+
+@pytest.mark.django_db
+def test_keyset_response_has_no_count(tasks):
+    paginator, page = paginate("/api/tasks/")
+    response = paginator.get_paginated_response([t.id for t in page])
+    assert set(response.data) == {"next", "previous", "results"}
+
+
+@pytest.mark.django_db
+def test_keyset_rejects_invalid_cursor(tasks):
+    with pytest.raises(NotFound):
+        paginate("/api/tasks/?cursor=garbage")
+
+
+@pytest.mark.django_db
+def test_keyset_accepts_values_rows(tasks):
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(
+        Task.objects.values("id", "created_at"),
+        Request(factory.get("/api/tasks/?limit=3")),
+    )
+
+    _, model_page = paginate("/api/tasks/?limit=3")
+    assert [row["id"] for row in page] == [task.id for task in model_page]
+    assert (
+        paginator.get_next_link() == paginate("/api/tasks/?limit=3")[0].get_next_link()
+    )
@@ -0,0 +1,167 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks.models import ListTask, Task, TaskTombstone
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def mock_notify():
+    with patch("notify.signals.enqueue_task_change") as mock:
+        yield mock
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create_user(username="anotheruser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def sync(client, token=None):
+    params = {"since": token} if token else {}
+    response = client.get(reverse("task-changes"), params)
+    assert response.status_code == 200
+    return response.data
+
+
+@pytest.mark.django_db
+class TestTaskChanges:
+    def test_initial_then_delta(
+        self, list_task, user, django_capture_on_commit_callbacks
+    ):
+        client = client_for(user)
+        first = Task.objects.create(name="First", list_tasks=list_task)
+
+        data = sync(client)
+        assert [t["id"] for t in data["tasks"]] == [first.id]
+        assert data["deleted"] == []
+
+        first_id = first.id
+        with django_capture_on_commit_callbacks(execute=True):
+            second = Task.objects.create(name="Second", list_tasks=list_task)
+            first.delete()
+
+        data = sync(client, data["token"])
+        assert second.id in [t["id"] for t in data["tasks"]]
+        assert data["deleted"] == [first_id]
+
+    def test_lost_access_after_reassignment(
+        self, list_task, user, another_user, django_capture_on_commit_callbacks
+    ):
+        task = Task.objects.create(
+            name="Task", list_tasks=list_task, assigned_to=another_user
+        )
+        client = client_for(another_user)
+        token = sync(client)["token"]
+
+        task = Task.objects.get(pk=task.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            task.assigned_to = user
+            task.save()
+
+        data = sync(client, token)
+        assert data["deleted"] == [task.id]
+        assert data["tasks"] == []
+        # Владелец списка доступ не теряет
+        assert not TaskTombstone.objects.filter(user=user).exists()
+
+    def test_paging_with_has_more(self, list_task, user):
+        client = client_for(user)
+        created = [
+            Task.objects.create(name=f"Task {i}", list_tasks=list_task)
+            for i in range(3)
+        ]
+
+        response = client.get(reverse("task-changes"), {"limit": 2})
+        assert response.data["has_more"] is True
+        seen = [t["id"] for t in response.data["tasks"]]
+
+        data = sync(client, response.data["token"])
+        assert data["has_more"] is False
+        seen += [t["id"] for t in data["tasks"]]
+        assert sorted(seen) == sorted(t.id for t in created)
+
+    def test_invalid_token(self, user):
+        response = client_for(user).get(reverse("task-changes"), {"since": "garbage"})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_list_delete_writes_tombstones_in_bulk(
+    list_task, user, another_user, django_capture_on_commit_callbacks
+):
+    with (
+        patch("notify.signals.sync_task_deadline"),
+        patch("notify.signals.invalidate_page_cache"),
+    ):
+
+        def delete_list(size):
+            lst = ListTask.objects.create(name=f"List {size}", owner=user)
+            for i in range(size):
+                Task.objects.create(
+                    name=f"Task {i}", list_tasks=lst, assigned_to=another_user
+                )
+            with (
+                django_capture_on_commit_callbacks(execute=True),
+                CaptureQueriesContext(connection) as queries,
+            ):
+                lst.delete()
+            return len(queries)
+
+        # Число запросов не зависит от числа задач в списке
+        assert delete_list(2) == delete_list(10)
+
+    assert TaskTombstone.objects.filter(user=user).count() == 12
+    assert TaskTombstone.objects.filter(user=another_user).count() == 12
+
+
+@pytest.mark.django_db
+def test_failed_list_delete_does_not_skip_later_tombstones(
+    user, another_user, django_capture_on_commit_callbacks
+):
+    lst = ListTask.objects.create(name="List", owner=user)
+    task = Task.objects.create(name="Task", list_tasks=lst, assigned_to=another_user)
+
+    def fail(sender, **kwargs):
+        raise RuntimeError("delete failed")
+
+    post_delete.connect(fail, sender=Task)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            lst.delete()
+    finally:
+        post_delete.disconnect(fail, sender=Task)
+
+    with (
+        patch("notify.signals.sync_task_deadline"),
+        patch("notify.signals.invalidate_page_cache"),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        Task.objects.get(pk=task.pk).delete()
+
+    assert set(
+        TaskTombstone.objects.filter(task_id=task.pk).values_list("user", flat=True)
+    ) == {user.pk, another_user.pk}
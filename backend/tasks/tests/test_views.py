@@ -0,0 +1,227 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from tasks.models import ListTask, StaleObjectError, Task, TaskStatus
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def mock_notify():
+    with patch("notify.signals.enqueue_task_change") as mock:
+        yield mock
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def list_task(user):
+    return ListTask.objects.create(name="Test List", owner=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.mark.parametrize("url_name", ["assigned-tasks", "task-in-list"])
+    def test_not_modified(
+        self, client, list_task, user, url_name, django_assert_num_queries
+    ):
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+        kwargs = {"list_id": list_task.id} if url_name == "task-in-list" else {}
+        url = reverse(url_name, kwargs=kwargs)
+
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+        # Единственный валидатор — ETag (с числом строк)
+        assert "Last-Modified" not in response
+
+        # Только агрегат (и проверка доступа к списку) — без сериализации
+        with django_assert_num_queries(2 if url_name == "task-in-list" else 1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        task.name = "Renamed"
+        task.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_etag_changes_on_delete(self, client, list_task, user):
+        tasks = [
+            Task.objects.create(
+                name=f"Task {i}", list_tasks=list_task, assigned_to=user
+            )
+            for i in range(2)
+        ]
+        url = reverse("assigned-tasks")
+        etag = client.get(url)["ETag"]
+
+        Task.objects.filter(id=tasks[0].id).delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_if_modified_since_ignored_after_delete(self, client, list_task, user):
+        tasks = [
+            Task.objects.create(
+                name=f"Task {i}", list_tasks=list_task, assigned_to=user
+            )
+            for i in range(2)
+        ]
+        url = reverse("task-in-list", kwargs={"list_id": list_task.id})
+        since = http_date(time.time() + 60)
+
+        Task.objects.filter(id=tasks[0].id).delete()
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+
+        assert response.status_code == 200
+        assert [task["id"] for task in response.data["results"]] == [tasks[1].id]
+
+
+@pytest.mark.django_db
+class TestTaskComplete:
+    def test_complete_once(
+        self,
+        client,
+        list_task,
+        user,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+        url = reverse("complete-task", kwargs={"task_id": task.id})
+
+        with patch("notify.signals.dispatch_tasks_updated") as mock_dispatch:
+            with django_capture_on_commit_callbacks(execute=True):
+                with django_assert_num_queries(1):
+                    response = client.post(url)
+        assert response.status_code == 200
+        task.refresh_from_db()
+        assert task.status == TaskStatus.COMPLETED
+        mock_dispatch.delay.assert_called_once_with([task.id], ["status"])
+
+        # Повторное нажатие безвредно
+        with patch("notify.signals.dispatch_tasks_updated") as mock_dispatch:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = client.post(url)
+        assert response.status_code == 400
+        mock_dispatch.delay.assert_not_called()
+
+    def test_complete_foreign_task(self, list_task):
+        stranger = User.objects.create_user(
+            username="stranger", password="testpassword"
+        )
+        task = Task.objects.create(
+            name="Task", list_tasks=list_task, assigned_to=list_task.owner
+        )
+        client = APIClient()
+        client.force_authenticate(stranger)
+
+        response = client.post(reverse("complete-task", kwargs={"task_id": task.id}))
+        assert response.status_code == 404
+        task.refresh_from_db()
+        assert task.status == TaskStatus.IN_PROGRESS
+
+
+@pytest.mark.django_db
+class TestOptimisticLock:
+    def test_task_update_with_version(
+        self, client, list_task, user, django_assert_num_queries
+    ):
+        task = Task.objects.create(name="Task", list_tasks=list_task, assigned_to=user)
+        url = reverse("task-detail", kwargs={"pk": task.id})
+
+        # SELECT объекта + UPDATE ... WHERE version=? (+ SAVEPOINT/RELEASE)
+        with django_assert_num_queries(4):
+            response = client.patch(
+                url, {"name": "Renamed", "version": task.version}, format="json"
+            )
+        assert response.status_code == 200
+        assert response.data["version"] == task.version + 1
+
+        # Повтор со старой версией — конфликт
+        response = client.patch(
+            url, {"name": "Stale", "version": task.version}, format="json"
+        )
+        assert response.status_code == 409
+        task.refresh_from_db()
+        assert task.name == "Renamed"
+
+    def test_version_required(self, client, list_task):
+        url = reverse("list-detail", kwargs={"pk": list_task.id})
+        response = client.patch(url, {"name": "New name"}, format="json")
+        assert response.status_code == 409
+
+        response = client.patch(
+            url, {"name": "New name", "version": list_task.version}, format="json"
+        )
+        assert response.status_code == 200
+        assert response.data["version"] == list_task.version + 1
+
+    def test_stale_instance_save(self, list_task):
+        stale = ListTask.objects.get(pk=list_task.pk)
+        list_task.name = "First"
+        list_task.save()
+
+        stale.name = "Second"
+        with pytest.raises(StaleObjectError):
+            stale.save()
+
+
+@pytest.mark.django_db
+class TestLeanRead:
+    def test_same_json_as_model_serializer(self, list_task, user):
+        from django.utils import timezone
+        from rest_framework.renderers import JSONRenderer
+
+        from tasks.serializers import TaskReadSerializer, TaskSerializer
+
+        Task.objects.create(name="Plain", list_tasks=list_task)
+        Task.objects.create(
+            name="Assigned",
+            description="Описание",
+            list_tasks=list_task,
+            assigned_to=user,
+            complete_before=timezone.now(),
+        )
+        Task.objects.create(
+            name="Done", list_tasks=list_task, status=TaskStatus.COMPLETED
+        )
+        queryset = Task.objects.filter(list_tasks=list_task)
+
+        full = TaskSerializer(
+            queryset.select_related("list_tasks", "assigned_to"), many=True
+        ).data
+        lean = TaskReadSerializer(TaskReadSerializer.select(queryset), many=True).data
+
+        renderer = JSONRenderer()
+        assert renderer.render(lean) == renderer.render(full)
+
+    def test_list_views_use_one_query(
+        self, client, list_task, user, django_assert_num_queries
+    ):
+        for i in range(5):
+            Task.objects.create(
+                name=f"Task {i}", list_tasks=list_task, assigned_to=user
+            )
+
+        # Агрегат для ETag, COUNT для LimitOffset и одна выборка страницы
+        with django_assert_num_queries(3):
+            response = client.get(reverse("assigned-tasks"))
+        assert response.status_code == 200
+        assert response.data["results"][0]["list_name"] == "Test List"
@@ -19,9 +19,27 @@ urlpatterns = [
         views.TaskInListView.as_view(),
         name="task-in-list",
     ),
+    # GET /api/lists/<list_id>/tasks/export/?format=ndjson|csv — выгрузка списка.
+    path(
+        "lists/<int:list_id>/tasks/export/",
+        views.TaskInListExportView.as_view(),
+        name="task-in-list-export",
+    ),
+    # POST /api/lists/<list_id>/tasks/import/?format=ndjson|csv — импорт задач.
+    path(
+        "lists/<int:list_id>/tasks/import/",
+        views.TaskImportView.as_view(),
+        name="task-in-list-import",
+    ),
     # Задачи
     # GET /api/tasks/ — все задачи, назначенные пользователю.
     path("tasks/", views.TaskListView.as_view(), name="assigned-tasks"),
+    # GET /api/tasks/changes/?since=<token> — изменения после водяного знака.
+    path("tasks/changes/", views.TaskChangesView.as_view(), name="task-changes"),
+    # GET /api/tasks/export/?format=ndjson|csv — выгрузка доступных задач.
+    path("tasks/export/", views.TaskExportView.as_view(), name="task-export"),
+    # POST /api/tasks/bulk/ — массовые операции с задачами.
+    path("tasks/bulk/", views.TaskBulkView.as_view(), name="task-bulk"),
     # GET/PUT/PATCH /api/tasks/<id>/"
     path("tasks/<int:pk>/", views.TaskDetailView.as_view(), name="task-detail"),
     # POST /api/tasks/<task_id>/complete/
@@ -1,14 +1,21 @@
 """Django REST Framework views for the tasks app."""
 
-from django.db.models import Q
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
 from rest_framework import generics, status
-from rest_framework.generics import get_object_or_404
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from .mixins import BaseUserSecureView
+from .access import accessible_tasks
+from .bulk import MAX_BULK_OPERATIONS, run_bulk_operations
+from .export import EXPORT_FORMATS, export_response
+from .importer import IMPORT_FORMATS, import_tasks, parse_rows
+from .mixins import BaseUserSecureView, ConditionalListMixin, ConflictError
 from .models import ListTask, Task, TaskStatus
-from .serializers import ListTaskSerializer, TaskSerializer
+from .serializers import ListTaskSerializer, TaskReadSerializer, TaskSerializer
+from .signals import tasks_updated
+from .sync import ExpiredSyncToken, InvalidSyncToken, collect_changes
 
 
 # GET /api/lists/ — Список всех списков задач
@@ -40,16 +47,23 @@ class ListTaskDetailView(BaseUserSecureView, generics.RetrieveUpdateAPIView):
 
 # GET /api/lists/<list_id>/tasks/ — задачи в списке
 # POST /api/lists/<list_id>/tasks/ — создать задачу в списке.
-class TaskInListView(BaseUserSecureView, generics.ListCreateAPIView):
+class TaskInListView(
+    ConditionalListMixin, BaseUserSecureView, generics.ListCreateAPIView
+):
     """Получение задач в списке или создание новой задачи в списке."""
 
     serializer_class = TaskSerializer
+    read_serializer_class = TaskReadSerializer
 
     def get_queryset(self):
         """Возвращает задачи, связанные с указанным списком задач."""
         list_task = self.get_object_user_safe(ListTask, id=self.kwargs["list_id"])
         return Task.objects.filter(list_tasks=list_task).select_related("list_tasks")
 
+    def get_cache_scopes(self):
+        """Страница зависит только от задач списка (доступ — у владельца)."""
+        return [("list", self.kwargs["list_id"])]
+
     def perform_create(self, serializer):
         """Сохраняет новую задачу, привязанную к списку задач."""
         list_task = self.get_object_user_safe(ListTask, id=self.kwargs["list_id"])
@@ -57,26 +71,23 @@ class TaskInListView(BaseUserSecureView, generics.ListCreateAPIView):
 
 
 # GET/PUT/PATCH /api/tasks/<id>/"
-class TaskDetailView(generics.RetrieveUpdateAPIView):
+class TaskDetailView(BaseUserSecureView, generics.RetrieveUpdateAPIView):
     """Получение, обновление и частичное обновление задачи."""
 
     serializer_class = TaskSerializer
-    permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Возвращает задачи, доступные пользователю."""
-        user = self.request.user
         # Владелец списка ИЛИ исполнитель задачи
-        return Task.objects.filter(
-            Q(list_tasks__owner=user) | Q(assigned_to=user)
-        ).select_related("list_tasks", "assigned_to")
+        return self.get_user_queryset(Task)
 
 
 # GET /api/tasks/ — все задачи, назначенные пользователю.
-class TaskListView(BaseUserSecureView, generics.ListAPIView):
+class TaskListView(ConditionalListMixin, BaseUserSecureView, generics.ListAPIView):
     """Получение списка задач, назначенных пользователю."""
 
     serializer_class = TaskSerializer
+    read_serializer_class = TaskReadSerializer
 
     def get_queryset(self):
         """Возвращает задачи, назначенные текущему пользователю."""
@@ -84,33 +95,192 @@ class TaskListView(BaseUserSecureView, generics.ListAPIView):
             "list_tasks", "assigned_to"
         )
 
+    def get_cache_scopes(self):
+        """Страница зависит только от задач, назначенных пользователю."""
+        return [("user", self.request.user.pk)]
+
+
+# POST /api/lists/<list_id>/tasks/import/?format=ndjson|csv — импорт задач.
+class TaskImportView(BaseUserSecureView):
+    """
+    Потоковый импорт задач в список.
+
+    Файл передаётся телом запроса или полем `file` формы multipart и читается
+    построчно, не загружаясь в память целиком.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        """`?format=` выбирает формат файла, а не рендерер DRF."""
+        return super().perform_content_negotiation(request, force=True)
+
+    def post(self, request, list_id):
+        """Импортирует задачи и возвращает число созданных и ошибки по строкам."""
+        list_task = self.get_object_user_safe(ListTask, id=list_id)
+        import_format = request.query_params.get("format", "ndjson")
+        if import_format not in IMPORT_FORMATS:
+            return Response(
+                {
+                    "detail": f"Unsupported format, use one of: {', '.join(IMPORT_FORMATS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response(
+                    {"detail": "Field 'file' is required"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            lines = upload
+        else:
+            # Тело запроса читается построчно, без парсеров DRF
+            lines = request._request
+
+        result = import_tasks(list_task, parse_rows(lines, import_format))
+        return Response(result, status=status.HTTP_200_OK)
+
+
+# GET /api/tasks/changes/?since=<token> — изменения после водяного знака.
+class TaskChangesView(BaseUserSecureView):
+    """Дельта-синхронизация: изменённые задачи и удалённые/недоступные задачи."""
+
+    serializer_class = TaskSerializer
+    default_limit = 500
+    max_limit = 1000
+
+    def get(self, request):
+        """Возвращает задачи, изменённые после токена `since`, и новый токен."""
+        try:
+            limit = min(
+                int(request.query_params.get("limit", self.default_limit)),
+                self.max_limit,
+            )
+        except ValueError:
+            limit = self.default_limit
+
+        try:
+            changes = collect_changes(
+                self.get_user_queryset(Task),
+                request.user,
+                token=request.query_params.get("since"),
+                limit=max(limit, 1),
+            )
+        except InvalidSyncToken:
+            return Response(
+                {"detail": "Invalid sync token"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ExpiredSyncToken:
+            # Клиент должен выполнить полную синхронизацию без since
+            return Response(
+                {"detail": "Sync token expired, full resync required"},
+                status=status.HTTP_410_GONE,
+            )
+
+        changes["tasks"] = self.get_serializer(changes["tasks"], many=True).data
+        return Response(changes)
+
+
+# POST /api/tasks/bulk/ — массовые операции с задачами.
+class TaskBulkView(BaseUserSecureView):
+    """Массовое создание, обновление, завершение и назначение задач."""
+
+    def post(self, request):
+        """Выполняет операции из `operations` и возвращает результат по каждой."""
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response(
+                {"detail": "Field 'operations' must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(operations) > MAX_BULK_OPERATIONS:
+            return Response(
+                {"detail": f"Too many operations (max {MAX_BULK_OPERATIONS})"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            results = run_bulk_operations(request.user, operations)
+        except IntegrityError as exc:
+            # Конкурентная запись нарушила unique_together — пачка откатана
+            raise ConflictError("Конфликт при записи пачки, повторите запрос.") from exc
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+# GET /api/tasks/export/?format=ndjson|csv — выгрузка доступных задач.
+class TaskExportView(BaseUserSecureView):
+    """Потоковая выгрузка задач в NDJSON или CSV."""
+
+    export_name = "tasks"
+
+    def perform_content_negotiation(self, request, force=False):
+        """`?format=` выбирает формат выгрузки, а не рендерер DRF."""
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_export_queryset(self):
+        """Задачи, доступные пользователю (владелец списка или исполнитель)."""
+        return self.get_user_queryset(Task)
+
+    def get(self, request, **kwargs):
+        """Отдаёт задачи потоком, не загружая выгрузку в память."""
+        export_format = request.query_params.get("format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {
+                    "detail": f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return export_response(
+            self.get_export_queryset(), export_format, self.export_name
+        )
+
+
+# GET /api/lists/<list_id>/tasks/export/?format=ndjson|csv — выгрузка списка.
+class TaskInListExportView(TaskExportView):
+    """Потоковая выгрузка задач одного списка."""
+
+    def get_export_queryset(self):
+        """Задачи списка, принадлежащего пользователю."""
+        list_task = self.get_object_user_safe(ListTask, id=self.kwargs["list_id"])
+        self.export_name = f"list-{list_task.id}-tasks"
+        return Task.objects.filter(list_tasks=list_task)
+
 
 # POST /api/tasks/<task_id>/complete/ — завершить задачу.
 class TaskCompleteView(BaseUserSecureView, generics.ListAPIView):
     """Отметка задачи как выполненной."""
 
     def post(self, request, task_id):
-        """Отмечает задачу как выполненную."""
-        user = self.request.user
-        task_qs = Task.objects.filter(
-            Q(list_tasks__owner=user) | Q(assigned_to=user)
-        ).select_related("list_tasks", "assigned_to")
-        task = get_object_or_404(task_qs, id=task_id)
+        """
+        Отмечает задачу как выполненную.
 
-        # Проверяем активность
-        if not task.status == TaskStatus.IN_PROGRESS:
-            return Response(
-                {"detail": "Task is expired and cannot be completed"},
-                status=status.HTTP_400_BAD_REQUEST,
+        Проверка доступа и статуса выполняется в одном условном UPDATE, поэтому
+        повторное нажатие не завершит задачу дважды.
+        """
+        user = self.request.user
+        completed = (
+            accessible_tasks(user)
+            .filter(id=task_id, status=TaskStatus.IN_PROGRESS)
+            .update(
+                status=TaskStatus.COMPLETED,
+                updated_at=timezone.now(),
+                version=F("version") + 1,
             )
+        )
 
-        # Отмечаем как выполненную, если ещё не завершена
-        if task.mark_completed():
+        if completed:
+            tasks_updated.send(sender=Task, task_ids=[task_id], fields=["status"])
             return Response(
                 {"detail": "Task marked as complete"},
                 status=status.HTTP_200_OK,
             )
+
+        # Ничего не обновили: задачи нет (или нет доступа) либо она не активна
+        if not self.get_user_queryset(Task).filter(id=task_id).exists():
+            raise NotFound()
         return Response(
-            {"detail": "Task was already completed or could not be completed"},
+            {"detail": "Task is expired and cannot be completed"},
             status=status.HTTP_400_BAD_REQUEST,
         )
@@ -47,6 +47,16 @@ export async function initWebSocket() {
                 if (data.type === 'task_updated') {
                     handleWSMessage(data);
                 }
+                // Массовые операции: одно сообщение со списком изменений
+                if (data.type === 'tasks_batch') {
+                    data.changes.forEach(change =>
+                        handleWSMessage({ type: 'task_updated', ...change }),
+                    );
+                }
+                // Импорт задач: сводка вместо сообщения на каждую задачу
+                if (data.type === 'tasks_imported') {
+                    showNotification(`Импортировано задач: ${data.count}`);
+                }
                 if (data.type === 'task_notify') {
                     showNotification(data.message);
                 }